@@ -6,9 +6,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.services.ecosystem import EcoSystemService
 from app.api.services.organism import OrganismService
 from app.api.services.plant import PlantService
-from app.database.session import get_session
+from app.api.services.transfer import TransferService
+from app.database.session import get_read_session, get_session
 
 SessionDep = Annotated[AsyncSession, Depends(get_session)]
+# Read-only endpoints, served by a replica when there is one
+ReadSessionDep = Annotated[AsyncSession, Depends(get_read_session)]
 
 
 def get_ecosystem_service(session: SessionDep):
@@ -23,6 +26,33 @@ def get_plant_service(session: SessionDep):
     return PlantService(session)
 
 
+def get_transfer_service(session: SessionDep):
+    return TransferService(session)
+
+
+def get_ecosystem_read_service(session: ReadSessionDep):
+    return EcoSystemService(session)
+
+
+def get_organism_read_service(session: ReadSessionDep):
+    return OrganismService(session)
+
+
+def get_plant_read_service(session: ReadSessionDep):
+    return PlantService(session)
+
+
+def get_transfer_read_service(session: ReadSessionDep):
+    return TransferService(session)
+
+
 EcoSystemServiceDep = Annotated[EcoSystemService, Depends(get_ecosystem_service)]
 OrganismServiceDep = Annotated[OrganismService, Depends(get_organism_service)]
 PlantServiceDep = Annotated[PlantService, Depends(get_plant_service)]
+TransferServiceDep = Annotated[TransferService, Depends(get_transfer_service)]
+EcoSystemReadServiceDep = Annotated[
+    EcoSystemService, Depends(get_ecosystem_read_service)
+]
+OrganismReadServiceDep = Annotated[OrganismService, Depends(get_organism_read_service)]
+PlantReadServiceDep = Annotated[PlantService, Depends(get_plant_read_service)]
+TransferReadServiceDep = Annotated[TransferService, Depends(get_transfer_read_service)]
@@ -79,3 +79,43 @@ class SIMULATION_NOT_EXISTS_ERROR(HTTPException):
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Simulation not found with that ID.",
         )
+
+
+class INVALID_FIELDS_ERROR(HTTPException):
+    def __init__(self, fields: list[str]):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields requested: {', '.join(fields)}.",
+        )
+
+
+class INVALID_CURSOR_ERROR(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The provided cursor is invalid.",
+        )
+
+
+class INVALID_BULK_BODY_ERROR(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The body must be a JSON array or NDJSON (one JSON object per line).",
+        )
+
+
+class SPECIES_NOT_FOUND_ERROR(HTTPException):
+    def __init__(self, names: list[str]):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No organism or plant was found with these names: {', '.join(names)}.",
+        )
+
+
+class INVALID_IMPORT_ERROR(HTTPException):
+    def __init__(self, line: int, detail: str):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Line {line}: {detail}",
+        )
@@ -1,19 +1,26 @@
 from app.database.enums import ActivityCycle, OrganismType, SocialBehavior, Speed
-from app.database.models import Organism
+from app.database.models import OrganismIndividual
 
+from .food_web import FoodWeb
 
-def hit_chance(attacker: Organism, defender: Organism, is_night: bool) -> float:
+
+def hit_chance(
+    attacker: OrganismIndividual,
+    defender: OrganismIndividual,
+    is_night: bool,
+    food_web: FoodWeb,
+) -> float:
     atk = combat_power(attacker, defender, is_night)
     dfd = combat_power(defender, attacker, is_night)
 
     relationship_message = None
-    if defender.name in [prey.name for prey in attacker.prey]:
+    if food_web.is_prey(attacker, defender):
         atk *= 1.15
         relationship_message = (
             f"{attacker.name} has a natural advantage over {defender.name} (prey)."
         )
 
-    elif defender.name in [predator.name for predator in attacker.predator]:
+    elif food_web.is_predator(attacker, defender):
         atk *= 0.85
         relationship_message = (
             f"{attacker.name} is naturally afraid of {defender.name} (predator)."
@@ -26,7 +33,9 @@ def hit_chance(attacker: Organism, defender: Organism, is_night: bool) -> float:
     return (max(0.05, min(chance, 0.95)), relationship_message)
 
 
-def combat_power(org: Organism, opponent: Organism, is_night: bool) -> float:
+def combat_power(
+    org: OrganismIndividual, opponent: OrganismIndividual, is_night: bool
+) -> float:
     score = 0.0
     geral_weight = 1
     # Physical Strength (weight & size)
@@ -55,7 +64,7 @@ def combat_power(org: Organism, opponent: Organism, is_night: bool) -> float:
     return max(score, 0.1)
 
 
-def type_advantage(attacker: Organism, defender: Organism) -> float:
+def type_advantage(attacker: OrganismIndividual, defender: OrganismIndividual) -> float:
     # predator vs herbivores
     if (
         attacker.type == OrganismType.predator
@@ -95,7 +104,7 @@ def type_advantage(attacker: Organism, defender: Organism) -> float:
     return 0.0
 
 
-def cycle_bonus(org: Organism, is_night: bool) -> float:
+def cycle_bonus(org: OrganismIndividual, is_night: bool) -> float:
     if org.activity_cycle == ActivityCycle.nocturnal:
         return 1.0 if is_night else -0.5
     if org.activity_cycle == ActivityCycle.diurnal:
@@ -105,7 +114,7 @@ def cycle_bonus(org: Organism, is_night: bool) -> float:
     return 0.0
 
 
-def social_bonus(org: Organism) -> float:
+def social_bonus(org: OrganismIndividual) -> float:
     mapping = {
         SocialBehavior.solitary: 0.0,
         SocialBehavior.pack: 0.8,
@@ -0,0 +1,65 @@
+from collections import defaultdict
+from uuid import UUID
+
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.models import (
+    OrganismIndividual,
+    PlantIndividual,
+    PollinationLink,
+    PredationLink,
+)
+
+
+def species_of(entity: OrganismIndividual | PlantIndividual) -> UUID:
+    return entity.species_id
+
+
+# Predation and pollination links only exist between species, individuals
+# resolve them through their species_id
+class FoodWeb:
+    def __init__(self, predation=(), pollination=()):
+        self.preys: dict[UUID, set[UUID]] = defaultdict(set)
+        self.predators: dict[UUID, set[UUID]] = defaultdict(set)
+        self.targets: dict[UUID, set[UUID]] = defaultdict(set)
+        for predator_id, prey_id in predation:
+            self.preys[predator_id].add(prey_id)
+            self.predators[prey_id].add(predator_id)
+        for pollinator_id, plant_id in pollination:
+            self.targets[pollinator_id].add(plant_id)
+
+    def is_prey(
+        self, attacker: OrganismIndividual, defender: OrganismIndividual
+    ) -> bool:
+        return species_of(defender) in self.preys[species_of(attacker)]
+
+    def is_predator(
+        self, attacker: OrganismIndividual, defender: OrganismIndividual
+    ) -> bool:
+        return species_of(defender) in self.predators[species_of(attacker)]
+
+    def pollination_targets(
+        self, organism: OrganismIndividual, plants: list[PlantIndividual]
+    ):
+        targets = self.targets[species_of(organism)]
+        return [plant for plant in plants if species_of(plant) in targets]
+
+
+async def load_food_web(session: AsyncSession, species_ids: set[UUID]) -> FoodWeb:
+    if not species_ids:
+        return FoodWeb()
+    predation = await session.execute(
+        select(PredationLink.predator_id, PredationLink.prey_id).where(
+            or_(
+                PredationLink.predator_id.in_(species_ids),
+                PredationLink.prey_id.in_(species_ids),
+            )
+        )
+    )
+    pollination = await session.execute(
+        select(PollinationLink.pollinator_id, PollinationLink.plant_id).where(
+            PollinationLink.pollinator_id.in_(species_ids)
+        )
+    )
+    return FoodWeb(predation.tuples().all(), pollination.tuples().all())
@@ -2,16 +2,19 @@ import random
 from typing import List
 
 from app.database.enums import ActivityCycle
-from app.database.models import Ecosystem, Organism, Plant
+from app.database.models import Ecosystem, OrganismIndividual, PlantIndividual
 
 from .attack_interactions import hit_chance
+from .food_web import FoodWeb
 
 
 # GLOBAL
-def drink_water(ecosystem: Ecosystem, organism_or_plant: Organism | Plant):
+def drink_water(
+    ecosystem: Ecosystem, organism_or_plant: OrganismIndividual | PlantIndividual
+):
     HEALTH = random.randint(5, 20)
     THIRST = random.randint(5, 20)
-    if type(organism_or_plant) is Organism:
+    if type(organism_or_plant) is OrganismIndividual:
         if ecosystem.water_available >= organism_or_plant.water_consumption:
             ecosystem.water_available -= organism_or_plant.water_consumption
             organism_or_plant.thirst -= THIRST
@@ -25,7 +28,7 @@ def drink_water(ecosystem: Ecosystem, organism_or_plant: Organism | Plant):
             return {
                 f"No sufficient water for {organism_or_plant.name}. His health has reduced by {HEALTH} and his thirst increased by {THIRST}."
             }
-    if type(organism_or_plant) is Plant:
+    if type(organism_or_plant) is PlantIndividual:
         BIOMASS = random.randint(0, 100)
 
         if ecosystem.water_available >= organism_or_plant.water_need:
@@ -43,20 +46,22 @@ def drink_water(ecosystem: Ecosystem, organism_or_plant: Organism | Plant):
             }
 
 
-def rest(organism: Organism):
+def rest(organism: OrganismIndividual):
     HEALTH = random.randint(10, 30)
     organism.health += HEALTH
     return {f"{organism.name} rest and recovered {HEALTH} health."}
 
 
-def reproduce(organisms: List[Organism]):
+def reproduce(organisms: List[OrganismIndividual]):
     pregnant_organism = random.choice(organisms)
     pregnant_organism.pregnant = True
     return {f"{pregnant_organism.name} is now pregnant."}
 
 
 # PREDATORS
-def hunt_prey(attacker: Organism, deffender: Organism):
+def hunt_prey(
+    attacker: OrganismIndividual, deffender: OrganismIndividual, food_web: FoodWeb
+):
     results = []
     is_night = attacker.activity_cycle
     reattack = True
@@ -65,6 +70,7 @@ def hunt_prey(attacker: Organism, deffender: Organism):
             attacker,
             deffender,
             True if is_night == ActivityCycle.nocturnal else False,
+            food_web,
         )
         successful_attack = random.random() > attack_chance
         damage = random.randint(5, 40)
@@ -100,7 +106,7 @@ def hunt_prey(attacker: Organism, deffender: Organism):
 
 
 # OMNIVORE
-def graze_plants(target: Plant, organism: Organism):
+def graze_plants(target: PlantIndividual, organism: OrganismIndividual):
     if not target:
         return {f"No {target} has been found to in this ecosystem to {organism.name}."}
 
@@ -118,7 +124,9 @@ def graze_plants(target: Plant, organism: Organism):
 
 
 # POLLINATORS
-def collect_and_transport_nectar(organism: Organism, pollination_targets: List[Plant]):
+def collect_and_transport_nectar(
+    organism: OrganismIndividual, pollination_targets: List[PlantIndividual]
+):
     plant_to_collect_nectar = random.choice(pollination_targets)
     (
         biomass_lost,
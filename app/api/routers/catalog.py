@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Query, Request
+
+from app.api.dependencies import TransferReadServiceDep, TransferServiceDep
+from app.api.utils.transfer import TransferFormat
+
+router = APIRouter(prefix="/catalog", tags=["Catalog"])
+
+
+@router.get(
+    "/export",
+    description="Every base organism and plant and the predation and pollination links between them, streamed as NDJSON. format=columnar writes one line per group of rows, with a list of values per column",
+)
+async def export_catalog(
+    service: TransferReadServiceDep,
+    export_format: TransferFormat = Query("ndjson", alias="format"),
+):
+    return await service.export_catalog(export_format)
+
+
+@router.post(
+    "/import",
+    status_code=201,
+    description="Adds the species and links of a catalog export (either format, read as it is uploaded). Species that already exist are matched by name and left as they are",
+)
+async def import_catalog(request: Request, service: TransferServiceDep):
+    return await service.import_catalog(request)
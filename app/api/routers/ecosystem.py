@@ -1,46 +1,116 @@
-import asyncio
 from typing import Optional
 from uuid import uuid4
 
-from fastapi import APIRouter
+from fastapi import APIRouter, BackgroundTasks, Header, Query, Request
 
-from app.api.dependencies import EcoSystemServiceDep
+from app.api.dependencies import (
+    EcoSystemReadServiceDep,
+    EcoSystemServiceDep,
+    TransferReadServiceDep,
+    TransferServiceDep,
+)
 from app.api.schemas.organism import UpdateEcosystemOrganism
 from app.api.schemas.plant import UpdateEcosystemPlant
+from app.api.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, PageOrder
+from app.api.utils.transfer import TransferFormat
 from app.api.utils.utils import verify_uuid
 from app.database.enums import EnvironmentType
 
-from ..schemas.ecosystem import CreateEcoSystem, UpdateEcoSystem
+from ..schemas.ecosystem import CreateEcoSystem, SeedEcoSystem, UpdateEcoSystem
 
 router = APIRouter(prefix="/ecosystem", tags=["Ecosystem"])
 
 
-@router.get("/all")
-async def get_all_ecosystems(service: EcoSystemServiceDep):
-    return await service.get_all_ecosystems()
+@router.get(
+    "/all",
+    description="Paginated by keyset: pass the returned next_cursor as after to get the next page. fields is a comma-separated list of columns to return",
+)
+async def get_all_ecosystems(
+    service: EcoSystemReadServiceDep,
+    fields: str | None = None,
+    order_by: PageOrder = "id",
+    after: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    return await service.get_all_ecosystems(fields, order_by, after, limit)
+
+
+@router.get(
+    "/summary",
+    description="Every ecosystem with its organisms and plants counted by type and its total biomass",
+)
+async def get_ecosystems_summary(service: EcoSystemReadServiceDep):
+    return await service.get_ecosystems_summary()
 
 
 @router.get("/{ecosystem_name_or_id}/organisms")
 async def get_all_ecosystem_organisms(
-    ecosystem_name_or_id: str, service: EcoSystemServiceDep
+    ecosystem_name_or_id: str,
+    service: EcoSystemReadServiceDep,
+    if_none_match: str | None = Header(None),
 ):
-    return await service.get_all_ecosystem_organisms(ecosystem_name_or_id)
+    return await service.get_all_ecosystem_organisms(
+        ecosystem_name_or_id, if_none_match
+    )
 
 
 @router.get("/{ecosystem_name_or_id}/plants")
 async def get_all_ecosystem_plants(
-    ecosystem_name_or_id: str, service: EcoSystemServiceDep
+    ecosystem_name_or_id: str,
+    service: EcoSystemReadServiceDep,
+    if_none_match: str | None = Header(None),
+):
+    return await service.get_all_ecosystem_plants(ecosystem_name_or_id, if_none_match)
+
+
+@router.get(
+    "/{ecosystem_name_or_id}/organisms/stream",
+    description="Every organism of the ecosystem as NDJSON (one per line), streamed as it is read, for ecosystems too large for a single JSON document",
+)
+async def stream_ecosystem_organisms(
+    ecosystem_name_or_id: str,
+    service: EcoSystemReadServiceDep,
+    if_none_match: str | None = Header(None),
+):
+    return await service.stream_ecosystem_organisms(ecosystem_name_or_id, if_none_match)
+
+
+@router.get(
+    "/{ecosystem_name_or_id}/plants/stream",
+    description="Every plant of the ecosystem as NDJSON (one per line), streamed as it is read, for ecosystems too large for a single JSON document",
+)
+async def stream_ecosystem_plants(
+    ecosystem_name_or_id: str,
+    service: EcoSystemReadServiceDep,
+    if_none_match: str | None = Header(None),
+):
+    return await service.stream_ecosystem_plants(ecosystem_name_or_id, if_none_match)
+
+
+@router.get(
+    "/{ecosystem_id}/export",
+    description="The ecosystem, its members, their species and the predation and pollination links between them, streamed as NDJSON. format=columnar writes one line per group of rows, with a list of values per column",
+)
+async def export_ecosystem(
+    ecosystem_id: str,
+    service: TransferReadServiceDep,
+    export_format: TransferFormat = Query("ndjson", alias="format"),
 ):
-    return await service.get_all_ecosystem_plants(ecosystem_name_or_id)
+    return await service.export_ecosystem(verify_uuid(ecosystem_id), export_format)
 
 
 @router.get(
     "/{ecosystem_id}/simulate", summary="3 cycles = 1 day, 9 cycles = 3 days = 1 year"
 )
-async def simulate(ecosystem_id: str, service: EcoSystemServiceDep, cycles: int = 1):
+async def simulate(
+    ecosystem_id: str,
+    service: EcoSystemServiceDep,
+    background_tasks: BackgroundTasks,
+    cycles: int = 1,
+):
     simulation_id = uuid4()
-    asyncio.create_task(
-        service.simulate(verify_uuid(ecosystem_id), simulation_id, cycles)
+    background_tasks.add_task(
+        service.simulate, verify_uuid(ecosystem_id), simulation_id, cycles
     )
     return {
         "message": (
@@ -53,7 +123,7 @@ async def simulate(ecosystem_id: str, service: EcoSystemServiceDep, cycles: int
 
 @router.get("/{simulation_id}")
 async def read_simulation(
-    service: EcoSystemServiceDep,
+    service: EcoSystemReadServiceDep,
     ecosystem_name: str,
     simulation_id: str,
     start: int | None = None,
@@ -64,6 +134,13 @@ async def read_simulation(
     )
 
 
+@router.get("/simulation/{simulation_id}/events")
+async def read_simulation_events(
+    simulation_id: str, actor: str, service: EcoSystemReadServiceDep
+):
+    return await service.read_simulation_events(verify_uuid(simulation_id), actor)
+
+
 @router.post("/create")
 async def create_eco_system(
     ecosystem: CreateEcoSystem,
@@ -73,6 +150,17 @@ async def create_eco_system(
     return await service.add(ecosystem, environment_type)
 
 
+@router.post(
+    "/import",
+    status_code=201,
+    description="Creates an ecosystem from an export (either format, read as it is uploaded). Species missing from the catalog are created, the others are matched by name. name overrides the ecosystem's name",
+)
+async def import_ecosystem(
+    request: Request, service: TransferServiceDep, name: str | None = None
+):
+    return await service.import_ecosystem(request, name)
+
+
 @router.post("/organism/add")
 async def add_organism_to_a_eco_system(
     organism_name: str, ecosystem_id: str, service: EcoSystemServiceDep
@@ -89,6 +177,17 @@ async def add_plant_to_a_eco_system(
     return await service.add_plant_to_a_ecosystem(verify_uuid(ecosystem_id), plant_name)
 
 
+@router.post(
+    "/{ecosystem_id}/seed",
+    status_code=201,
+    description='Adds many individuals at once from a composition such as {"Wolf": 500, "Oak": 2000}. Optionally randomizes each individual\'s age (between 0 and max_age) and health (within health_range); pass random_seed for a reproducible population',
+)
+async def seed_ecosystem(
+    ecosystem_id: str, seed: SeedEcoSystem, service: EcoSystemServiceDep
+):
+    return await service.seed_ecosystem(verify_uuid(ecosystem_id), seed)
+
+
 @router.patch("/organisms/{organism_name}/update")
 async def update_ecosystem_organism(
     ecosystem_id: str,
@@ -0,0 +1,14 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from app.api.utils.metrics import PROMETHEUS_MEDIA_TYPE, render_metrics
+
+router = APIRouter(tags=["Telemetry"])
+
+
+@router.get(
+    "/metrics",
+    summary="Request latency, database queries and simulation throughput of this worker, in the Prometheus text format",
+)
+async def metrics():
+    return Response(content=render_metrics(), media_type=PROMETHEUS_MEDIA_TYPE)
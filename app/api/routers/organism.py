@@ -1,13 +1,16 @@
 from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Header, Query, Request
 
-from app.api.dependencies import OrganismServiceDep
+from app.api.dependencies import OrganismReadServiceDep, OrganismServiceDep
 from app.api.schemas.organism import (
     CreateOrganism,
     UpdateOrganism,
 )
+from app.api.utils.bulk import read_bulk_body
+from app.api.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, PageOrder
+from app.api.utils.search import DEFAULT_SEARCH_LIMIT
 from app.api.utils.utils import verify_uuid
 from app.database.enums import (
     ActivityCycle,
@@ -23,15 +26,42 @@ router = APIRouter(prefix="/organism", tags=["Organism"])
 
 @router.get(
     "/all",
-    description="If detailed is True, will return all the information about the base organisms, else, just the names",
+    description="If detailed is True, will return all the information about the base organisms (or only the comma-separated fields), else, just the names. Paginated by keyset: pass the returned next_cursor as after to get the next page",
 )
-async def get_all_organisms(service: OrganismServiceDep, detailed: bool = False):
-    return await service.get_organisms(detailed)
+async def get_all_organisms(
+    service: OrganismReadServiceDep,
+    detailed: bool = False,
+    fields: str | None = None,
+    order_by: PageOrder = "id",
+    after: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    if_none_match: str | None = Header(None),
+):
+    return await service.get_organisms(
+        detailed, fields, order_by, after, limit, if_none_match
+    )
+
+
+@router.get(
+    "/all/stream",
+    description="Every base organism with all its information (or only the comma-separated fields) as NDJSON, one per line, streamed as it is read instead of paginated",
+)
+async def stream_all_organisms(
+    service: OrganismReadServiceDep,
+    fields: str | None = None,
+    if_none_match: str | None = Header(None),
+):
+    return await service.stream_organisms(fields, if_none_match)
 
 
 @router.get("/")
-async def get_organisms_by_name(search: str, service: OrganismServiceDep):
-    return await service.get_multiple_organisms_by_name(search)
+async def get_organisms_by_name(
+    search: str,
+    service: OrganismReadServiceDep,
+    limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_PAGE_SIZE),
+    if_none_match: str | None = Header(None),
+):
+    return await service.get_multiple_organisms_by_name(search, limit, if_none_match)
 
 
 @router.post("/create")
@@ -56,6 +86,15 @@ async def create_organism(
     )
 
 
+@router.post(
+    "/bulk",
+    status_code=201,
+    description="Creates many base organisms at once from a JSON array, or from NDJSON (one organism per line) with Content-Type application/x-ndjson. Each item takes the body of /organism/create plus type and diet_type (and optionally activity_cycle, speed, social_behavior, environment_type). Invalid items are reported by index in errors and the others are still created",
+)
+async def create_organisms_bulk(request: Request, service: OrganismServiceDep):
+    return await service.add_bulk(await read_bulk_body(request))
+
+
 @router.patch("/{organism_id}/update")
 async def update_organism(
     organism_id: UUID, update_infos: UpdateOrganism, service: OrganismServiceDep
@@ -1,9 +1,12 @@
 from typing import Optional
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Header, Query, Request
 
-from app.api.dependencies import PlantServiceDep
+from app.api.dependencies import PlantReadServiceDep, PlantServiceDep
 from app.api.schemas.plant import CreatePlant, UpdatePlant
+from app.api.utils.bulk import read_bulk_body
+from app.api.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, PageOrder
+from app.api.utils.search import DEFAULT_SEARCH_LIMIT
 from app.database.enums import EnvironmentType, PlantType
 
 router = APIRouter(prefix="/plant", tags=["Plants"])
@@ -11,15 +14,42 @@ router = APIRouter(prefix="/plant", tags=["Plants"])
 
 @router.get(
     "/all",
-    description="If detailed is True, will return all the information about the base plants, else, just the names",
+    description="If detailed is True, will return all the information about the base plants (or only the comma-separated fields), else, just the names. Paginated by keyset: pass the returned next_cursor as after to get the next page",
 )
-async def get_all_plants(service: PlantServiceDep, detailed: bool = False):
-    return await service.get_plants(detailed)
+async def get_all_plants(
+    service: PlantReadServiceDep,
+    detailed: bool = False,
+    fields: str | None = None,
+    order_by: PageOrder = "id",
+    after: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    if_none_match: str | None = Header(None),
+):
+    return await service.get_plants(
+        detailed, fields, order_by, after, limit, if_none_match
+    )
+
+
+@router.get(
+    "/all/stream",
+    description="Every base plant with all its information (or only the comma-separated fields) as NDJSON, one per line, streamed as it is read instead of paginated",
+)
+async def stream_all_plants(
+    service: PlantReadServiceDep,
+    fields: str | None = None,
+    if_none_match: str | None = Header(None),
+):
+    return await service.stream_plants(fields, if_none_match)
 
 
 @router.get("/")
-async def get_plants_by_name(search: str, service: PlantServiceDep):
-    return await service.get_multiple_plants_by_name(search)
+async def get_plants_by_name(
+    search: str,
+    service: PlantReadServiceDep,
+    limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_PAGE_SIZE),
+    if_none_match: str | None = Header(None),
+):
+    return await service.get_multiple_plants_by_name(search, limit, if_none_match)
 
 
 @router.post("/create")
@@ -32,6 +62,15 @@ async def create_plant(
     return await service.add(plant, type, environment_type)
 
 
+@router.post(
+    "/bulk",
+    status_code=201,
+    description="Creates many base plants at once from a JSON array, or from NDJSON (one plant per line) with Content-Type application/x-ndjson. Each item takes the body of /plant/create plus type (and optionally environment_type). Invalid items are reported by index in errors and the others are still created",
+)
+async def create_plants_bulk(request: Request, service: PlantServiceDep):
+    return await service.add_bulk(await read_bulk_body(request))
+
+
 @router.patch("/{plant_name_or_id}/update")
 async def update_plant(
     update_plant: UpdatePlant, plant_name_or_id: str, service: PlantServiceDep
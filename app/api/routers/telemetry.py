@@ -0,0 +1,31 @@
+from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
+
+from app.api.dependencies import SessionDep
+from app.database import session as database
+from app.database.engine import pool_status
+
+router = APIRouter(prefix="/telemetry", tags=["Telemetry"])
+
+
+@router.get(
+    "/database",
+    summary="Connection pool usage: connections in use, overflow, checkout waits and timeouts",
+)
+async def database_telemetry(session: SessionDep):
+    profile = database.engine_profile
+    content = {
+        "profile": profile.name if profile else None,
+        **pool_status(session.bind.sync_engine.pool),
+    }
+    if database.read_engine is not None:
+        content["read_pool"] = pool_status(database.read_engine.sync_engine.pool)
+    if database.replica_engines:
+        content["replica_pools"] = [
+            {
+                "url": replica.url.render_as_string(hide_password=True),
+                **pool_status(replica.sync_engine.pool),
+            }
+            for replica in database.replica_engines
+        ]
+    return ORJSONResponse(status_code=200, content=content)
@@ -1,5 +1,9 @@
+from typing import Optional
+
 from pydantic import BaseModel, Field, model_validator
 
+MAX_SEED_INDIVIDUALS = 100_000
+
 
 class BaseEcoSystem(BaseModel):
     name: str
@@ -30,3 +34,30 @@ class CreateEcoSystem(BaseEcoSystem):
 
 class UpdateEcoSystem(BaseEcoSystem):
     pass
+
+
+# Species name -> number of individuals, e.g. {"Wolf": 500, "Oak": 2000}
+class SeedEcoSystem(BaseModel):
+    composition: dict[str, int]
+    randomize_age: bool = False
+    health_range: Optional[tuple[float, float]] = None
+    random_seed: Optional[int] = None
+
+    @model_validator(mode="after")
+    def validate_composition(self):
+        if not self.composition:
+            raise ValueError("The composition needs at least one species.")
+        if any(count < 1 for count in self.composition.values()):
+            raise ValueError("Every species needs at least one individual.")
+        if sum(self.composition.values()) > MAX_SEED_INDIVIDUALS:
+            raise ValueError(
+                f"A seed can add at most {MAX_SEED_INDIVIDUALS} individuals."
+            )
+        if self.health_range:
+            minimum, maximum = self.health_range
+            if not 0 < minimum <= maximum <= 100:
+                raise ValueError(
+                    "The health range needs 0 < minimum <= maximum <= 100."
+                )
+
+        return self
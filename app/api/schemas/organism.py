@@ -2,6 +2,15 @@ from typing import Optional
 
 from pydantic import BaseModel, Field, model_validator
 
+from app.database.enums import (
+    ActivityCycle,
+    DietType,
+    EnvironmentType,
+    OrganismType,
+    SocialBehavior,
+    Speed,
+)
+
 
 class BaseOrganism(BaseModel):
     name: str
@@ -29,6 +38,16 @@ class CreateOrganism(BaseOrganism):
         return self
 
 
+# The query parameters of /organism/create travel with each item in bulk
+class BulkOrganism(CreateOrganism):
+    type: OrganismType
+    diet_type: DietType
+    activity_cycle: Optional[ActivityCycle] = None
+    speed: Optional[Speed] = None
+    social_behavior: Optional[SocialBehavior] = None
+    environment_type: Optional[EnvironmentType] = None
+
+
 class UpdateOrganism(BaseOrganism):
     name: str | None = None
     weight: float | None = None
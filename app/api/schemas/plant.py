@@ -2,6 +2,8 @@ from typing import Optional
 
 from pydantic import BaseModel, Field, model_validator
 
+from app.database.enums import EnvironmentType, PlantType
+
 
 class BasePlant(BaseModel):
     name: str
@@ -26,6 +28,12 @@ class CreatePlant(BasePlant):
         return self
 
 
+# The query parameters of /plant/create travel with each item in bulk
+class BulkPlant(CreatePlant):
+    type: PlantType
+    environment_type: Optional[EnvironmentType] = None
+
+
 class UpdatePlant(BasePlant):
     name: str | None = None
     weight: Optional[float] | None = None
@@ -1,15 +1,21 @@
-import json
 import random
-import zlib
-from typing import List
+import time
+from typing import List, Literal
 from uuid import UUID, uuid4
 
 from fastapi import Response
-from fastapi.encoders import jsonable_encoder
-from fastapi.responses import JSONResponse
-from sqlalchemy import func, select
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import (
+    String,
+    cast,
+    delete,
+    func,
+    literal,
+    or_,
+    select,
+    union_all,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.api.exceptions.exceptions import (
     BLANK_UPDATE_FIELDS_ERROR,
@@ -18,7 +24,10 @@ from app.api.exceptions.exceptions import (
     RESOURCE_NAME_ALREADY_EXISTS_ERROR,
     RESOURCE_NAME_NOT_FOUND_ERROR,
     RESOURCE_NOT_FOUND_IN_RELATIONSHIP_ERROR,
+    SIMULATION_NOT_EXISTS_ERROR,
+    SPECIES_NOT_FOUND_ERROR,
 )
+from app.api.interactions.food_web import load_food_web, species_of
 from app.api.interactions.interaction_functions import (
     collect_and_transport_nectar,
     drink_water,
@@ -29,11 +38,51 @@ from app.api.interactions.interaction_functions import (
 )
 from app.api.schemas.ecosystem import (
     CreateEcoSystem,
+    SeedEcoSystem,
     UpdateEcoSystem,
 )
 from app.api.schemas.organism import UpdateEcosystemOrganism
 from app.api.schemas.plant import UpdateEcosystemPlant
-from app.api.utils.utils import make_json_serializable
+from app.api.utils.bulk import (
+    insert_in_batches,
+    insert_missing_links,
+    resolve_template_names,
+    split_names,
+)
+from app.api.utils.cache import catalog_cache
+from app.api.utils.etag import (
+    etag_matches,
+    make_etag,
+    not_modified,
+    touch_ecosystems_holding,
+)
+from app.api.utils.events import (
+    SimulationEventLog,
+    day_number,
+    decompress_json,
+)
+from app.api.utils.metrics import (
+    SIMULATION_BIRTHS,
+    SIMULATION_COMMIT_DURATION,
+    SIMULATION_CYCLE_DURATION,
+    SIMULATION_CYCLES,
+    SIMULATION_CYCLES_PER_SECOND,
+    SIMULATION_DEATHS,
+    SIMULATION_ORGANISMS_PROCESSED,
+)
+from app.api.utils.pagination import (
+    DEFAULT_PAGE_SIZE,
+    PageOrder,
+    paginate,
+    parse_fields,
+)
+from app.api.utils.streaming import ndjson_response
+from app.api.utils.utils import (
+    column_keys,
+    entity_to_dict,
+    individual_to_dict,
+    rows_to_dicts,
+)
 from app.database.enums import (
     ActivityCycle,
     EnvironmentType,
@@ -41,84 +90,219 @@ from app.database.enums import (
     SimulationStatus,
 )
 from app.database.interactions_list import ACTIONS_BY_ORGANISM_TYPE
-from app.database.models import Ecosystem, Organism, Plant, Simulation
+from app.database.loaders import ECOSYSTEM_MEMBERS
+from app.database.models import (
+    ORGANISM_VIEW,
+    PLANT_VIEW,
+    Ecosystem,
+    Organism,
+    OrganismIndividual,
+    Plant,
+    PlantIndividual,
+    PollinationLink,
+    Simulation,
+    SimulationChunk,
+    SimulationEventIndex,
+    new_organism_individual,
+    new_plant_individual,
+)
+from app.database.persistence import write_back
 from app.database.session import get_sessionmaker
+from app.database.statements import (
+    ORGANISM_TEMPLATE_BY_NAME,
+    PLANT_TEMPLATE_BY_NAME,
+    TOUCH_ECOSYSTEM,
+    ecosystem_by_id,
+)
 
 
 class EcoSystemService:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def get(self, ecosystem_id: UUID):
+    async def get(self, ecosystem_id: UUID, options: tuple = ECOSYSTEM_MEMBERS):
         ecosystem = await self.session.scalar(
-            select(Ecosystem)
-            .where(Ecosystem.id == ecosystem_id)
-            .options(
-                selectinload(Ecosystem.organisms).selectinload(Organism.prey),
-                selectinload(Ecosystem.organisms).selectinload(Organism.predator),
-                selectinload(Ecosystem.organisms).selectinload(
-                    Organism.pollination_target
-                ),
-                selectinload(Ecosystem.plants).selectinload(Plant.pollinators),
-            )
+            ecosystem_by_id(options), {"ecosystem_id": ecosystem_id}
         )
 
         return ecosystem
 
-    async def get_all_ecosystems(self):
-        query = await self.session.scalars(select(Ecosystem))
-        ecosystems = query.all()
-        return JSONResponse(
-            status_code=200, content=jsonable_encoder({"ecosystems": ecosystems})
+    async def get_all_ecosystems(
+        self,
+        fields: str | None = None,
+        order_by: PageOrder = "id",
+        after: str | None = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ):
+        ecosystems, next_cursor = await paginate(
+            self.session,
+            Ecosystem,
+            parse_fields(Ecosystem, fields),
+            order_by,
+            after,
+            limit,
+        )
+        return ORJSONResponse(
+            status_code=200,
+            content={"ecosystems": ecosystems, "next_cursor": next_cursor},
+        )
+
+    async def get_ecosystems_summary(self):
+        members = union_all(
+            select(
+                ORGANISM_VIEW.c.ecosystem_id.label("ecosystem_id"),
+                literal("organisms").label("kind"),
+                cast(ORGANISM_VIEW.c.type, String).label("type"),
+                ORGANISM_VIEW.c.weight.label("weight"),
+            ),
+            select(
+                PLANT_VIEW.c.ecosystem_id,
+                literal("plants"),
+                cast(PLANT_VIEW.c.type, String),
+                PLANT_VIEW.c.weight,
+            ),
+        ).subquery()
+        counts = (
+            select(
+                members.c.ecosystem_id,
+                members.c.kind,
+                members.c.type,
+                func.count().label("count"),
+                func.coalesce(func.sum(members.c.weight), 0).label("biomass"),
+            )
+            .group_by(members.c.ecosystem_id, members.c.kind, members.c.type)
+            .subquery()
+        )
+        ecosystem_columns = Ecosystem.__table__.columns
+        query = await self.session.execute(
+            select(
+                *ecosystem_columns,
+                counts.c.kind,
+                counts.c.type,
+                counts.c.count,
+                counts.c.biomass,
+            )
+            .outerjoin(counts, counts.c.ecosystem_id == Ecosystem.id)
+            .order_by(Ecosystem.name)
         )
 
-    async def get_all_ecosystem_organisms(self, ecosystem_name_or_id: str):
+        summaries = {}
+        for row in query.mappings():
+            summary = summaries.get(row["id"])
+            if summary is None:
+                summary = summaries[row["id"]] = {
+                    **{column.key: row[column.key] for column in ecosystem_columns},
+                    "total_organisms": 0,
+                    "total_plants": 0,
+                    "organisms_by_type": {},
+                    "plants_by_type": {},
+                    "total_biomass": 0,
+                }
+            if row["kind"]:
+                summary[f"{row['kind']}_by_type"][row["type"]] = row["count"]
+                summary[f"total_{row['kind']}"] += row["count"]
+                summary["total_biomass"] += row["biomass"]
+
+        return ORJSONResponse(
+            status_code=200,
+            content={"ecosystems": list(summaries.values())},
+        )
+
+    async def get_ecosystem_version_by_name_or_id(self, ecosystem_name_or_id: str):
         try:
             valid_uuid = UUID(ecosystem_name_or_id)
         except (ValueError, TypeError):
             valid_uuid = None
-        ecosystem = await self.session.execute(
-            select(Ecosystem).where(
-                (Ecosystem.name == ecosystem_name_or_id or Ecosystem.id == valid_uuid)
+        query = await self.session.execute(
+            select(Ecosystem.id, Ecosystem.version).where(
+                or_(Ecosystem.name == ecosystem_name_or_id, Ecosystem.id == valid_uuid)
                 if valid_uuid
                 else Ecosystem.name == ecosystem_name_or_id
             )
         )
-        ecosystem = ecosystem.scalar_one_or_none()
+        ecosystem = query.first()
         if not ecosystem:
             raise RESOURCE_ID_NOT_FOUND_ERROR("ecosystem")
-        return JSONResponse(
+        return ecosystem.id, ecosystem.version
+
+    async def get_all_ecosystem_organisms(
+        self, ecosystem_name_or_id: str, if_none_match: str | None = None
+    ):
+        ecosystem_id, version = await self.get_ecosystem_version_by_name_or_id(
+            ecosystem_name_or_id
+        )
+        etag = make_etag("ecosystem", ecosystem_id, version)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+        organisms = await self.session.execute(
+            select(ORGANISM_VIEW).where(ORGANISM_VIEW.c.ecosystem_id == ecosystem_id)
+        )
+        return ORJSONResponse(
             status_code=200,
-            content=jsonable_encoder({"all_organisms": ecosystem.organisms}),
+            content={"all_organisms": rows_to_dicts(organisms)},
+            headers={"ETag": etag},
         )
 
-    async def get_all_ecosystem_plants(self, ecosystem_name_or_id: str):
-        try:
-            valid_uuid = UUID(ecosystem_name_or_id)
-        except (ValueError, TypeError):
-            valid_uuid = None
-        ecosystem = await self.session.execute(
-            select(Ecosystem).where(
-                (Ecosystem.name == ecosystem_name_or_id or Ecosystem.id == valid_uuid)
-                if valid_uuid
-                else Ecosystem.name == ecosystem_name_or_id
-            )
+    async def get_all_ecosystem_plants(
+        self, ecosystem_name_or_id: str, if_none_match: str | None = None
+    ):
+        ecosystem_id, version = await self.get_ecosystem_version_by_name_or_id(
+            ecosystem_name_or_id
         )
-        ecosystem = ecosystem.scalar_one_or_none()
-        return JSONResponse(
+        etag = make_etag("ecosystem", ecosystem_id, version)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+        plants = await self.session.execute(
+            select(PLANT_VIEW).where(PLANT_VIEW.c.ecosystem_id == ecosystem_id)
+        )
+        return ORJSONResponse(
             status_code=200,
-            content=jsonable_encoder({"all_plants": ecosystem.plants}),
+            content={"all_plants": rows_to_dicts(plants)},
+            headers={"ETag": etag},
         )
 
-    async def get_pollination_targets_in_the_ecosystem(
-        self, organism: Organism, ecosystem: Ecosystem
+    # NDJSON, one member per line, read with a server-side cursor
+    async def stream_ecosystem_members(
+        self, view, ecosystem_name_or_id: str, if_none_match: str | None = None
     ):
-        pollination_targets_in_the_ecosystem = []
-        for target in organism.pollination_target:
-            for plant in ecosystem.plants:
-                if plant.name == target.name:
-                    pollination_targets_in_the_ecosystem.append(plant)
-        return pollination_targets_in_the_ecosystem
+        ecosystem_id, version = await self.get_ecosystem_version_by_name_or_id(
+            ecosystem_name_or_id
+        )
+        etag = make_etag("ecosystem", ecosystem_id, version)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        return ndjson_response(
+            self.session,
+            select(view).where(view.c.ecosystem_id == ecosystem_id).order_by(view.c.id),
+            headers={"ETag": etag},
+        )
+
+    async def stream_ecosystem_organisms(
+        self, ecosystem_name_or_id: str, if_none_match: str | None = None
+    ):
+        return await self.stream_ecosystem_members(
+            ORGANISM_VIEW, ecosystem_name_or_id, if_none_match
+        )
+
+    async def stream_ecosystem_plants(
+        self, ecosystem_name_or_id: str, if_none_match: str | None = None
+    ):
+        return await self.stream_ecosystem_members(
+            PLANT_VIEW, ecosystem_name_or_id, if_none_match
+        )
+
+    # Without loading the ecosystem, for the writes that only need its ID
+    async def check_ecosystem_exists(self, ecosystem_id: UUID):
+        if not await self.session.scalar(
+            select(Ecosystem.id).where(Ecosystem.id == ecosystem_id)
+        ):
+            raise RESOURCE_ID_NOT_FOUND_ERROR("ecosystem")
+
+    # Evaluated by the database, so concurrent writers never reuse a version
+    async def touch(self, ecosystem_id: UUID):
+        await self.session.execute(TOUCH_ECOSYSTEM, {"ecosystem_id": ecosystem_id})
 
     async def add(
         self, ecosystem: CreateEcoSystem, environment_type: EnvironmentType | None
@@ -134,15 +318,15 @@ class EcoSystemService:
         )
         self.session.add(new_eco_system)
         await self.session.commit()
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=201,
-            content=jsonable_encoder({"ecosystem_created": new_eco_system}),
+            content={"ecosystem_created": entity_to_dict(new_eco_system)},
         )
 
     async def update_ecosystem(
         self, ecosystem_id: UUID, update_ecosystem: UpdateEcoSystem
     ):
-        ecosystem = await self.get(ecosystem_id)
+        ecosystem = await self.get(ecosystem_id, options=())
         updates = {}
         for key, value in update_ecosystem.model_dump().items():
             if value:
@@ -151,312 +335,385 @@ class EcoSystemService:
             raise BLANK_UPDATE_FIELDS_ERROR()
         for key, value in updates.items():
             setattr(ecosystem, key, value)
+        await self.touch(ecosystem.id)
         await self.session.commit()
         await self.session.refresh(ecosystem)
-        return JSONResponse(
-            status_code=200, content=jsonable_encoder({"updated_ecosystem": ecosystem})
+        return ORJSONResponse(
+            status_code=200,
+            content={"updated_ecosystem": entity_to_dict(ecosystem)},
         )
 
     async def extract_organism_by_name(self, name: str):
-        organism = await self.session.execute(
-            select(Organism)
-            .where((Organism.name == name) & (Organism.ecosystem_id.is_(None)))
-            .options(selectinload(Organism.prey), selectinload(Organism.predator))
-        )
+        organism = await self.session.execute(ORGANISM_TEMPLATE_BY_NAME, {"name": name})
         return organism.scalar_one_or_none()
 
-    async def extract_organisms_from_a_specific_ecosystem_by_name(
-        self, ecosystem_id: UUID, name: str
-    ):
-        ecosystem = await self.session.execute(
-            select(Ecosystem).where(Ecosystem.id == ecosystem_id)
-        )
-        ecosystem = ecosystem.scalar_one_or_none()
-        if ecosystem:
-            organisms = [
-                organism for organism in ecosystem.organisms if organism.name == name
-            ]
-        return organisms
-
-    async def extract_plants_from_a_specific_ecosystem_by_name(
-        self, ecosystem_id: UUID, name: str
-    ):
-        ecosystem = await self.session.execute(
-            select(Ecosystem).where(Ecosystem.id == ecosystem_id)
+    # Name -> species with individuals in the ecosystem, for every name in one
+    # query
+    async def species_in_the_ecosystem(
+        self, individual, species, ecosystem_id: UUID, names: list[str]
+    ) -> dict[str, set[UUID]]:
+        rows = await self.session.execute(
+            select(species.name, individual.species_id)
+            .distinct()
+            .join(individual.species)
+            .where(individual.ecosystem_id == ecosystem_id, species.name.in_(names))
         )
-        ecosystem = ecosystem.scalar_one_or_none()
-        if ecosystem:
-            plants = [
-                organism for organism in ecosystem.plants if organism.name == name
-            ]
-        return plants
+        found = {}
+        for name, species_id in rows.tuples():
+            found.setdefault(name, set()).add(species_id)
+        return found
 
     async def extract_plant_by_name(self, name: str):
-        plant = await self.session.scalars(select(Plant).where(Plant.name == name))
+        plant = await self.session.scalars(PLANT_TEMPLATE_BY_NAME, {"name": name})
         return plant.first()
 
-    async def convert_pollination_target_to_plant(
-        self, pollination_target
-    ) -> List[Plant]:
-        targets = []
-        for target in pollination_target:
-            plant = await self.session.execute(
-                select(Plant).where(Plant.name == target)
-            )
-            plant = plant.scalar_one_or_none()
-            if plant:
-                targets.append(plant)
-        return targets
-
     async def add_plant_to_a_ecosystem(
-        self, ecosystem_id: UUID, plant_name: str, return_json: bool = True
+        self,
+        ecosystem_id: UUID,
+        plant_name: str,
+        return_json: bool = True,
+        commit: bool = True,
     ):
-        ecosystem = await self.get(ecosystem_id)
+        await self.check_ecosystem_exists(ecosystem_id)
 
         plant = await self.extract_plant_by_name(plant_name)
 
         if not plant:
             raise RESOURCE_NAME_NOT_FOUND_ERROR("plant")
 
-        new_plant_to_this_ecosystem = Plant(
-            **plant.model_dump(exclude=["id", "health", "age"]), id=uuid4()
-        )
-        ecosystem.plants.append(new_plant_to_this_ecosystem)
-        await self.session.commit()
+        new_plant_to_this_ecosystem = new_plant_individual(plant)
+        new_plant_to_this_ecosystem.ecosystem_id = ecosystem_id
+        self.session.add(new_plant_to_this_ecosystem)
+        await self.touch(ecosystem_id)
+        if commit:
+            await self.session.commit()
         if return_json:
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=201,
-                content=jsonable_encoder(
-                    {"added_to_ecosystem": new_plant_to_this_ecosystem}
-                ),
+                content={
+                    "added_to_ecosystem": individual_to_dict(
+                        new_plant_to_this_ecosystem
+                    )
+                },
             )
 
     async def add_organism_to_a_eco_system(
-        self, ecosystem_id: UUID, organism_name: str, return_json: bool = True
+        self,
+        ecosystem_id: UUID,
+        organism_name: str,
+        return_json: bool = True,
+        commit: bool = True,
     ):
-        ecosystem = await self.get(ecosystem_id)
+        await self.check_ecosystem_exists(ecosystem_id)
 
         organism = await self.extract_organism_by_name(organism_name)
 
         if not organism:
             raise RESOURCE_NAME_NOT_FOUND_ERROR("organism")
 
-        new_organism_to_this_ecosystem = Organism(
-            **organism.model_dump(exclude=["id"]),
-            id=uuid4(),
-            pollination_target=organism.pollination_target,
-            prey=organism.prey,
-            predator=organism.predator,
-        )
-        ecosystem.organisms.append(new_organism_to_this_ecosystem)
-        await self.session.commit()
+        new_organism_to_this_ecosystem = new_organism_individual(organism)
+        new_organism_to_this_ecosystem.ecosystem_id = ecosystem_id
+        self.session.add(new_organism_to_this_ecosystem)
+        await self.touch(ecosystem_id)
+        if commit:
+            await self.session.commit()
         if return_json:
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=201,
-                content=jsonable_encoder(
-                    {"added_to_ecosystem": new_organism_to_this_ecosystem}
-                ),
+                content={
+                    "added_to_ecosystem": individual_to_dict(
+                        new_organism_to_this_ecosystem
+                    )
+                },
             )
 
-    async def update_ecosystem_organism(
-        self, ecosystem_id, organism_name, updated_organism: UpdateEcosystemOrganism
-    ):
-        ecosystem = await self.get(ecosystem_id)
-        organisms = await self.extract_organisms_from_a_specific_ecosystem_by_name(
-            ecosystem.id, organism_name
-        )
-        if not ecosystem:
-            raise RESOURCE_ID_NOT_FOUND_ERROR("ecosystem")
-        if not organisms:
-            raise RESOURCE_NOT_FOUND_IN_RELATIONSHIP_ERROR(
-                one="ecosystem", many="orgnaism"
+    # Creates the individuals of the composition with a handful of executemany
+    # INSERTs instead of one request (and graph load) per individual. Their
+    # links come from the species, so no link rows are written
+    async def seed_ecosystem(self, ecosystem_id: UUID, seed: SeedEcoSystem):
+        await self.check_ecosystem_exists(ecosystem_id)
+
+        names = {name.lower(): name for name in seed.composition}
+        templates = {}
+        for model in (Organism, Plant):
+            query = await self.session.execute(
+                select(*model.__table__.columns).where(
+                    model.ecosystem_id.is_(None),
+                    func.lower(model.name).in_(names),
+                )
             )
+            for template in rows_to_dicts(query):
+                templates.setdefault(template["name"].lower(), (model, template))
+        unknown = [name for key, name in names.items() if key not in templates]
+        if unknown:
+            raise SPECIES_NOT_FOUND_ERROR(unknown)
+
+        rng = random.Random(seed.random_seed)
+        organisms, plants = [], []
+        seeded = {}
+        for key, name in names.items():
+            model, template = templates[key]
+            individual_model = PlantIndividual if model is Plant else OrganismIndividual
+            count = seed.composition[name]
+            seeded[template["name"]] = count
+            # Individuals start with the template's state
+            base = {
+                **{
+                    column: template[column]
+                    for column in column_keys(individual_model)
+                    if column in template
+                },
+                "ecosystem_id": ecosystem_id,
+                "species_id": template["id"],
+            }
+            if model is Plant:
+                # Like /ecosystem/plant/add, plants start with fresh age and health
+                del base["age"], base["health"]
+            for _ in range(count):
+                individual = {**base, "id": uuid4()}
+                if seed.randomize_age:
+                    individual["age"] = round(
+                        rng.uniform(0, template["max_age"] or 0), 2
+                    )
+                if seed.health_range:
+                    individual["health"] = round(rng.uniform(*seed.health_range), 2)
+                (plants if model is Plant else organisms).append(individual)
 
-        updated_fields = {}
-        for key, value in updated_organism.model_dump().items():
-            if value:
-                updated_fields[key] = value
+        await insert_in_batches(self.session, OrganismIndividual, organisms)
+        await insert_in_batches(self.session, PlantIndividual, plants)
+        await self.touch(ecosystem_id)
+        await self.session.commit()
 
-        for field in updated_fields:
-            entities_to_add = (
-                updated_fields[field].split(",")
-                if "," in updated_fields[field]
-                else [updated_fields[field]]
-            )
-            for entity in entities_to_add:
-                if field == "pollination_target":
-                    entities_in_the_ecosystem = (
-                        await self.extract_plants_from_a_specific_ecosystem_by_name(
-                            ecosystem_id, entity
-                        )
-                    )
+        return ORJSONResponse(
+            status_code=201,
+            content={
+                "seeded": seeded,
+                "organisms_added": len(organisms),
+                "plants_added": len(plants),
+            },
+        )
 
-                else:
-                    entities_in_the_ecosystem = (
-                        await self.extract_organisms_from_a_specific_ecosystem_by_name(
-                            ecosystem_id, entity
-                        )
-                    )
-                if entities_in_the_ecosystem:
-                    for organism in organisms:
-                        list_entities = getattr(organism, field)
-                        for entity_in_the_ecosystem in entities_in_the_ecosystem:
-                            list_entities.append(entity_in_the_ecosystem)
-                    await self.session.commit()
-        return JSONResponse(
+    # Links are stored between species, so this links every ecosystem of the
+    # species and not only the individuals of this one (see link_pollination)
+    async def update_ecosystem_organism(
+        self, ecosystem_id, organism_name, updated_organism: UpdateEcosystemOrganism
+    ):
+        await self.link_pollination(
+            ecosystem_id,
+            pollinators=[organism_name],
+            plants=split_names(updated_organism.pollination_target),
+            member="organism",
+        )
+        return ORJSONResponse(
             status_code=200, content={"message": f"Organism {organism_name} updated."}
         )
 
     async def update_ecosystem_plant(
         self, ecosystem_id, plant_name, updated_plant: UpdateEcosystemPlant
     ):
-        ecosystem = await self.get(ecosystem_id)
-        plants = await self.extract_plants_from_a_specific_ecosystem_by_name(
-            ecosystem.id, plant_name
+        await self.link_pollination(
+            ecosystem_id,
+            pollinators=split_names(updated_plant.pollinators),
+            plants=[plant_name],
+            member="plant",
+        )
+        return ORJSONResponse(
+            status_code=200, content={"message": f"Plant {plant_name} updated."}
         )
-        if not ecosystem:
-            raise RESOURCE_ID_NOT_FOUND_ERROR("ecosystem")
 
-        if not plants:
-            raise RESOURCE_NOT_FOUND_IN_RELATIONSHIP_ERROR(
-                one="ecosystem", many="plant"
+    # One query per kind for all the names, then the missing links inserted in
+    # bulk within a single transaction. The links belong to the catalog, so the
+    # catalog and every ecosystem holding a linked species get a new version.
+    async def link_pollination(
+        self,
+        ecosystem_id: UUID,
+        pollinators: list[str],
+        plants: list[str],
+        member: Literal["organism", "plant"],
+    ):
+        if not await self.session.scalar(
+            select(Ecosystem.id).where(Ecosystem.id == ecosystem_id)
+        ):
+            raise RESOURCE_ID_NOT_FOUND_ERROR("ecosystem")
+        found_pollinators = await self.species_in_the_ecosystem(
+            OrganismIndividual, Organism, ecosystem_id, pollinators
+        )
+        pollinator_species = set().union(*found_pollinators.values())
+        plant_species = set().union(
+            *(
+                await self.species_in_the_ecosystem(
+                    PlantIndividual, Plant, ecosystem_id, plants
+                )
+            ).values()
+        )
+        if not (pollinator_species if member == "organism" else plant_species):
+            raise RESOURCE_NOT_FOUND_IN_RELATIONSHIP_ERROR(one="ecosystem", many=member)
+        # A plant's pollinators don't have to live in the ecosystem, the names
+        # without individuals there are looked up in the catalog
+        if member == "plant":
+            missing = {
+                name.lower() for name in pollinators if name not in found_pollinators
+            }
+            if missing:
+                templates = await resolve_template_names(
+                    self.session, Organism, missing
+                )
+                pollinator_species |= set(templates.values())
+
+        links = await insert_missing_links(
+            self.session,
+            PollinationLink,
+            {
+                (pollinator, plant)
+                for pollinator in pollinator_species
+                for plant in plant_species
+            },
+        )
+        if links:
+            await touch_ecosystems_holding(
+                self.session, OrganismIndividual, {link[0] for link in links}
             )
-
-        updated_fields = {}
-        for key, value in updated_plant.model_dump().items():
-            if value:
-                updated_fields[key] = value
-
-        for field in updated_fields:
-            entities_to_add = (
-                updated_fields[field].split(",")
-                if "," in updated_fields[field]
-                else updated_fields[field]
+            await touch_ecosystems_holding(
+                self.session, PlantIndividual, {link[1] for link in links}
             )
-
-            for entity in entities_to_add:
-                if field == "pollinators":
-                    entities_in_the_ecosystem = await self.extract_organism_by_name(
-                        entity
-                    )
-
-                else:
-                    entities_in_the_ecosystem = (
-                        await self.extract_plants_from_a_specific_ecosystem_by_name(
-                            ecosystem_id, entity
-                        )
-                    )
-                if entities_in_the_ecosystem:
-                    for plant in plants:
-                        list_entities = getattr(plant, field)
-                        for entity_in_the_ecosystem in entities_in_the_ecosystem:
-                            list_entities.append(entity_in_the_ecosystem)
-                    await self.session.commit()
-        return JSONResponse(
-            status_code=200, content={"message": f"Plant {plant_name} updated."}
-        )
+            await self.session.commit()
+            await catalog_cache.bump(self.session)
 
     async def simulate(self, ecosystem_id: UUID, simulation_id: UUID, cycles: int = 1):
+        # Runs as a background task, so it can't share the request session
         async_session = get_sessionmaker()
-        async with async_session() as session:
-            simulate_session = session
-        ecosystem = await self.get(ecosystem_id)
+        async with async_session() as simulate_session:
+            await EcoSystemService(simulate_session).run_simulation(
+                ecosystem_id, simulation_id, cycles
+            )
+
+    # Returns the food obtained, the prey is anyone but the attacker
+    def hunt(self, log, day, attacker, organisms, food_web) -> int:
+        candidates = [organism for organism in organisms if organism is not attacker]
+        if not candidates:
+            log.add(day, {f"No prey found for {attacker.name}."}, attacker)
+            return 0
+        deffender = random.choice(candidates)
+        log.add(day, hunt_prey(attacker, deffender, food_web), attacker, deffender)
+        if deffender.health <= 0:
+            return random.randint(0, int(deffender.weight // 2))
+        return 0
+
+    # Deletes a dead member and takes it out of the members of the cycle, so
+    # later cycles neither process nor delete it again
+    async def remove_dead(self, log, day, member, members: list):
+        log.add(day, await self.death_cause_and_delete_organism(member), member)
+        members.remove(member)
+
+    async def run_simulation(
+        self, ecosystem_id: UUID, simulation_id: UUID, cycles: int = 1
+    ):
+        ecosystem = await self.get(ecosystem_id, options=ECOSYSTEM_MEMBERS)
         if not ecosystem:
             raise RESOURCE_ID_NOT_FOUND_ERROR("ecosystem")
         ecosystem.simulation_status = SimulationStatus.finished
-        await simulate_session.commit()
-        await simulate_session.refresh(ecosystem)
+        await self.touch(ecosystem.id)
+        await self.session.commit()
+        await self.session.refresh(ecosystem, ["simulation_status"])
 
         if ecosystem.simulation_status == SimulationStatus.processing:
             raise ECOSYSTEM_ALREADY_IN_SIMULATION_ERROR(ecosystem.name)
 
-        results = {}
-        organisms: List[Organism] = ecosystem.organisms
-        plants: List[Plant] = ecosystem.plants
+        log = SimulationEventLog()
+        organisms: List[OrganismIndividual] = ecosystem.organisms
+        plants: List[PlantIndividual] = ecosystem.plants
+        food_web = await load_food_web(
+            self.session, {species_of(organism) for organism in organisms}
+        )
+        # Inserted with the commit below, the chunks of the days reference it
+        self.session.add(
+            Simulation(simulation_id=simulation_id, ecosystem_id=ecosystem_id)
+        )
+        # Ends the transaction of the loads above. A cycle issues no query until
+        # it's written back, so the writer (the only connection of the embedded
+        # profile) is only held for the write back and commit of each cycle.
+        await self.session.commit()
 
         if not cycles or cycles <= 0:
             cycles = 1
+        run_started = time.perf_counter()
+        completed_cycles = 0
         for _ in range(cycles):
+            cycle_started = time.perf_counter()
             ecosystem.simulation_status = SimulationStatus.processing
-            n = ecosystem.days
-            results[f"day {n + 1}"] = []
+            day = f"day {ecosystem.days + 1}"
+            log.open_day(day)
             if not organisms:
-                results[f"day {n + 1}"].append(
+                log.add(
+                    day,
                     {
                         "This is the end": "No organisms found in the ecosystem, you reach the end."
-                    }
+                    },
                 )
                 ecosystem.simulation_status = SimulationStatus.finished
                 break
-            for organism in organisms:
+            # Iterates over a copy, the dead leave the ecosystem right away (see
+            # remove_dead)
+            for organism in list(organisms):
+                SIMULATION_ORGANISMS_PROCESSED.inc()
                 food_consumed = 0
                 possible_interactions = ACTIONS_BY_ORGANISM_TYPE[organism.type]
                 actions = random.sample(possible_interactions, 2)
                 for action in actions:
                     if action == "rest":
-                        results[f"day {n + 1}"].append(rest(organism))
+                        log.add(day, rest(organism), organism)
 
                     if (
                         action == "reproduce"
                         and organism.age >= organism.reproduction_age
                     ):
                         if not organism.pregnant:
-                            organism_to_reproduce = await simulate_session.scalars(
-                                select(Organism).where(
-                                    Organism.name == organism.name,
-                                    Organism.id != organism.id,
-                                    Organism.pregnant.is_(False),
-                                )
-                            )
-                            organism_to_reproduce = organism_to_reproduce.all()
+                            # Every member is loaded, no need to ask the database
+                            organism_to_reproduce = [
+                                partner
+                                for partner in organisms
+                                if partner.species_id == organism.species_id
+                                and partner.id != organism.id
+                                and not partner.pregnant
+                            ]
                             if organism_to_reproduce:
-                                results[f"day {n + 1}"].append(
-                                    reproduce(organism_to_reproduce)
-                                )
+                                log.add(day, reproduce(organism_to_reproduce), organism)
                             else:
-                                results[f"day {n + 1}"].append(
-                                    {f"No partner has been found to {organism.name}."}
+                                log.add(
+                                    day,
+                                    {f"No partner has been found to {organism.name}."},
+                                    organism,
                                 )
                         else:
                             organism.pregnant = False
-                            await self.add_organism_to_a_eco_system(
-                                ecosystem.id, organism.name, False
-                            )
-                            results[f"day {n + 1}"].append(
-                                {f"A new {organism.name} has born!"}
-                            )
+                            organisms.append(new_organism_individual(organism.species))
+                            SIMULATION_BIRTHS.inc(kind="organism")
+                            log.add(day, {f"A new {organism.name} has born!"}, organism)
 
                     if action == "drink_water":
-                        results[f"day {n + 1}"].append(drink_water(ecosystem, organism))
+                        log.add(day, drink_water(ecosystem, organism), organism)
 
                     if organism.type == OrganismType.predator:
                         if action == "hunt_prey":
-                            attacker = organism
-                            deffender = random.choice(organisms)
-                            while deffender == attacker:
-                                deffender = random.choice(organisms)
-                            results[f"day {n + 1}"].append(
-                                hunt_prey(attacker, deffender)
+                            food_consumed += self.hunt(
+                                log, day, organism, organisms, food_web
                             )
-                            if deffender.health <= 0:
-                                food_consumed += random.randint(
-                                    0, int(deffender.weight // 2)
-                                )
 
                     elif organism.type == OrganismType.herbivore:
                         if action == "graze_plants":
                             pollination_targets_in_the_ecosystem = (
-                                await self.get_pollination_targets_in_the_ecosystem(
-                                    organism, ecosystem
-                                )
+                                food_web.pollination_targets(organism, plants)
                             )
                             pollination_target = (
                                 random.choice(pollination_targets_in_the_ecosystem)
                                 if pollination_targets_in_the_ecosystem
                                 else None
                             )
-                            results[f"day {n + 1}"].append(
-                                graze_plants(pollination_target, organism)
+                            log.add(
+                                day,
+                                graze_plants(pollination_target, organism),
+                                organism,
+                                pollination_target,
                             )
 
                     elif organism.type == OrganismType.omnivore:
@@ -464,48 +721,41 @@ class EcoSystemService:
                             action = random.choice(["hunt_prey", "graze_plants"])
                             match action:
                                 case "hunt_prey":
-                                    attacker = organism
-                                    deffender = random.choice(organisms)
-                                    while deffender == attacker:
-                                        deffender = random.choice(organisms)
-                                    results[f"day {n + 1}"].append(
-                                        hunt_prey(organism, deffender)
+                                    food_consumed += self.hunt(
+                                        log, day, organism, organisms, food_web
                                     )
-                                    if deffender.health <= 0:
-                                        food_consumed += random.randint(
-                                            0, int(deffender.weight // 2)
-                                        )
                                 case "graze_plants":
-                                    targets = (
-                                        await self.convert_pollination_target_to_plant(
-                                            organism.pollination_target
-                                        )
+                                    targets = food_web.pollination_targets(
+                                        organism, plants
                                     )
                                     if not targets:
-                                        results[f"day {n + 1}"].append(
+                                        log.add(
+                                            day,
                                             {
                                                 f"No pollinators found for {organism.name}"
-                                            }
+                                            },
+                                            organism,
                                         )
                                     else:
-                                        results[f"day {n + 1}"].append(
-                                            graze_plants(targets, organism)
+                                        log.add(
+                                            day,
+                                            graze_plants(
+                                                random.choice(targets), organism
+                                            ),
+                                            organism,
                                         )
                     elif organism.type == OrganismType.pollinator:
                         if action == "collect_nectar":
                             pollination_targets_in_ecosystem = (
-                                await self.get_pollination_targets_in_the_ecosystem(
-                                    organism, ecosystem
-                                )
+                                food_web.pollination_targets(organism, plants)
                             )
-                            if (
-                                not organism.pollination_target
-                                or not pollination_targets_in_ecosystem
-                            ):
-                                results[f"day {n + 1}"].append(
+                            if not pollination_targets_in_ecosystem:
+                                log.add(
+                                    day,
                                     {
                                         f"No {organism.name} pollination targets found in this ecosystem "
-                                    }
+                                    },
+                                    organism,
                                 )
                             else:
                                 (
@@ -519,11 +769,20 @@ class EcoSystemService:
                                 for _ in range(
                                     plant_to_transport_nectar_population_increment
                                 ):
-                                    await self.add_plant_to_a_ecosystem(
-                                        ecosystem.id, plant_to_transport_nectar.name
+                                    plants.append(
+                                        new_plant_individual(
+                                            plant_to_transport_nectar.species
+                                        )
                                     )
-                                results[f"day {n + 1}"].append(
+                                SIMULATION_BIRTHS.inc(
+                                    plant_to_transport_nectar_population_increment,
+                                    kind="plant",
+                                )
+                                log.add(
+                                    day,
                                     [results_collect_nectar, results_transport_nectar],
+                                    organism,
+                                    plant_to_transport_nectar,
                                 )
 
                 if (
@@ -532,27 +791,27 @@ class EcoSystemService:
                     or organism.hunger >= 100
                     or organism.age > organism.max_age
                 ):
-                    results[f"day {n + 1}"].append(
-                        await self.death_cause_and_delete_organism(organism)
-                    )
+                    await self.remove_dead(log, day, organism, organisms)
+                    SIMULATION_DEATHS.inc(kind="organism")
                     continue
 
                 if food_consumed < organism.food_consumption:
                     HEALTH_LOST = random.randint(5, 15)
                     organism.health -= HEALTH_LOST
-                    results[f"day {n + 1}"].append(
+                    log.add(
+                        day,
                         {
                             f"{organism.name} don't eat the sufficient for the day and lost {HEALTH_LOST}"
-                        }
+                        },
+                        organism,
                     )
 
-            for plant in plants:
+            for plant in list(plants):
                 if plant.weight <= 0 or plant.age >= plant.max_age:
-                    results[f"day {n + 1}"].append(
-                        await self.death_cause_and_delete_organism(plant)
-                    )
+                    await self.remove_dead(log, day, plant, plants)
+                    SIMULATION_DEATHS.inc(kind="plant")
                 else:
-                    results[f"day {n + 1}"].append(drink_water(ecosystem, plant))
+                    log.add(day, drink_water(ecosystem, plant), plant)
 
             actual_cycle = ecosystem.cycle
             if actual_cycle == ActivityCycle.diurnal:
@@ -570,9 +829,7 @@ class EcoSystemService:
                     ecosystem.max_water_to_add_per_simulation,
                 )
                 ecosystem.water_available += WATER_TO_ADD
-                results[f"day {n + 1}"].append(
-                    {f"{WATER_TO_ADD} water were added to the ecosystem."}
-                )
+                log.add(day, {f"{WATER_TO_ADD} water were added to the ecosystem."})
                 if ecosystem.days % 3 == 0:
                     ecosystem.year += 1
 
@@ -580,18 +837,32 @@ class EcoSystemService:
                         organism.age += 1
                     for plant in ecosystem.plants:
                         plant.age += 1
-                await simulate_session.commit()
             ecosystem.simulation_status = SimulationStatus.finished
-            await simulate_session.commit()
-        serializable_result = make_json_serializable(results)
-        results_to_bytes = json.dumps(serializable_result).encode("utf-8")
-        new_simulation = Simulation(
-            simulation_id=simulation_id,
-            ecosystem_id=ecosystem_id,
-            simulation_results=zlib.compress(results_to_bytes),
+            # The day is over once the crepuscular cycle has moved the calendar
+            if ecosystem.days + 1 != day_number(day):
+                self.session.add(log.close_day(simulation_id, day))
+            commit_started = time.perf_counter()
+            # The members' new state is written in bulk, not row by row. Nothing
+            # flushes during the cycle, so the unit of work hasn't written it.
+            with self.session.no_autoflush:
+                await write_back(self.session, [*organisms, *plants])
+            # Flushes the births and deaths, each cycle is a single commit
+            await self.touch(ecosystem.id)
+            await self.session.commit()
+            SIMULATION_COMMIT_DURATION.observe(time.perf_counter() - commit_started)
+            SIMULATION_CYCLE_DURATION.observe(time.perf_counter() - cycle_started)
+            SIMULATION_CYCLES.inc()
+            completed_cycles += 1
+        if completed_cycles:
+            SIMULATION_CYCLES_PER_SECOND.set(
+                completed_cycles / (time.perf_counter() - run_started)
+            )
+        # The day the simulation stopped in, and the index of all the days
+        self.session.add_all(
+            [log.close_day(simulation_id, day) for day in list(log.days)]
         )
-        simulate_session.add(new_simulation)
-        await simulate_session.commit()
+        self.session.add_all(log.index_rows(simulation_id))
+        await self.session.commit()
 
     async def read_simulation(
         self,
@@ -614,110 +885,156 @@ class EcoSystemService:
 
         simulation = await self.session.get(Simulation, simulation_id)
         if not simulation:
-            raise
-        results_to_json = json.loads(
-            zlib.decompress(simulation.simulation_results).decode("utf-8")
-        )
-
-        interval = {}
+            raise SIMULATION_NOT_EXISTS_ERROR(str(simulation_id))
+        if simulation.simulation_results is not None:
+            days = decompress_json(simulation.simulation_results)
+        else:
+            query = await self.session.scalars(
+                select(SimulationChunk.day).where(
+                    SimulationChunk.simulation_id == simulation_id
+                )
+            )
+            days = dict.fromkeys(sorted(query.all(), key=day_number))
 
         if not start or start < 0:
             start = 0
-        elif start > len(results_to_json):
-            start = len(results_to_json)
+        elif start > len(days):
+            start = len(days)
 
         if not end or end < 0:
-            end = len(results_to_json)
-        elif end > len(results_to_json):
-            end = len(results_to_json)
+            end = len(days)
+        elif end > len(days):
+            end = len(days)
 
         if start > end:
-            results_to_json = dict(reversed(results_to_json.items()))
+            days = dict(reversed(days.items()))
+
+        keys = list(days.keys())[start:end]
+        if simulation.simulation_results is None and keys:
+            # Only the days of the interval are read and decompressed
+            query = await self.session.execute(
+                select(SimulationChunk.day, SimulationChunk.events).where(
+                    SimulationChunk.simulation_id == simulation_id,
+                    SimulationChunk.day.in_(keys),
+                )
+            )
+            days = {day: decompress_json(events) for day, events in query.all()}
+        interval = {key: days[key] for key in keys}
 
-        keys = list(results_to_json.keys())
-        interval = {key: results_to_json[key] for key in keys[start:end]}
+        return ORJSONResponse(status_code=200, content=interval)
 
-        return JSONResponse(status_code=200, content=interval)
+    async def read_simulation_events(self, simulation_id: UUID, actor: str):
+        simulation_index = await self.session.get(
+            SimulationEventIndex, (simulation_id, actor)
+        )
+        if not simulation_index:
+            if not await self.session.get(Simulation, simulation_id):
+                raise SIMULATION_NOT_EXISTS_ERROR(str(simulation_id))
+            return ORJSONResponse(
+                status_code=200, content={"actor": actor, "events": []}
+            )
 
-    async def remove_organism_from_a_ecosystem(
-        self, ecosystem_id: UUID, organism_name_or_id: UUID | str
+        postings = decompress_json(simulation_index.postings)
+        days = list(dict.fromkeys(day for day, _ in postings))
+        query = await self.session.execute(
+            select(SimulationChunk.day, SimulationChunk.events).where(
+                SimulationChunk.simulation_id == simulation_id,
+                SimulationChunk.day.in_(days),
+            )
+        )
+        chunks = {day: decompress_json(events) for day, events in query.all()}
+        events = [
+            {"day": day, "offset": offset, "event": chunks[day][offset]}
+            for day, offset in postings
+        ]
+        return ORJSONResponse(
+            status_code=200, content={"actor": actor, "events": events}
+        )
+
+    # Set-based: the members are matched by their ID or their species name
+    # without loading the ecosystem
+    async def remove_members(
+        self, individual, species, ecosystem_id: UUID, name_or_id: str, kind: str
     ):
-        ecosystem = await self.get(ecosystem_id)
-        organisms_to_delete = []
         try:
-            organism_uuid = UUID(str(organism_name_or_id))
+            member_uuid = UUID(str(name_or_id))
         except (ValueError, TypeError):
-            organism_uuid = None
-
-        organisms_to_delete = [
-            organism
-            for organism in ecosystem.organisms
-            if (organism_uuid is not None and organism.id == organism_uuid)
-            or (organism.name == organism_name_or_id)
-        ]
-
-        if not organisms_to_delete:
-            raise RESOURCE_NOT_FOUND_IN_RELATIONSHIP_ERROR(
-                one="ecosystem", many="organism"
+            member_uuid = None
+
+        result = await self.session.execute(
+            delete(individual)
+            .where(
+                individual.ecosystem_id == ecosystem_id,
+                or_(
+                    individual.id == member_uuid,
+                    individual.species_id.in_(
+                        select(species.id).where(species.name == str(name_or_id))
+                    ),
+                ),
             )
-
-        for organism in organisms_to_delete:
-            ecosystem.organisms.remove(organism)
-            await self.session.delete(organism)
+            .execution_options(synchronize_session=False)
+        )
+        if not result.rowcount:
+            raise RESOURCE_NOT_FOUND_IN_RELATIONSHIP_ERROR(one="ecosystem", many=kind)
+        await self.touch(ecosystem_id)
         await self.session.commit()
-        await self.session.refresh(ecosystem)
         return Response(status_code=204)
 
+    async def remove_organism_from_a_ecosystem(
+        self, ecosystem_id: UUID, organism_name_or_id: UUID | str
+    ):
+        return await self.remove_members(
+            OrganismIndividual, Organism, ecosystem_id, organism_name_or_id, "organism"
+        )
+
     async def remove_plant_from_a_ecosystem(
         self, ecosystem_id: UUID, plant_name_or_id: str
     ):
-        ecosystem = await self.get(ecosystem_id)
-        plants_to_delete = []
-        try:
-            plant_uuid = UUID(str(plant_name_or_id))
-        except (ValueError, TypeError):
-            plant_uuid = None
-
-        plants_to_delete = [
-            plant
-            for plant in ecosystem.plants
-            if (plant_uuid is not None and plant.id == plant_uuid)
-            or (plant.name == plant_name_or_id)
-        ]
+        return await self.remove_members(
+            PlantIndividual, Plant, ecosystem_id, plant_name_or_id, "plant"
+        )
 
-        if not plants_to_delete:
-            raise RESOURCE_NOT_FOUND_IN_RELATIONSHIP_ERROR(
-                one="ecosystem", many="plant"
-            )
-        for plant in plants_to_delete:
-            ecosystem.plants.remove(plant)
-            await self.session.delete(plant)
+    # Members go with it through ON DELETE CASCADE. The species private to it
+    # (see detach_individuals) are deleted first, with their members.
+    async def delete(self, ecosystem_id: UUID):
+        for individual, species in (
+            (OrganismIndividual, Organism),
+            (PlantIndividual, Plant),
+        ):
+            private = select(species.id).where(species.ecosystem_id == ecosystem_id)
+            for statement in (
+                delete(individual).where(individual.species_id.in_(private)),
+                delete(species).where(species.ecosystem_id == ecosystem_id),
+            ):
+                await self.session.execute(
+                    statement.execution_options(synchronize_session=False)
+                )
+        result = await self.session.execute(
+            delete(Ecosystem)
+            .where(Ecosystem.id == ecosystem_id)
+            .execution_options(synchronize_session=False)
+        )
+        if not result.rowcount:
+            raise RESOURCE_ID_NOT_FOUND_ERROR("ecosystem")
         await self.session.commit()
-        await self.session.refresh(ecosystem)
         return Response(status_code=204)
 
-    async def delete(self, ecosystem_id: UUID):
-        ecosystem = await self.get(ecosystem_id)
-        if ecosystem:
-            await self.session.delete(ecosystem)
-            await self.session.commit()
-            return Response(status_code=204)
-        raise RESOURCE_ID_NOT_FOUND_ERROR("ecosystem")
-
-    async def death_cause_and_delete_organism(self, organism: Organism | Plant):
+    async def death_cause_and_delete_organism(
+        self, organism: OrganismIndividual | PlantIndividual
+    ):
+        # Deleted by the flush at the end of the cycle
         await self.session.delete(organism)
-        await self.session.commit()
         if organism.health <= 0:
             return f"{organism.name}'s health reached 0. {organism.name} is dead."
         if organism.age > organism.max_age:
             return f"{organism.name} has reached its max age. {organism.name} is dead."
 
-        if type(organism) is Organism:
+        if type(organism) is OrganismIndividual:
             if organism.thirst >= 100:
                 return f"{organism.name}'s thirst reached 100. {organism.name} is dead."
 
             if organism.hunger >= 100:
                 return f"{organism.name}'s hunger reached 100. {organism.name} is dead."
-        elif type(organism) is Plant:
+        elif type(organism) is PlantIndividual:
             if organism.weight <= 0:
                 return {f"{organism.name}'s weight reached 0. {organism.name} is dead."}
@@ -1,10 +1,10 @@
 from typing import Optional
 from uuid import UUID, uuid4
 
+import orjson
 from fastapi import Response
-from fastapi.encoders import jsonable_encoder
-from fastapi.responses import JSONResponse
-from sqlalchemy import func, select
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import delete, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.exceptions.exceptions import (
@@ -13,7 +13,27 @@ from app.api.exceptions.exceptions import (
     RESOURCE_NAME_ALREADY_EXISTS_ERROR,
     RESOURCE_NAME_NOT_FOUND_ERROR,
 )
-from app.api.schemas.organism import CreateOrganism, UpdateOrganism
+from app.api.schemas.organism import BulkOrganism, CreateOrganism, UpdateOrganism
+from app.api.utils.bulk import (
+    bulk_error,
+    detach_individuals,
+    drop_unresolved,
+    insert_in_batches,
+    resolve_template_names,
+    split_names,
+    validate_bulk_items,
+)
+from app.api.utils.cache import catalog_cache
+from app.api.utils.etag import etag_matches, not_modified, touch_species_ecosystems
+from app.api.utils.pagination import (
+    DEFAULT_PAGE_SIZE,
+    PageOrder,
+    paginate,
+    parse_fields,
+)
+from app.api.utils.search import DEFAULT_SEARCH_LIMIT, search_templates
+from app.api.utils.streaming import ndjson_response
+from app.api.utils.utils import entity_to_dict
 from app.database.enums import (
     ActivityCycle,
     DietType,
@@ -22,44 +42,126 @@ from app.database.enums import (
     SocialBehavior,
     Speed,
 )
-from app.database.models import Organism, Plant, PollinationLink, PredationLink
+from app.database.loaders import ORGANISM_LINKS
+from app.database.models import (
+    Organism,
+    OrganismIndividual,
+    Plant,
+    PollinationLink,
+    PredationLink,
+)
 
 
 class OrganismService:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def get_organisms(self, detailed: bool):
-        query = await self.session.scalars(select(Organism))
-        organisms = query.all()
-        if not detailed:
-            organisms = [organism.name for organism in organisms]
-        return JSONResponse(
+    async def get_organisms(
+        self,
+        detailed: bool,
+        fields: str | None = None,
+        order_by: PageOrder = "id",
+        after: str | None = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        if_none_match: str | None = None,
+    ):
+        version = await catalog_cache.current_version(self.session)
+        etag = catalog_cache.etag(version)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+        async def load_organisms():
+            organisms, next_cursor = await paginate(
+                self.session,
+                Organism,
+                parse_fields(Organism, fields) if detailed else ["name"],
+                order_by,
+                after,
+                limit,
+                where=(Organism.ecosystem_id.is_(None),),
+            )
+            if not detailed:
+                organisms = [organism["name"] for organism in organisms]
+            return orjson.dumps({"organisms": organisms, "next_cursor": next_cursor})
+
+        content = await catalog_cache.get_or_load(
+            self.session,
+            ("organisms", detailed, fields, order_by, after, limit),
+            load_organisms,
+            version,
+        )
+        return Response(
+            content=content,
             status_code=200,
-            content=jsonable_encoder({"organisms": organisms}),
+            media_type="application/json",
+            headers={"ETag": etag},
         )
 
-    async def get_multiple_organisms_by_name(self, organism_name: str):
-        query = await self.session.scalars(
-            select(Organism).where(
-                func.lower(Organism.name).like(f"%{organism_name.lower()}%")
-            )
+    # Every template in NDJSON, one per line, read with a server-side cursor
+    async def stream_organisms(
+        self, fields: str | None = None, if_none_match: str | None = None
+    ):
+        version = await catalog_cache.current_version(self.session)
+        etag = catalog_cache.etag(version)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        columns = [
+            Organism.__table__.c[field] for field in parse_fields(Organism, fields)
+        ]
+        return ndjson_response(
+            self.session,
+            select(*columns)
+            .where(Organism.ecosystem_id.is_(None))
+            .order_by(Organism.id),
+            headers={"ETag": etag},
         )
 
-        organisms = query.all()
-        if not organisms:
-            raise RESOURCE_NAME_NOT_FOUND_ERROR("organism")
-        return organisms
+    async def get_multiple_organisms_by_name(
+        self,
+        organism_name: str,
+        limit: int = DEFAULT_SEARCH_LIMIT,
+        if_none_match: str | None = None,
+    ):
+        version = await catalog_cache.current_version(self.session)
+        etag = catalog_cache.etag(version)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+        async def load_organisms():
+            organisms = await search_templates(
+                self.session, Organism, organism_name, limit
+            )
+            if not organisms:
+                raise RESOURCE_NAME_NOT_FOUND_ERROR("organism")
+            return orjson.dumps(organisms)
+
+        content = await catalog_cache.get_or_load(
+            self.session,
+            ("organisms_search", organism_name.lower(), limit),
+            load_organisms,
+            version,
+        )
+        return Response(
+            content=content,
+            status_code=200,
+            media_type="application/json",
+            headers={"ETag": etag},
+        )
 
     async def verify_if_organism_exists(self, organism_name):
         organism = await self.session.execute(
-            select(Organism).where(func.lower(Organism.name) == organism_name.lower())
+            select(Organism).where(
+                func.lower(Organism.name) == organism_name.lower(),
+                Organism.ecosystem_id.is_(None),
+            )
         )
         return organism.scalar_one_or_none()
 
-    async def get_organism_by_id(self, organism_id: UUID):
+    async def get_organism_by_id(self, organism_id: UUID, options: tuple = ()):
         organism = await self.session.execute(
-            select(Organism).where((Organism.id == organism_id))
+            select(Organism)
+            .where(Organism.id == organism_id, Organism.ecosystem_id.is_(None))
+            .options(*options)
         )
         organism = organism.scalar_one_or_none()
         if not organism:
@@ -145,9 +247,6 @@ class OrganismService:
             environment_type=environment_type,
         )
 
-        for target in pollination_target:
-            new_pollination_link = PollinationLink(new_organism.id, target.id)
-            self.session.add(new_pollination_link)
         if predators_orm:
             for predator in predators_orm:
                 new_relation = PredationLink(
@@ -163,16 +262,105 @@ class OrganismService:
                 self.session.add(new_relation)
         self.session.add(new_organism)
         await self.session.commit()
+        await catalog_cache.bump(self.session)
 
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=201,
-            content=jsonable_encoder({"organism_created": new_organism}),
+            content={"organism_created": entity_to_dict(new_organism)},
+        )
+
+    async def add_bulk(self, raw_items: list):
+        items, errors = validate_bulk_items(raw_items, BulkOrganism)
+
+        def links(item: BulkOrganism):
+            return split_names(item.predator) + split_names(item.prey)
+
+        organisms = await resolve_template_names(
+            self.session,
+            Organism,
+            {name.lower() for _, item in items for name in [item.name, *links(item)]},
+        )
+        plants = await resolve_template_names(
+            self.session,
+            Plant,
+            {
+                name.lower()
+                for _, item in items
+                for name in split_names(item.pollination_target)
+            },
+        )
+
+        pending = {}
+        for index, item in items:
+            if item.name.lower() in organisms:
+                errors.append(
+                    bulk_error(
+                        index, item.name, "A organism with this name already exists."
+                    )
+                )
+                continue
+            organisms[item.name.lower()] = uuid4()
+            pending[index] = (item, organisms[item.name.lower()])
+
+        drop_unresolved(
+            pending,
+            organisms,
+            lambda item: (
+                [(name, organisms) for name in links(item)]
+                + [(name, plants) for name in split_names(item.pollination_target)]
+            ),
+            errors,
+        )
+
+        rows, predation, pollination = [], {}, {}
+        for item, new_id in pending.values():
+            rows.append(
+                {
+                    **item.model_dump(
+                        exclude={"predator", "prey", "pollination_target"}
+                    ),
+                    "id": new_id,
+                    "activity_cycle": item.activity_cycle or ActivityCycle.diurnal,
+                    "speed": item.speed or Speed.normal,
+                    "social_behavior": item.social_behavior or SocialBehavior.pack,
+                }
+            )
+            # Keyed by primary key, A preying on B and B listing A as predator
+            # are the same link
+            for name in split_names(item.predator):
+                predation[organisms[name.lower()], new_id] = None
+            for name in split_names(item.prey):
+                predation[new_id, organisms[name.lower()]] = None
+            for name in split_names(item.pollination_target):
+                pollination[new_id, plants[name.lower()]] = None
+
+        if rows:
+            await insert_in_batches(self.session, Organism, rows)
+            await insert_in_batches(
+                self.session,
+                PredationLink,
+                [{"predator_id": a, "prey_id": b} for a, b in predation],
+            )
+            await insert_in_batches(
+                self.session,
+                PollinationLink,
+                [{"pollinator_id": a, "plant_id": b} for a, b in pollination],
+            )
+            await self.session.commit()
+            await catalog_cache.bump(self.session)
+
+        return ORJSONResponse(
+            status_code=201 if rows else 400,
+            content={
+                "created": [{"id": row["id"], "name": row["name"]} for row in rows],
+                "errors": sorted(errors, key=lambda error: error["index"]),
+            },
         )
 
     async def update_base_organism(
         self, organism_id: UUID, update_organism: UpdateOrganism
     ):
-        organism = await self.get_organism_by_id(organism_id)
+        organism = await self.get_organism_by_id(organism_id, ORGANISM_LINKS)
         update = {}
         for key, value in update_organism.model_dump().items():
             if value is not None:
@@ -185,19 +373,35 @@ class OrganismService:
             except TypeError:
                 value = value.split(",")
                 setattr(organism, key, value)
+        await touch_species_ecosystems(self.session, OrganismIndividual, organism.id)
         await self.session.commit()
+        await catalog_cache.bump(self.session)
         await self.session.refresh(organism)
-        return JSONResponse(
-            status_code=200, content=jsonable_encoder({"updated_organism": organism})
+        return ORJSONResponse(
+            status_code=200, content={"updated_organism": entity_to_dict(organism)}
         )
 
+    # Its links go with it through ON DELETE CASCADE, its individuals are
+    # kept with a private copy of it
     async def delete(self, organism_id: UUID):
-        organism = await self.get_organism_by_id(organism_id)
-        if not organism:
+        # Only templates, the private species of an ecosystem go with it
+        if not await self.session.scalar(
+            select(Organism.id).where(
+                Organism.id == organism_id, Organism.ecosystem_id.is_(None)
+            )
+        ):
             raise RESOURCE_ID_NOT_FOUND_ERROR("organism")
-
-        await self.session.delete(organism)
+        await touch_species_ecosystems(self.session, OrganismIndividual, organism_id)
+        await detach_individuals(
+            self.session, Organism, OrganismIndividual, organism_id
+        )
+        await self.session.execute(
+            delete(Organism)
+            .where(Organism.id == organism_id)
+            .execution_options(synchronize_session=False)
+        )
         await self.session.commit()
+        await catalog_cache.bump(self.session)
         return Response(status_code=204)
 
     async def get_pollination_targets_and_convert_to_organisms(
@@ -208,7 +412,8 @@ class OrganismService:
         for pollination_target in pollination_targets_splitted:
             pollination_target = await self.session.execute(
                 select(Plant).where(
-                    func.lower(Organism.name) == pollination_target.lower()
+                    func.lower(Plant.name) == pollination_target.lower(),
+                    Plant.ecosystem_id.is_(None),
                 )
             )
             pollination_target = pollination_target.scalar_one_or_none()
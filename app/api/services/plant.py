@@ -1,9 +1,9 @@
 from uuid import UUID, uuid4
 
+import orjson
 from fastapi import Response
-from fastapi.encoders import jsonable_encoder
-from fastapi.responses import JSONResponse
-from sqlalchemy import func, select
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import delete, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.exceptions.exceptions import (
@@ -12,50 +12,137 @@ from app.api.exceptions.exceptions import (
     RESOURCE_NAME_NOT_FOUND_ERROR,
     RESOURCE_NAME_OR_ID_NOT_FOUND_ERROR,
 )
-from app.api.schemas.plant import CreatePlant, UpdatePlant
+from app.api.schemas.plant import BulkPlant, CreatePlant, UpdatePlant
+from app.api.utils.bulk import (
+    bulk_error,
+    detach_individuals,
+    drop_unresolved,
+    insert_in_batches,
+    resolve_template_names,
+    split_names,
+    validate_bulk_items,
+)
+from app.api.utils.cache import catalog_cache
+from app.api.utils.etag import etag_matches, not_modified, touch_species_ecosystems
+from app.api.utils.pagination import (
+    DEFAULT_PAGE_SIZE,
+    PageOrder,
+    paginate,
+    parse_fields,
+)
+from app.api.utils.search import DEFAULT_SEARCH_LIMIT, search_templates
+from app.api.utils.streaming import ndjson_response
+from app.api.utils.utils import entity_to_dict
 from app.database.enums import EnvironmentType, PlantType
-from app.database.models import Organism, Plant
+from app.database.loaders import PLANT_LINKS
+from app.database.models import Organism, Plant, PlantIndividual, PollinationLink
 
 
 class PlantService:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def get_plants(self, detailed: bool):
-        query = await self.session.scalars(select(Plant))
-        plants = query.all()
-        if not detailed:
-            plants = [plant.name for plant in plants]
-        return JSONResponse(
+    async def get_plants(
+        self,
+        detailed: bool,
+        fields: str | None = None,
+        order_by: PageOrder = "id",
+        after: str | None = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        if_none_match: str | None = None,
+    ):
+        version = await catalog_cache.current_version(self.session)
+        etag = catalog_cache.etag(version)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+        async def load_plants():
+            plants, next_cursor = await paginate(
+                self.session,
+                Plant,
+                parse_fields(Plant, fields) if detailed else ["name"],
+                order_by,
+                after,
+                limit,
+                where=(Plant.ecosystem_id.is_(None),),
+            )
+            if not detailed:
+                plants = [plant["name"] for plant in plants]
+            return orjson.dumps({"plants": plants, "next_cursor": next_cursor})
+
+        content = await catalog_cache.get_or_load(
+            self.session,
+            ("plants", detailed, fields, order_by, after, limit),
+            load_plants,
+            version,
+        )
+        return Response(
+            content=content,
             status_code=200,
-            content=jsonable_encoder({"plants": plants}),
+            media_type="application/json",
+            headers={"ETag": etag},
         )
 
-    async def get_multiple_plants_by_name(self, plant_name: str):
-        query = await self.session.scalars(
-            select(Plant).where(func.lower(Plant.name).like(f"%{plant_name.lower()}%"))
+    # Every template in NDJSON, one per line, read with a server-side cursor
+    async def stream_plants(
+        self, fields: str | None = None, if_none_match: str | None = None
+    ):
+        version = await catalog_cache.current_version(self.session)
+        etag = catalog_cache.etag(version)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        columns = [Plant.__table__.c[field] for field in parse_fields(Plant, fields)]
+        return ndjson_response(
+            self.session,
+            select(*columns).where(Plant.ecosystem_id.is_(None)).order_by(Plant.id),
+            headers={"ETag": etag},
         )
 
-        plants = query.all()
-        if not plants:
-            raise RESOURCE_NAME_NOT_FOUND_ERROR("plant")
+    async def get_multiple_plants_by_name(
+        self,
+        plant_name: str,
+        limit: int = DEFAULT_SEARCH_LIMIT,
+        if_none_match: str | None = None,
+    ):
+        version = await catalog_cache.current_version(self.session)
+        etag = catalog_cache.etag(version)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+        async def load_plants():
+            plants = await search_templates(self.session, Plant, plant_name, limit)
+            if not plants:
+                raise RESOURCE_NAME_NOT_FOUND_ERROR("plant")
+            return orjson.dumps({"plants": plants})
 
-        return JSONResponse(
-            status_code=200, content=jsonable_encoder({"plants": plants})
+        content = await catalog_cache.get_or_load(
+            self.session,
+            ("plants_search", plant_name.lower(), limit),
+            load_plants,
+            version,
+        )
+        return Response(
+            content=content,
+            status_code=200,
+            media_type="application/json",
+            headers={"ETag": etag},
         )
 
-    async def get_plant_by_name_or_id(self, plant_name_or_id: str):
+    async def get_plant_by_name_or_id(self, plant_name_or_id: str, options: tuple = ()):
         try:
             valid_uuid = UUID(plant_name_or_id)
         except (ValueError, TypeError):
             valid_uuid = None
         finally:
             plant = await self.session.execute(
-                select(Plant).where(
-                    (Plant.name == plant_name_or_id or Plant.id == valid_uuid)
+                select(Plant)
+                .where(
+                    or_(Plant.name == plant_name_or_id, Plant.id == valid_uuid)
                     if valid_uuid
-                    else Plant.name == plant_name_or_id
+                    else Plant.name == plant_name_or_id,
+                    Plant.ecosystem_id.is_(None),
                 )
+                .options(*options)
             )
         plant = plant.scalar_one_or_none()
         if not plant:
@@ -64,7 +151,9 @@ class PlantService:
 
     async def verify_if_pollinator_exists(self, pollinator_name: str):
         result = await self.session.execute(
-            select(Organism).where(Organism.name == pollinator_name)
+            select(Organism).where(
+                Organism.name == pollinator_name, Organism.ecosystem_id.is_(None)
+            )
         )
 
         pollinators = result.scalars().all()
@@ -85,7 +174,7 @@ class PlantService:
 
     async def verify_if_plant_exists(self, plant_name: str):
         plant = await self.session.execute(
-            select(Plant).where(Plant.name == plant_name)
+            select(Plant).where(Plant.name == plant_name, Plant.ecosystem_id.is_(None))
         )
         plant = plant.scalar_one_or_none()
         return plant
@@ -121,17 +210,75 @@ class PlantService:
 
         self.session.add(new_plant)
         await self.session.commit()
-        return JSONResponse(
+        await catalog_cache.bump(self.session)
+        return ORJSONResponse(
             status_code=201,
-            content=jsonable_encoder(
-                {
-                    "plant_created": new_plant,
-                }
-            ),
+            content={
+                "plant_created": entity_to_dict(new_plant),
+            },
+        )
+
+    async def add_bulk(self, raw_items: list):
+        items, errors = validate_bulk_items(raw_items, BulkPlant)
+
+        plants = await resolve_template_names(
+            self.session, Plant, {item.name.lower() for _, item in items}
+        )
+        organisms = await resolve_template_names(
+            self.session,
+            Organism,
+            {
+                name.lower()
+                for _, item in items
+                for name in split_names(item.pollinators)
+            },
+        )
+
+        pending = {}
+        for index, item in items:
+            if item.name.lower() in plants:
+                errors.append(
+                    bulk_error(
+                        index, item.name, "A plant with this name already exists."
+                    )
+                )
+                continue
+            plants[item.name.lower()] = uuid4()
+            pending[index] = (item, plants[item.name.lower()])
+
+        drop_unresolved(
+            pending,
+            plants,
+            lambda item: [(name, organisms) for name in split_names(item.pollinators)],
+            errors,
+        )
+
+        rows, pollination = [], {}
+        for item, new_id in pending.values():
+            rows.append({**item.model_dump(exclude={"pollinators"}), "id": new_id})
+            for name in split_names(item.pollinators):
+                pollination[organisms[name.lower()], new_id] = None
+
+        if rows:
+            await insert_in_batches(self.session, Plant, rows)
+            await insert_in_batches(
+                self.session,
+                PollinationLink,
+                [{"pollinator_id": a, "plant_id": b} for a, b in pollination],
+            )
+            await self.session.commit()
+            await catalog_cache.bump(self.session)
+
+        return ORJSONResponse(
+            status_code=201 if rows else 400,
+            content={
+                "created": [{"id": row["id"], "name": row["name"]} for row in rows],
+                "errors": sorted(errors, key=lambda error: error["index"]),
+            },
         )
 
     async def update_base_plant(self, plant_name_or_id: str, update_plant: UpdatePlant):
-        plant = await self.get_plant_by_name_or_id(plant_name_or_id)
+        plant = await self.get_plant_by_name_or_id(plant_name_or_id, PLANT_LINKS)
         update_infos = {}
         for key, value in update_plant:
             if value:
@@ -148,13 +295,25 @@ class PlantService:
                     update_infos["pollinators"]
                 )
             setattr(plant, key, value)
+        await touch_species_ecosystems(self.session, PlantIndividual, plant.id)
         await self.session.commit()
+        await catalog_cache.bump(self.session)
         await self.session.refresh(plant)
-        return JSONResponse(
-            status_code=200, content=jsonable_encoder({"updated_plant": plant})
+        return ORJSONResponse(
+            status_code=200, content={"updated_plant": entity_to_dict(plant)}
         )
 
     async def delete(self, plant_name_or_id: str):
-        await self.session.delete(await self.get_plant_by_name_or_id(plant_name_or_id))
+        plant = await self.get_plant_by_name_or_id(plant_name_or_id)
+        # Its links go with it through ON DELETE CASCADE, its individuals are
+        # kept with a private copy of it
+        await touch_species_ecosystems(self.session, PlantIndividual, plant.id)
+        await detach_individuals(self.session, Plant, PlantIndividual, plant.id)
+        await self.session.execute(
+            delete(Plant)
+            .where(Plant.id == plant.id)
+            .execution_options(synchronize_session=False)
+        )
         await self.session.commit()
+        await catalog_cache.bump(self.session)
         return Response(status_code=204)
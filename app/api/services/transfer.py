@@ -0,0 +1,314 @@
+from collections import defaultdict
+from uuid import UUID, uuid4
+
+from fastapi import Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.api.exceptions.exceptions import (
+    INVALID_IMPORT_ERROR,
+    RESOURCE_ID_NOT_FOUND_ERROR,
+    RESOURCE_NAME_ALREADY_EXISTS_ERROR,
+    SPECIES_NOT_FOUND_ERROR,
+)
+from app.api.utils.bulk import insert_missing_links, resolve_template_names
+from app.api.utils.cache import catalog_cache
+from app.api.utils.streaming import NDJSON_MEDIA_TYPE, STREAM_BATCH_SIZE
+from app.api.utils.transfer import (
+    TransferFormat,
+    coerce_row,
+    export_columns,
+    export_lines,
+    read_records,
+)
+from app.database.models import (
+    Ecosystem,
+    Organism,
+    OrganismIndividual,
+    Plant,
+    PlantIndividual,
+    PollinationLink,
+    PredationLink,
+)
+from app.database.persistence import insert_rows
+
+SPECIES_KINDS = {"organism_species": Organism, "plant_species": Plant}
+# kind -> (link table, (left name, left species), (right name, right species))
+LINK_KINDS = {
+    "predation": (PredationLink, ("predator", Organism), ("prey", Organism)),
+    "pollination": (PollinationLink, ("pollinator", Organism), ("plant", Plant)),
+}
+MEMBER_KINDS = {
+    "organism": (OrganismIndividual, Organism),
+    "plant": (PlantIndividual, Plant),
+}
+CATALOG_KINDS = {*SPECIES_KINDS, *LINK_KINDS}
+ECOSYSTEM_KINDS = {*CATALOG_KINDS, "ecosystem", *MEMBER_KINDS}
+
+REFERENCE_COLUMNS = {"id", "ecosystem_id", "species_id"}
+# Reset by the import, a copy starts its own history
+ECOSYSTEM_STATE_COLUMNS = {"id", "version", "simulation_status"}
+
+
+def used_species(model, ecosystem_id: UUID):
+    individual = next(
+        individual for individual, species in MEMBER_KINDS.values() if species is model
+    )
+    return select(individual.species_id).where(individual.ecosystem_id == ecosystem_id)
+
+
+class TransferService:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    def species_statement(self, model, ecosystem_id: UUID | None = None):
+        statement = select(*export_columns(model.__table__, REFERENCE_COLUMNS))
+        if ecosystem_id is None:
+            statement = statement.where(model.ecosystem_id.is_(None))
+        else:
+            statement = statement.where(model.id.in_(used_species(model, ecosystem_id)))
+        return statement.order_by(model.name)
+
+    def link_statement(self, kind: str, ecosystem_id: UUID | None = None):
+        link, (left_name, left_model), (right_name, right_model) = LINK_KINDS[kind]
+        left_key, right_key = link.__table__.primary_key.columns
+        left, right = aliased(left_model), aliased(right_model)
+        statement = (
+            select(left.name.label(left_name), right.name.label(right_name))
+            .select_from(link)
+            .join(left, left_key == left.id)
+            .join(right, right_key == right.id)
+        )
+        if ecosystem_id is None:
+            statement = statement.where(
+                left.ecosystem_id.is_(None), right.ecosystem_id.is_(None)
+            )
+        else:
+            statement = statement.where(
+                left.id.in_(used_species(left_model, ecosystem_id)),
+                right.id.in_(used_species(right_model, ecosystem_id)),
+            )
+        return statement.order_by(left.name, right.name)
+
+    def member_statement(self, kind: str, ecosystem_id: UUID):
+        individual, species = MEMBER_KINDS[kind]
+        return (
+            select(
+                species.name.label("species"),
+                *export_columns(individual.__table__, REFERENCE_COLUMNS),
+            )
+            .join(species, individual.species_id == species.id)
+            .where(individual.ecosystem_id == ecosystem_id)
+            .order_by(individual.id)
+        )
+
+    async def catalog_lines(self, columnar: bool):
+        for kind, model in SPECIES_KINDS.items():
+            async for lines in export_lines(
+                self.session, kind, self.species_statement(model), columnar
+            ):
+                yield lines
+        for kind in LINK_KINDS:
+            async for lines in export_lines(
+                self.session, kind, self.link_statement(kind), columnar
+            ):
+                yield lines
+
+    # Species and links first, so the import can resolve the members' names
+    async def ecosystem_lines(self, ecosystem_id: UUID, columnar: bool):
+        for kind, model in SPECIES_KINDS.items():
+            async for lines in export_lines(
+                self.session,
+                kind,
+                self.species_statement(model, ecosystem_id),
+                columnar,
+            ):
+                yield lines
+        for kind in LINK_KINDS:
+            async for lines in export_lines(
+                self.session, kind, self.link_statement(kind, ecosystem_id), columnar
+            ):
+                yield lines
+        async for lines in export_lines(
+            self.session,
+            "ecosystem",
+            select(*export_columns(Ecosystem.__table__, ECOSYSTEM_STATE_COLUMNS)).where(
+                Ecosystem.id == ecosystem_id
+            ),
+            columnar,
+        ):
+            yield lines
+        for kind in MEMBER_KINDS:
+            async for lines in export_lines(
+                self.session, kind, self.member_statement(kind, ecosystem_id), columnar
+            ):
+                yield lines
+
+    async def export_catalog(self, export_format: TransferFormat = "ndjson"):
+        return StreamingResponse(
+            self.catalog_lines(export_format == "columnar"),
+            media_type=NDJSON_MEDIA_TYPE,
+        )
+
+    async def export_ecosystem(
+        self, ecosystem_id: UUID, export_format: TransferFormat = "ndjson"
+    ):
+        if not await self.session.scalar(
+            select(Ecosystem.id).where(Ecosystem.id == ecosystem_id)
+        ):
+            raise RESOURCE_ID_NOT_FOUND_ERROR("ecosystem")
+        return StreamingResponse(
+            self.ecosystem_lines(ecosystem_id, export_format == "columnar"),
+            media_type=NDJSON_MEDIA_TYPE,
+        )
+
+    # Template name -> id for every name in the batch, unknown names are only
+    # looked up once per import
+    async def species_ids(self, model, names: set[str]) -> dict[str, UUID]:
+        known = self.species[model]
+        missing = {name.lower() for name in names} - known.keys()
+        if missing:
+            known.update(await resolve_template_names(self.session, model, missing))
+        unknown = sorted(name for name in names if name.lower() not in known)
+        if unknown:
+            raise SPECIES_NOT_FOUND_ERROR(unknown)
+        return known
+
+    # Species already in the catalog are kept as they are
+    async def import_species(self, model, batch: list[tuple[int, dict]]) -> int:
+        rows = [coerce_row(model.__table__, row, line) for line, row in batch]
+        for (line, _), row in zip(batch, rows):
+            if not isinstance(row.get("name"), str):
+                raise INVALID_IMPORT_ERROR(line, "Species need a name")
+        known = self.species[model]
+        missing = {row["name"].lower() for row in rows} - known.keys()
+        if missing:
+            known.update(await resolve_template_names(self.session, model, missing))
+
+        created = []
+        for row in rows:
+            if row["name"].lower() in known:
+                continue
+            for column in REFERENCE_COLUMNS:
+                row.pop(column, None)
+            row["id"] = known[row["name"].lower()] = uuid4()
+            created.append(row)
+        await insert_rows(self.session, model.__table__, created)
+        return len(batch)
+
+    async def import_links(self, kind: str, batch: list[tuple[int, dict]]) -> int:
+        link, (left_name, left_model), (right_name, right_model) = LINK_KINDS[kind]
+        for line, row in batch:
+            if not isinstance(row.get(left_name), str) or not isinstance(
+                row.get(right_name), str
+            ):
+                raise INVALID_IMPORT_ERROR(line, f"Needs {left_name} and {right_name}")
+        left = await self.species_ids(left_model, {row[left_name] for _, row in batch})
+        right = await self.species_ids(
+            right_model, {row[right_name] for _, row in batch}
+        )
+        await insert_missing_links(
+            self.session,
+            link,
+            {
+                (left[row[left_name].lower()], right[row[right_name].lower()])
+                for _, row in batch
+            },
+        )
+        return len(batch)
+
+    async def import_ecosystem_row(self, line: int, row: dict, name: str | None):
+        if self.ecosystem_id is not None:
+            raise INVALID_IMPORT_ERROR(line, "Only one ecosystem per import")
+        row = coerce_row(Ecosystem.__table__, row, line)
+        for column in ECOSYSTEM_STATE_COLUMNS:
+            row.pop(column, None)
+        if name:
+            row["name"] = name
+        if not isinstance(row.get("name"), str):
+            raise INVALID_IMPORT_ERROR(line, "The ecosystem needs a name")
+        if await self.session.scalar(
+            select(Ecosystem.id).where(
+                func.lower(Ecosystem.name) == row["name"].lower()
+            )
+        ):
+            raise RESOURCE_NAME_ALREADY_EXISTS_ERROR("ecosystem")
+        self.ecosystem_id = row["id"] = uuid4()
+        await insert_rows(self.session, Ecosystem.__table__, [row])
+
+    async def import_members(self, kind: str, batch: list[tuple[int, dict]]) -> int:
+        individual, species = MEMBER_KINDS[kind]
+        if self.ecosystem_id is None:
+            raise INVALID_IMPORT_ERROR(
+                batch[0][0], "Members must come after their ecosystem"
+            )
+        for line, row in batch:
+            if not isinstance(row.get("species"), str):
+                raise INVALID_IMPORT_ERROR(line, "Members need a species")
+        species_ids = await self.species_ids(
+            species, {row["species"] for _, row in batch}
+        )
+        rows = []
+        for line, row in batch:
+            species_name = row.pop("species")
+            row = coerce_row(individual.__table__, row, line)
+            row["id"] = uuid4()
+            row["species_id"] = species_ids[species_name.lower()]
+            row["ecosystem_id"] = self.ecosystem_id
+            rows.append(row)
+        await insert_rows(self.session, individual.__table__, rows)
+        return len(rows)
+
+    async def import_batch(
+        self, kind: str, batch: list[tuple[int, dict]], name: str | None
+    ) -> int:
+        if kind in SPECIES_KINDS:
+            return await self.import_species(SPECIES_KINDS[kind], batch)
+        if kind in LINK_KINDS:
+            return await self.import_links(kind, batch)
+        if kind in MEMBER_KINDS:
+            return await self.import_members(kind, batch)
+        for line, row in batch:
+            await self.import_ecosystem_row(line, row, name)
+        return len(batch)
+
+    # Consecutive records of the same kind are written together, up to
+    # STREAM_BATCH_SIZE at a time, all in one transaction
+    async def import_records(
+        self, request: Request, kinds: set[str], name: str | None = None
+    ) -> dict[str, int]:
+        self.species = {Organism: {}, Plant: {}}
+        self.ecosystem_id = None
+        imported = defaultdict(int)
+        batch, batch_kind = [], None
+        async for line, kind, row in read_records(request):
+            if kind not in kinds:
+                raise INVALID_IMPORT_ERROR(line, f"Unexpected kind: {kind}")
+            if batch and (kind != batch_kind or len(batch) >= STREAM_BATCH_SIZE):
+                imported[batch_kind] += await self.import_batch(batch_kind, batch, name)
+                batch = []
+            batch_kind = kind
+            batch.append((line, row))
+        if batch:
+            imported[batch_kind] += await self.import_batch(batch_kind, batch, name)
+        return dict(imported)
+
+    async def import_catalog(self, request: Request):
+        imported = await self.import_records(request, CATALOG_KINDS)
+        await self.session.commit()
+        await catalog_cache.bump(self.session)
+        return ORJSONResponse(status_code=201, content={"imported": imported})
+
+    async def import_ecosystem(self, request: Request, name: str | None = None):
+        imported = await self.import_records(request, ECOSYSTEM_KINDS, name)
+        if self.ecosystem_id is None:
+            raise INVALID_IMPORT_ERROR(0, "No ecosystem in the import")
+        await self.session.commit()
+        if imported.keys() & CATALOG_KINDS:
+            await catalog_cache.bump(self.session)
+        return ORJSONResponse(
+            status_code=201,
+            content={"ecosystem_id": str(self.ecosystem_id), "imported": imported},
+        )
@@ -6,7 +6,13 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlmodel import SQLModel
 
-from app.database.session import get_session, set_sessionmaker
+from app.api.utils.cache import catalog_cache
+from app.database.session import (
+    get_read_session,
+    get_session,
+    set_sessionmaker,
+    set_sqlite_pragmas,
+)
 from app.main import app
 
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
@@ -14,6 +20,8 @@ TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 engine = create_async_engine(
     TEST_DATABASE_URL, connect_args={"check_same_thread": False}
 )
+# Like the engines of build_engine
+set_sqlite_pragmas(engine, {"foreign_keys": "ON"})
 
 TestingSessionLocal = sessionmaker(
     bind=engine, class_=AsyncSession, expire_on_commit=False
@@ -36,6 +44,7 @@ async def reset_db():
     async with engine.begin() as connection:
         await connection.run_sync(SQLModel.metadata.drop_all)
         await connection.run_sync(SQLModel.metadata.create_all)
+    catalog_cache.clear()
 
 
 @pytest_asyncio.fixture(scope="function")
@@ -57,6 +66,7 @@ async def client(db_session: AsyncSession) -> AsyncIterator[AsyncClient]:
             await db_session.close()
 
     app.dependency_overrides[get_session] = override_get_db
+    app.dependency_overrides[get_read_session] = override_get_db
 
     async with AsyncClient(
         transport=ASGITransport(app=app), base_url="http://test"
@@ -1,7 +1,22 @@
+import json
+import random
+from uuid import UUID, uuid4
+
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import event, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.services.ecosystem import EcoSystemService
+from app.api.utils.events import compress_json
+from app.database.models import (
+    OrganismIndividual,
+    PlantIndividual,
+    PollinationLink,
+    PredationLink,
+    Simulation,
+)
+
 
 # ECOSYSTEM
 @pytest.mark.asyncio
@@ -119,6 +134,322 @@ async def test_simulate_ecosystem(db_session: AsyncSession, client: AsyncClient)
     assert response.status_code == 200
 
 
+@pytest.mark.asyncio
+async def test_get_all_ecosystems_paginated(
+    db_session: AsyncSession, client: AsyncClient
+):
+    for name in ["Ecosystem A", "Ecosystem B", "Ecosystem C"]:
+        await client.post(
+            "/ecosystem/create", json={"name": name, "water_available": 1000}
+        )
+
+    names = []
+    after = None
+    while True:
+        params = {"fields": "name", "order_by": "name", "limit": 2}
+        if after:
+            params["after"] = after
+        response = await client.get("/ecosystem/all", params=params)
+        assert response.status_code == 200
+        names += [ecosystem["name"] for ecosystem in response.json()["ecosystems"]]
+        assert all(
+            list(ecosystem) == ["name"] for ecosystem in response.json()["ecosystems"]
+        )
+        after = response.json()["next_cursor"]
+        if not after:
+            break
+
+    assert names == ["Ecosystem A", "Ecosystem B", "Ecosystem C"]
+
+    response = await client.get("/ecosystem/all", params={"after": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_get_ecosystems_summary(db_session: AsyncSession, client: AsyncClient):
+    new_ecosystem = await client.post(
+        "/ecosystem/create", json={"name": "Ecosystem test", "water_available": 1000}
+    )
+    new_ecosystem_id = new_ecosystem.json()["ecosystem_created"]["id"]
+    await client.post(
+        "/ecosystem/create", json={"name": "Empty ecosystem", "water_available": 10}
+    )
+
+    await client.post(
+        "/organism/create",
+        json={
+            "name": "Meerkat",
+            "weight": 0.7,
+            "size": 0.5,
+            "max_age": 14,
+            "water_consumption": 0.1,
+            "food_consumption": 0.2,
+        },
+        params={"type": "omnivore", "diet_type": "omnivore"},
+    )
+    await client.post(
+        "/plant/create",
+        json={"name": "Arbust", "weight": 50, "max_age": 15, "water_need": 5},
+        params={"type": "tree"},
+    )
+    for _ in range(2):
+        await client.post(
+            f"/ecosystem/organism/add?organism_name=Meerkat&ecosystem_id={new_ecosystem_id}",
+        )
+    await client.post(
+        f"/ecosystem/plant/add?plant_name=Arbust&ecosystem_id={new_ecosystem_id}",
+    )
+
+    response = await client.get("/ecosystem/summary")
+    assert response.status_code == 200
+    ecosystem, empty_ecosystem = response.json()["ecosystems"]
+    assert ecosystem["name"] == "Ecosystem test"
+    assert ecosystem["organisms_by_type"] == {"omnivore": 2}
+    assert ecosystem["plants_by_type"] == {"tree": 1}
+    assert ecosystem["total_organisms"] == 2
+    assert ecosystem["total_plants"] == 1
+    assert ecosystem["total_biomass"] == 51.4
+    assert empty_ecosystem["name"] == "Empty ecosystem"
+    assert empty_ecosystem["total_organisms"] == 0
+    assert empty_ecosystem["organisms_by_type"] == {}
+
+
+@pytest.mark.asyncio
+async def test_read_simulation_events(db_session: AsyncSession, client: AsyncClient):
+    ecosystem_payload = {
+        "name": "Ecosystem test",
+        "water_available": 1000,
+        "minimum_water_to_add_per_simulation": 50,
+        "max_water_to_add_per_simulation": 200,
+    }
+
+    new_ecosystem = await client.post("/ecosystem/create", json=ecosystem_payload)
+    new_ecosystem_id = new_ecosystem.json()["ecosystem_created"]["id"]
+    organisms = [
+        {
+            "payload": {
+                "name": "Meerkat",
+                "weight": 0.7,
+                "size": 0.5,
+                "age": 2,
+                "max_age": 14,
+                "reproduction_age": 2,
+                "fertility_rate": 3,
+                "water_consumption": 0.1,
+                "food_consumption": 0.2,
+            },
+            "params": {
+                "type": "omnivore",
+                "diet_type": "omnivore",
+                "activity_cycle": "diurnal",
+                "speed": "fast",
+                "social_behavior": "herd",
+            },
+        },
+        {
+            "payload": {
+                "name": "Moose",
+                "weight": 500,
+                "size": 3.2,
+                "age": 6,
+                "max_age": 25,
+                "reproduction_age": 4,
+                "fertility_rate": 1,
+                "water_consumption": 5,
+                "food_consumption": 18,
+            },
+            "params": {
+                "type": "herbivore",
+                "diet_type": "herbivore",
+                "activity_cycle": "diurnal",
+                "speed": "normal",
+                "social_behavior": "solitary",
+            },
+        },
+    ]
+
+    for organism in organisms:
+        await client.post(
+            "/organism/create",
+            json=organism["payload"],
+            params=organism["params"],
+        )
+        await client.post(
+            f"/ecosystem/organism/add?organism_name={organism['payload']['name']}&ecosystem_id={new_ecosystem_id}",
+        )
+
+    simulation = await client.get(f"/ecosystem/{new_ecosystem_id}/simulate?cycles=3")
+    simulation_id = simulation.json()["simulation_id"]
+
+    response = await client.get(
+        f"/ecosystem/simulation/{simulation_id}/events?actor=Meerkat"
+    )
+    assert response.status_code == 200
+    events = response.json()["events"]
+    assert events
+    assert all("Meerkat" in json.dumps(event["event"]) for event in events)
+
+    response = await client.get(
+        f"/ecosystem/simulation/{simulation_id}/events?actor=Unknown"
+    )
+    assert response.status_code == 200
+    assert response.json()["events"] == []
+
+    response = await client.get(f"/ecosystem/simulation/{uuid4()}/events?actor=Wolf")
+    assert response.status_code == 400
+
+
+async def create_simulated_ecosystem(
+    client: AsyncClient, name: str, organisms: list, plants: list, composition: dict
+) -> str:
+    ecosystem = await client.post(
+        "/ecosystem/create",
+        json={
+            "name": name,
+            "water_available": 1000,
+            "minimum_water_to_add_per_simulation": 50,
+            "max_water_to_add_per_simulation": 200,
+        },
+    )
+    ecosystem_id = ecosystem.json()["ecosystem_created"]["id"]
+    base = {"weight": 10, "size": 1, "water_consumption": 1, "food_consumption": 1}
+    for organism_name, organism_type, diet_type in organisms:
+        await client.post(
+            "/organism/create",
+            json={**base, "name": organism_name, "max_age": 20},
+            params={"type": organism_type, "diet_type": diet_type},
+        )
+    for plant_name, weight in plants:
+        await client.post(
+            "/plant/create",
+            json={"name": plant_name, "weight": weight, "max_age": 100},
+            params={"type": "tree"},
+        )
+    await client.post(
+        f"/ecosystem/{ecosystem_id}/seed", json={"composition": composition}
+    )
+    return ecosystem_id
+
+
+@pytest.mark.asyncio
+async def test_simulation_writes_each_day_as_it_ends(
+    db_session: AsyncSession, client: AsyncClient
+):
+    ecosystem_id = await create_simulated_ecosystem(
+        client,
+        "Chunked",
+        [("Rabbit", "herbivore", "herbivore")],
+        [("Oak", 50)],
+        {"Rabbit": 2, "Oak": 2},
+    )
+
+    statements = []
+    bind = db_session.bind.sync_engine
+
+    def listener(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith(("INSERT INTO simulationchunk", "UPDATE ecosystem")):
+            statements.append(statement.split()[2 if "INSERT" in statement else 1])
+
+    simulation_id = uuid4()
+    event.listen(bind, "before_cursor_execute", listener)
+    try:
+        await EcoSystemService(db_session).run_simulation(
+            UUID(ecosystem_id), simulation_id, cycles=7
+        )
+    finally:
+        event.remove(bind, "before_cursor_execute", listener)
+
+    # Day 1 and 2 are written with their last cycle, day 3 when the run stops
+    chunks = [
+        index for index, table in enumerate(statements) if table == "simulationchunk"
+    ]
+    assert len(chunks) == 3
+    assert "ecosystem" in statements[chunks[0] : chunks[1]]
+    assert "ecosystem" in statements[chunks[1] : chunks[2]]
+    simulation = await db_session.get(Simulation, simulation_id)
+    assert simulation.simulation_results is None
+
+    response = await client.get(
+        f"/ecosystem/{simulation_id}",
+        params={"ecosystem_name": "Chunked", "start": 0, "end": 10},
+    )
+    assert list(response.json()) == ["day 1", "day 2", "day 3"]
+    response = await client.get(
+        f"/ecosystem/{simulation_id}",
+        params={"ecosystem_name": "Chunked", "start": 1, "end": 2},
+    )
+    assert list(response.json()) == ["day 2"]
+    assert any("Rabbit" in json.dumps(event) for event in response.json()["day 2"])
+
+    # Simulations run before the chunks still read from their whole log
+    legacy_id = uuid4()
+    db_session.add(
+        Simulation(
+            simulation_id=legacy_id,
+            ecosystem_id=UUID(ecosystem_id),
+            simulation_results=compress_json({"day 1": ["old"], "day 2": []}),
+        )
+    )
+    await db_session.commit()
+    response = await client.get(
+        f"/ecosystem/{legacy_id}", params={"ecosystem_name": "Chunked", "end": 1}
+    )
+    assert response.json() == {"day 1": ["old"]}
+
+
+@pytest.mark.asyncio
+async def test_simulation_with_a_lone_hunter(
+    db_session: AsyncSession, client: AsyncClient
+):
+    ecosystem_id = await create_simulated_ecosystem(
+        client, "Lonely", [("Wolf", "predator", "carnivore")], [], {"Wolf": 1}
+    )
+
+    # Used to draw prey until it found one other than the hunter itself
+    random.seed(1)
+    simulation = await client.get(f"/ecosystem/{ecosystem_id}/simulate?cycles=9")
+    simulation_id = simulation.json()["simulation_id"]
+    response = await client.get(
+        f"/ecosystem/simulation/{simulation_id}/events?actor=Wolf"
+    )
+    assert "No prey found for Wolf." in json.dumps(response.json()["events"])
+
+
+@pytest.mark.asyncio
+async def test_simulation_deletes_the_dead_once(
+    db_session: AsyncSession, client: AsyncClient
+):
+    ecosystem_id = await create_simulated_ecosystem(
+        client,
+        "Withering",
+        [("Rabbit", "herbivore", "herbivore")],
+        [("Fern", 0), ("Oak", 50)],
+        {"Rabbit": 2, "Fern": 3, "Oak": 2},
+    )
+
+    deleted = []
+    bind = db_session.bind.sync_engine
+
+    def listener(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("DELETE FROM plantindividual"):
+            deleted.extend(parameters if executemany else [parameters])
+
+    event.listen(bind, "before_cursor_execute", listener)
+    random.seed(2)
+    try:
+        # The ferns die on the first cycle, the rabbits and oaks keep the
+        # simulation going
+        await EcoSystemService(db_session).run_simulation(
+            UUID(ecosystem_id), uuid4(), cycles=3
+        )
+    finally:
+        event.remove(bind, "before_cursor_execute", listener)
+
+    assert len(deleted) == 3
+    response = await client.get(f"/ecosystem/{ecosystem_id}/plants")
+    assert [plant["name"] for plant in response.json()["all_plants"]] == ["Oak"] * 2
+
+
 @pytest.mark.asyncio
 async def test_delete_ecosystem(db_session: AsyncSession, client: AsyncClient):
     ecosystem_payload = {
@@ -134,6 +465,121 @@ async def test_delete_ecosystem(db_session: AsyncSession, client: AsyncClient):
     assert response.status_code == 204
 
 
+@pytest.mark.asyncio
+async def test_delete_ecosystem_with_members(
+    db_session: AsyncSession, client: AsyncClient
+):
+    ecosystem = await client.post(
+        "/ecosystem/create", json={"name": "Ecosystem test", "water_available": 1000}
+    )
+    ecosystem_id = ecosystem.json()["ecosystem_created"]["id"]
+    await client.post(
+        "/organism/create",
+        json={
+            "name": "Meerkat",
+            "weight": 0.7,
+            "size": 0.5,
+            "max_age": 14,
+            "water_consumption": 0.1,
+            "food_consumption": 0.2,
+        },
+        params={"type": "omnivore", "diet_type": "omnivore"},
+    )
+    await client.post(
+        "/plant/create",
+        json={"name": "Arbust", "weight": 50, "max_age": 15, "water_need": 5},
+        params={"type": "tree"},
+    )
+    await client.post(
+        f"/ecosystem/organism/add?organism_name=Meerkat&ecosystem_id={ecosystem_id}",
+    )
+    await client.post(
+        f"/ecosystem/plant/add?plant_name=Arbust&ecosystem_id={ecosystem_id}",
+    )
+
+    response = await client.delete(f"/ecosystem/{ecosystem_id}")
+    assert response.status_code == 204
+
+    response = await client.get("/ecosystem/summary")
+    assert response.json()["ecosystems"] == []
+    response = await client.get("/organism/all")
+    assert response.json()["organisms"] == ["Meerkat"]
+    # Removed by ON DELETE CASCADE, without loading them
+    for model in (OrganismIndividual, PlantIndividual):
+        members = await db_session.execute(select(model))
+        assert members.all() == []
+
+
+@pytest.mark.asyncio
+async def test_deleting_a_template_keeps_its_individuals(
+    db_session: AsyncSession, client: AsyncClient
+):
+    ecosystem = await client.post(
+        "/ecosystem/create",
+        json={
+            "name": "Keeper",
+            "water_available": 1000,
+            "minimum_water_to_add_per_simulation": 50,
+            "max_water_to_add_per_simulation": 200,
+        },
+    )
+    ecosystem_id = ecosystem.json()["ecosystem_created"]["id"]
+    base = {"weight": 1, "size": 1, "water_consumption": 1, "food_consumption": 1}
+    await client.post(
+        "/organism/bulk",
+        json=[
+            {
+                **base,
+                "name": "Wolf",
+                "type": "predator",
+                "diet_type": "carnivore",
+                "prey": "Rabbit",
+            },
+            {**base, "name": "Rabbit", "type": "herbivore", "diet_type": "herbivore"},
+        ],
+    )
+    await client.post(
+        "/plant/create", json={"name": "Oak", "weight": 50}, params={"type": "tree"}
+    )
+    await client.post(
+        f"/ecosystem/{ecosystem_id}/seed",
+        json={"composition": {"Wolf": 2, "Rabbit": 1, "Oak": 1}},
+    )
+    organisms = await client.get("/organism/all", params={"detailed": True})
+    wolf = next(
+        organism
+        for organism in organisms.json()["organisms"]
+        if organism["name"] == "Wolf"
+    )
+
+    response = await client.delete(f"/organism/{wolf['id']}/delete")
+    assert response.status_code == 204
+    response = await client.delete("/plant/Oak/delete")
+    assert response.status_code == 204
+
+    response = await client.get("/organism/all")
+    assert response.json()["organisms"] == ["Rabbit"]
+    response = await client.get(f"/ecosystem/{ecosystem_id}/organisms")
+    assert sorted(
+        organism["name"] for organism in response.json()["all_organisms"]
+    ) == [
+        "Rabbit",
+        "Wolf",
+        "Wolf",
+    ]
+    response = await client.get(f"/ecosystem/{ecosystem_id}/plants")
+    assert [plant["name"] for plant in response.json()["all_plants"]] == ["Oak"]
+    # The private Wolf kept hunting rabbits
+    links = await db_session.execute(select(PredationLink))
+    assert len(links.all()) == 1
+
+    response = await client.delete(f"/ecosystem/{ecosystem_id}")
+    assert response.status_code == 204
+    for model in (OrganismIndividual, PlantIndividual, PredationLink):
+        rows = await db_session.execute(select(model))
+        assert rows.all() == []
+
+
 @pytest.mark.asyncio
 async def test_update_ecosystem(db_session: AsyncSession, client: AsyncClient):
     ecosystem_payload = {
@@ -225,6 +671,149 @@ async def test_get_all_organisms_from_a_ecosystem(
     assert len(response.json()["all_organisms"]) == 1
 
 
+@pytest.mark.asyncio
+async def test_get_ecosystem_organisms_etag(
+    db_session: AsyncSession, client: AsyncClient
+):
+    ecosystem_payload = {
+        "name": "Ecosystem test",
+        "water_available": 1000,
+        "minimum_water_to_add_per_simulation": 50,
+        "max_water_to_add_per_simulation": 200,
+    }
+
+    new_ecosystem = await client.post("/ecosystem/create", json=ecosystem_payload)
+    new_ecosystem_id = new_ecosystem.json()["ecosystem_created"]["id"]
+    await client.post(
+        "/organism/create",
+        json={
+            "name": "Meerkat",
+            "weight": 0.7,
+            "size": 0.5,
+            "water_consumption": 0.1,
+            "food_consumption": 0.2,
+        },
+        params={"type": "omnivore", "diet_type": "omnivore"},
+    )
+
+    response = await client.get(f"/ecosystem/{new_ecosystem_id}/organisms")
+    etag = response.headers["etag"]
+    assert response.status_code == 200
+
+    response = await client.get(
+        f"/ecosystem/{new_ecosystem_id}/organisms", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+
+    await client.post(
+        f"/ecosystem/organism/add?organism_name=Meerkat&ecosystem_id={new_ecosystem_id}",
+    )
+    response = await client.get(
+        f"/ecosystem/{new_ecosystem_id}/organisms", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert len(response.json()["all_organisms"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_seed_ecosystem(db_session: AsyncSession, client: AsyncClient):
+    ecosystem_payload = {
+        "name": "Ecosystem test",
+        "water_available": 1000,
+        "minimum_water_to_add_per_simulation": 50,
+        "max_water_to_add_per_simulation": 200,
+    }
+
+    new_ecosystem = await client.post("/ecosystem/create", json=ecosystem_payload)
+    new_ecosystem_id = new_ecosystem.json()["ecosystem_created"]["id"]
+    base = {"weight": 1, "size": 1, "water_consumption": 1, "food_consumption": 1}
+    await client.post(
+        "/organism/bulk",
+        json=[
+            {**base, "name": "Wolf", "type": "predator", "diet_type": "carnivore"},
+            {
+                **base,
+                "name": "Deer",
+                "max_age": 20,
+                "type": "herbivore",
+                "diet_type": "herbivore",
+                "predator": "Wolf",
+            },
+        ],
+    )
+    await client.post(
+        "/plant/create", json={"name": "Oak", "water_need": 5}, params={"type": "tree"}
+    )
+
+    seed = {
+        "composition": {"Wolf": 3, "deer": 5, "Oak": 2},
+        "randomize_age": True,
+        "health_range": [50, 90],
+        "random_seed": 7,
+    }
+    response = await client.post(f"/ecosystem/{new_ecosystem_id}/seed", json=seed)
+    assert response.status_code == 201
+    assert response.json()["seeded"] == {"Wolf": 3, "Deer": 5, "Oak": 2}
+
+    response = await client.get(f"/ecosystem/{new_ecosystem_id}/organisms")
+    organisms = response.json()["all_organisms"]
+    assert len(organisms) == 8
+    assert all(50 <= organism["health"] <= 90 for organism in organisms)
+    assert all(
+        0 <= organism["age"] <= 20
+        for organism in organisms
+        if organism["name"] == "Deer"
+    )
+    response = await client.get(f"/ecosystem/{new_ecosystem_id}/plants")
+    assert len(response.json()["all_plants"]) == 2
+
+    # Seeded individuals share the template link through their species
+    links = await db_session.execute(select(PredationLink))
+    assert len(links.all()) == 1
+
+    response = await client.post(
+        f"/ecosystem/{new_ecosystem_id}/seed", json={"composition": {"Unicorn": 1}}
+    )
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_stream_ecosystem_members(db_session: AsyncSession, client: AsyncClient):
+    new_ecosystem = await client.post(
+        "/ecosystem/create",
+        json={
+            "name": "Streamed",
+            "water_available": 1000,
+            "minimum_water_to_add_per_simulation": 50,
+            "max_water_to_add_per_simulation": 200,
+        },
+    )
+    new_ecosystem_id = new_ecosystem.json()["ecosystem_created"]["id"]
+    await client.post(
+        "/plant/create", json={"name": "Oak", "water_need": 5}, params={"type": "tree"}
+    )
+    await client.post(
+        f"/ecosystem/{new_ecosystem_id}/seed", json={"composition": {"Oak": 3}}
+    )
+
+    response = await client.get("/ecosystem/Streamed/plants/stream")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    plants = [json.loads(line) for line in response.text.splitlines()]
+    assert [plant["name"] for plant in plants] == ["Oak"] * 3
+    assert plants == sorted(plants, key=lambda plant: plant["id"])
+
+    response = await client.get(
+        "/ecosystem/Streamed/plants/stream",
+        headers={"If-None-Match": response.headers["ETag"]},
+    )
+    assert response.status_code == 304
+    response = await client.get(f"/ecosystem/{new_ecosystem_id}/organisms/stream")
+    assert response.text == ""
+
+
 @pytest.mark.asyncio
 async def test_add_organism_from_a_ecosystem(
     db_session: AsyncSession, client: AsyncClient
@@ -272,6 +861,51 @@ async def test_add_organism_from_a_ecosystem(
     assert response.status_code == 201
 
 
+@pytest.mark.asyncio
+async def test_add_a_member_without_loading_the_others(
+    db_session: AsyncSession, client: AsyncClient
+):
+    ecosystem_id = await create_simulated_ecosystem(
+        client,
+        "Crowded",
+        [("Rabbit", "herbivore", "herbivore")],
+        [("Oak", 50)],
+        {"Rabbit": 20, "Oak": 20},
+    )
+    etag = (await client.get(f"/ecosystem/{ecosystem_id}/plants")).headers["ETag"]
+
+    statements = []
+    bind = db_session.bind.sync_engine
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(bind, "before_cursor_execute", listener)
+    try:
+        for kind, name in (("organism", "Rabbit"), ("plant", "Oak")):
+            response = await client.post(
+                f"/ecosystem/{kind}/add",
+                params={f"{kind}_name": name, "ecosystem_id": ecosystem_id},
+            )
+            assert response.status_code == 201
+            assert response.json()["added_to_ecosystem"]["name"] == name
+    finally:
+        event.remove(bind, "before_cursor_execute", listener)
+
+    assert not [
+        sql
+        for sql in statements
+        if sql.lstrip().startswith("SELECT") and "individual" in sql
+    ]
+    response = await client.get(f"/ecosystem/{ecosystem_id}/plants")
+    assert len(response.json()["all_plants"]) == 21
+    assert response.headers["ETag"] != etag
+    response = await client.get(f"/ecosystem/{ecosystem_id}/organisms")
+    assert len(response.json()["all_organisms"]) == 21
+
+    response = await client.post(
+        "/ecosystem/plant/add", params={"plant_name": "Oak", "ecosystem_id": uuid4()}
+    )
+    assert response.status_code == 404
+
+
 @pytest.mark.asyncio
 async def test_update_organism_ecosystem(db_session: AsyncSession, client: AsyncClient):
     ecosystem_payload = {
@@ -552,6 +1186,68 @@ async def test_update_plant_ecosystem(db_session: AsyncSession, client: AsyncCli
     assert response.status_code == 200
 
 
+@pytest.mark.asyncio
+async def test_update_plant_ecosystem_with_many_pollinators(
+    db_session: AsyncSession, client: AsyncClient
+):
+    new_ecosystem = await client.post(
+        "/ecosystem/create", json={"name": "Meadow", "water_available": 1000}
+    )
+    new_ecosystem_id = new_ecosystem.json()["ecosystem_created"]["id"]
+    base = {"weight": 1, "size": 1, "water_consumption": 1, "food_consumption": 1}
+    pollinator = {"type": "pollinator", "diet_type": "nectarivore"}
+    await client.post(
+        "/organism/bulk",
+        json=[
+            {**base, **pollinator, "name": "Bee"},
+            {**base, **pollinator, "name": "Moth"},
+            {**base, **pollinator, "name": "Wasp"},
+            {**base, **pollinator, "name": "Hoverfly"},
+        ],
+    )
+    await client.post(
+        "/plant/create",
+        json={"name": "Clover", "water_need": 1},
+        params={"type": "herb"},
+    )
+    await client.post(
+        f"/ecosystem/{new_ecosystem_id}/seed",
+        json={"composition": {"Bee": 2, "Moth": 1, "Wasp": 1, "Clover": 3}},
+    )
+    other_ecosystem = await client.post(
+        "/ecosystem/create", json={"name": "Orchard", "water_available": 1000}
+    )
+    other_ecosystem_id = other_ecosystem.json()["ecosystem_created"]["id"]
+    await client.post(
+        f"/ecosystem/{other_ecosystem_id}/seed", json={"composition": {"Clover": 1}}
+    )
+    other_plants = await client.get(f"/ecosystem/{other_ecosystem_id}/plants")
+    catalog = await client.get("/plant/all", params={"detailed": True})
+
+    # Wasp isn't listed, Hoverfly has no individuals in the ecosystem and is
+    # taken from the catalog, Butterfly doesn't exist
+    response = await client.patch(
+        f"/ecosystem/plants/Clover/update?ecosystem_id={new_ecosystem_id}",
+        json={"pollinators": "Bee, Moth, Hoverfly, Butterfly"},
+    )
+    assert response.status_code == 200
+    links = await db_session.execute(select(PollinationLink))
+    assert len(links.all()) == 3
+
+    # The links are the species', the other ecosystem and the catalog changed
+    response = await client.get(
+        f"/ecosystem/{other_ecosystem_id}/plants",
+        headers={"If-None-Match": other_plants.headers["ETag"]},
+    )
+    assert response.status_code == 200
+    response = await client.get(
+        "/plant/all",
+        params={"detailed": True},
+        headers={"If-None-Match": catalog.headers["ETag"]},
+    )
+    assert response.status_code == 200
+
+
 @pytest.mark.asyncio
 async def test_remove_plant_from_a_ecosystem(
     db_session: AsyncSession, client: AsyncClient
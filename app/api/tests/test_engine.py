@@ -0,0 +1,314 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event, func, select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlmodel import SQLModel
+
+from app.api.interactions.interaction_functions import rest
+from app.api.services import ecosystem as ecosystem_service
+from app.api.services.ecosystem import EcoSystemService
+from app.api.utils.cache import catalog_cache
+from app.api.utils.warmup import warm_up
+from app.database import session as database
+from app.database.engine import (
+    ENGINE_PROFILES,
+    EngineProfile,
+    InstrumentedPool,
+    engine_options,
+    engine_profile_from_env,
+    pool_status,
+)
+from app.database.enums import DietType, OrganismType
+from app.database.loaders import ECOSYSTEM_MEMBERS, ECOSYSTEM_PLANTS
+from app.database.models import (
+    CatalogVersion,
+    Ecosystem,
+    Organism,
+    new_organism_individual,
+)
+from app.database.session import build_engine, build_sessionmaker, probe
+from app.database.statements import ecosystem_by_id
+
+
+def test_engine_profile_from_env(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("DATABASE_ENGINE_PROFILE", "pgbouncer")
+    monkeypatch.setenv("DATABASE_POOL_SIZE", "12")
+    profile = engine_profile_from_env()
+    assert (profile.name, profile.pool_size, profile.statement_cache_size) == (
+        "pgbouncer",
+        12,
+        0,
+    )
+
+    options = engine_options("postgresql+asyncpg://user@localhost/db", profile)
+    assert options["poolclass"] is InstrumentedPool
+    assert options["connect_args"]["statement_cache_size"] == 0
+
+    monkeypatch.setenv("DATABASE_ENGINE_PROFILE", "huge")
+    with pytest.raises(ValueError):
+        engine_profile_from_env()
+
+
+@pytest.mark.asyncio
+async def test_pool_telemetry(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}"
+    profile = EngineProfile(pool_size=1, max_overflow=1, pool_timeout=0.1)
+    engine = create_async_engine(url, **engine_options(url, profile))
+    try:
+        async with engine.connect(), engine.connect():
+            status = pool_status(engine.sync_engine.pool)
+            assert (status["checked_out"], status["overflow"]) == (2, 1)
+            with pytest.raises(PoolTimeoutError):
+                async with engine.connect():
+                    pass
+        await asyncio.sleep(0)
+
+        status = pool_status(engine.sync_engine.pool)
+        assert status["checked_out"] == 0
+        assert (status["checkouts"], status["overflow_connections"]) == (2, 1)
+        assert status["timeouts"] == 1
+        assert status["checkout_wait_ms"]["max"] >= 100
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_embedded_sqlite_routes_reads_to_the_read_pool(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'embedded.db'}"
+    profile = ENGINE_PROFILES["embedded"]
+    writer = build_engine(url, profile)
+    reader = build_engine(
+        url, profile.model_copy(update={"pool_size": profile.read_pool_size}), True
+    )
+    try:
+        async with writer.begin() as connection:
+            await connection.run_sync(SQLModel.metadata.create_all)
+            journal_mode = await connection.scalar(text("PRAGMA journal_mode"))
+            assert journal_mode == "wal"
+        async with reader.connect() as connection:
+            assert await connection.scalar(text("PRAGMA query_only")) == 1
+            with pytest.raises(OperationalError):
+                await connection.execute(
+                    CatalogVersion.__table__.insert().values(id=1, version=1)
+                )
+
+        async_session = build_sessionmaker(writer, reader)
+        async with async_session() as session:
+            query = select(CatalogVersion.version)
+            assert session.sync_session.get_bind(clause=query) is reader.sync_engine
+            session.add(CatalogVersion(id=1, version=1))
+            await session.flush()
+            # Sticks to the writer, the read pool can't see the flushed row yet
+            assert session.sync_session.get_bind(clause=query) is writer.sync_engine
+            assert await session.scalar(query) == 1
+            await session.commit()
+
+        async with async_session() as session:
+            assert await session.scalar(select(CatalogVersion.version)) == 1
+        assert reader.sync_engine.pool.telemetry.checkouts >= 2
+    finally:
+        await writer.dispose()
+        await reader.dispose()
+
+
+@pytest.mark.asyncio
+async def test_embedded_writes_run_during_a_simulation(
+    tmp_path, monkeypatch: pytest.MonkeyPatch
+):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'embedded.db'}"
+    profile = ENGINE_PROFILES["embedded"].model_copy(update={"pool_timeout": 2})
+    writer = build_engine(url, profile)
+    reader = build_engine(
+        url, profile.model_copy(update={"pool_size": profile.read_pool_size}), True
+    )
+    async_session = build_sessionmaker(writer, reader)
+    ecosystem_fields = {
+        "water_available": 1000,
+        "minimum_water_to_add_per_simulation": 50,
+        "max_water_to_add_per_simulation": 200,
+    }
+    try:
+        async with writer.begin() as connection:
+            await connection.run_sync(SQLModel.metadata.create_all)
+        async with async_session() as session:
+            rabbit = Organism(
+                name="Rabbit",
+                type=OrganismType.herbivore,
+                diet_type=DietType.herbivore,
+                weight=10,
+                size=1,
+                max_age=20,
+                water_consumption=1,
+                food_consumption=1,
+            )
+            ecosystem = Ecosystem(id=uuid4(), name="Busy", **ecosystem_fields)
+            ecosystem.organisms = [new_organism_individual(rabbit) for _ in range(50)]
+            session.add(ecosystem)
+            await session.commit()
+
+        # The writer has to be free while a cycle is computed, it's only held
+        # to write the cycle back
+        held = []
+        monkeypatch.setattr(
+            ecosystem_service,
+            "rest",
+            lambda organism: (
+                held.append(writer.sync_engine.pool.checkedout()) or rest(organism)
+            ),
+        )
+
+        async def simulate():
+            async with async_session() as session:
+                await EcoSystemService(session).run_simulation(
+                    ecosystem.id, uuid4(), cycles=10
+                )
+
+        simulation = asyncio.create_task(simulate())
+        during_simulation = []
+        for index in range(5):
+            async with async_session() as session:
+                session.add(
+                    Ecosystem(id=uuid4(), name=f"Other {index}", **ecosystem_fields)
+                )
+                await session.commit()
+            during_simulation.append(not simulation.done())
+        await simulation
+
+        assert held and set(held) == {0}
+        assert any(during_simulation)
+        async with async_session() as session:
+            assert (
+                await session.scalar(select(func.count()).select_from(Ecosystem)) == 6
+            )
+    finally:
+        await writer.dispose()
+        await reader.dispose()
+
+
+@pytest.mark.asyncio
+async def test_embedded_concurrent_writers_queue_on_the_writer(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'embedded.db'}"
+    profile = ENGINE_PROFILES["embedded"]
+    writer = build_engine(url, profile)
+    reader = build_engine(
+        url, profile.model_copy(update={"pool_size": profile.read_pool_size}), True
+    )
+    async_session = build_sessionmaker(writer, reader)
+    try:
+        async with writer.begin() as connection:
+            await connection.run_sync(SQLModel.metadata.create_all)
+
+        async def write(index: int, fail: bool = False):
+            async with async_session() as session:
+                assert await session.scalar(select(func.count(Ecosystem.id))) >= 0
+                session.add(
+                    Ecosystem(
+                        id=uuid4(),
+                        name=f"Concurrent {index}",
+                        water_available=1000,
+                        minimum_water_to_add_per_simulation=50,
+                        max_water_to_add_per_simulation=200,
+                    )
+                )
+                await session.flush()
+                await asyncio.sleep(0)
+                if fail:
+                    await session.rollback()
+                else:
+                    await session.commit()
+
+        await asyncio.gather(*(write(index, index % 5 == 0) for index in range(20)))
+
+        # No writer hit the database lock, and a rollback only lost its own row
+        assert writer.sync_engine.pool.telemetry.checkouts >= 20
+        async with async_session() as session:
+            names = set(await session.scalars(select(Ecosystem.name)))
+        assert names == {f"Concurrent {index}" for index in range(20) if index % 5}
+    finally:
+        await writer.dispose()
+        await reader.dispose()
+
+
+@pytest.mark.asyncio
+async def test_database_telemetry(client: AsyncClient):
+    response = await client.get("/telemetry/database")
+    assert response.status_code == 200
+    assert response.json()["pool"] == "StaticPool"
+
+
+def test_hot_statements_are_built_once():
+    statement = ecosystem_by_id(ECOSYSTEM_MEMBERS)
+    assert ecosystem_by_id(ECOSYSTEM_MEMBERS) is statement
+    assert ecosystem_by_id(ECOSYSTEM_PLANTS) is not statement
+
+
+@pytest.mark.asyncio
+async def test_stamped_schema_skips_create_all(
+    tmp_path, monkeypatch: pytest.MonkeyPatch
+):
+    engine = build_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'stamped.db'}", EngineProfile()
+    )
+    monkeypatch.setattr(database, "engine", engine)
+    statements = []
+    event.listen(
+        engine.sync_engine,
+        "before_cursor_execute",
+        lambda *args: statements.append(args[2]),
+    )
+    try:
+        # An empty database isn't stamped yet, it gets the full create_all
+        await database.create_db_tables(check_stamp=True)
+        assert any(sql.lstrip().startswith("CREATE TABLE") for sql in statements)
+
+        statements.clear()
+        await database.create_db_tables(check_stamp=True)
+        assert not any("CREATE" in sql for sql in statements)
+        assert len(statements) <= 2
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_probe_gives_up_after_the_timeout():
+    class UnreachableEngine:
+        def connect(self):
+            return self
+
+        async def __aenter__(self):
+            await asyncio.sleep(10)
+
+        async def __aexit__(self, *exc_info):
+            pass
+
+    with pytest.raises(asyncio.TimeoutError):
+        await probe(UnreachableEngine(), 0.01)
+
+
+@pytest.mark.asyncio
+async def test_warm_up_fills_the_catalog_cache(
+    db_session: AsyncSession, client: AsyncClient
+):
+    await client.post(
+        "/plant/create", json={"name": "Oak", "water_need": 5}, params={"type": "tree"}
+    )
+    catalog_cache.clear()
+    await warm_up(db_session)
+    assert ("search_index", "plant") in catalog_cache._entries
+    assert ("plants", False, None, "id", None, 100) in catalog_cache._entries
+
+    statements = []
+    bind = db_session.bind.sync_engine
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(bind, "before_cursor_execute", listener)
+    try:
+        response = await client.get("/plant/all")
+    finally:
+        event.remove(bind, "before_cursor_execute", listener)
+    assert response.json()["plants"] == ["Oak"]
+    assert statements == []
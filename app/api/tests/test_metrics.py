@@ -0,0 +1,75 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.utils.metrics import (
+    DB_QUERIES_PER_REQUEST,
+    HTTP_REQUEST_DURATION,
+    SIMULATION_CYCLES,
+    SIMULATION_ORGANISMS_PROCESSED,
+    Histogram,
+)
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("latency", "Latency", ("route",), buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 3):
+        histogram.observe(value, route='/say "hi"')
+    assert histogram.render() == [
+        "# HELP latency Latency",
+        "# TYPE latency histogram",
+        'latency_bucket{route="/say \\"hi\\"",le="0.1"} 2',
+        'latency_bucket{route="/say \\"hi\\"",le="1"} 3',
+        'latency_bucket{route="/say \\"hi\\"",le="+Inf"} 4',
+        'latency_sum{route="/say \\"hi\\""} 3.65',
+        'latency_count{route="/say \\"hi\\""} 4',
+    ]
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(db_session: AsyncSession, client: AsyncClient):
+    route = {"method": "GET", "route": "/ecosystem/{ecosystem_id}/simulate"}
+    requests = HTTP_REQUEST_DURATION.count(**route, status=200)
+    cycles = SIMULATION_CYCLES.value()
+    processed = SIMULATION_ORGANISMS_PROCESSED.value()
+
+    new_ecosystem = await client.post(
+        "/ecosystem/create",
+        json={
+            "name": "Measured",
+            "water_available": 1000,
+            "minimum_water_to_add_per_simulation": 50,
+            "max_water_to_add_per_simulation": 200,
+        },
+    )
+    ecosystem_id = new_ecosystem.json()["ecosystem_created"]["id"]
+    await client.post(
+        "/organism/create",
+        json={
+            "name": "Meerkat",
+            "weight": 0.7,
+            "size": 0.5,
+            "max_age": 14,
+            "water_consumption": 0.1,
+            "food_consumption": 0.2,
+        },
+        params={"type": "herbivore", "diet_type": "herbivore"},
+    )
+    await client.post(
+        f"/ecosystem/{ecosystem_id}/seed", json={"composition": {"Meerkat": 4}}
+    )
+    await client.get(f"/ecosystem/{ecosystem_id}/simulate", params={"cycles": 2})
+    await client.get("/does/not/exist")
+
+    assert HTTP_REQUEST_DURATION.count(**route, status=200) == requests + 1
+    assert SIMULATION_CYCLES.value() == cycles + 2
+    assert SIMULATION_ORGANISMS_PROCESSED.value() >= processed + 4
+    assert DB_QUERIES_PER_REQUEST.count(route="/ecosystem/create")
+
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE ecosim_db_query_duration_seconds histogram" in response.text
+    assert 'route="/ecosystem/{ecosystem_id}/seed"' in response.text
+    assert 'route="unmatched",status="404"' in response.text
+    assert "/does/not/exist" not in response.text
@@ -0,0 +1,333 @@
+import pytest
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel
+
+from app.database.migrations import SCHEMA_VERSION, get_schema_version, migrate
+
+# The tables as the first release created them, before any migration
+BASELINE_SCHEMA = [
+    "CREATE TABLE ecosystem (id UUID NOT NULL, name VARCHAR NOT NULL, "
+    "water_available FLOAT NOT NULL, food_available FLOAT NOT NULL, "
+    "minimum_water_to_add_per_simulation INTEGER NOT NULL, "
+    "max_water_to_add_per_simulation INTEGER NOT NULL, "
+    "cycle VARCHAR(11) NOT NULL, days INTEGER NOT NULL, "
+    "environment_type VARCHAR(10), year INTEGER, "
+    "simulation_status VARCHAR(10) NOT NULL, PRIMARY KEY (id), UNIQUE (name))",
+    "CREATE INDEX ix_ecosystem_id ON ecosystem (id)",
+    "CREATE TABLE simulation (simulation_id CHAR(32) NOT NULL, "
+    "ecosystem_id CHAR(32) NOT NULL, simulation_results VARCHAR NOT NULL, "
+    "PRIMARY KEY (simulation_id))",
+    "CREATE TABLE organism (id CHAR(32) NOT NULL, name VARCHAR NOT NULL, "
+    "type VARCHAR(10) NOT NULL, weight FLOAT NOT NULL, size FLOAT NOT NULL, "
+    "age FLOAT NOT NULL, max_age FLOAT NOT NULL, "
+    "reproduction_age FLOAT NOT NULL, fertility_rate INTEGER NOT NULL, "
+    "water_consumption FLOAT NOT NULL, food_consumption FLOAT NOT NULL, "
+    "diet_type VARCHAR(11) NOT NULL, activity_cycle VARCHAR(11), "
+    "speed VARCHAR(6), social_behavior VARCHAR(8), environment_type VARCHAR(10), "
+    "ecosystem_id CHAR(32), hunger FLOAT, thirst FLOAT, health FLOAT, "
+    "pregnant BOOLEAN, PRIMARY KEY (id), "
+    "FOREIGN KEY(ecosystem_id) REFERENCES ecosystem (id))",
+    "CREATE TABLE plant (id CHAR(32) NOT NULL, name VARCHAR NOT NULL, "
+    "type VARCHAR(6) NOT NULL, weight FLOAT, size FLOAT, age FLOAT NOT NULL, "
+    "max_age FLOAT, reproduction_age FLOAT, fertility_rate INTEGER, "
+    "environment_type VARCHAR(10), water_need FLOAT, health FLOAT NOT NULL, "
+    "fruiting BOOLEAN NOT NULL, ecosystem_id CHAR(32), PRIMARY KEY (id), "
+    "FOREIGN KEY(ecosystem_id) REFERENCES ecosystem (id))",
+    "CREATE TABLE pollinationlink (pollinator_id CHAR(32) NOT NULL, "
+    "plant_id CHAR(32) NOT NULL, PRIMARY KEY (pollinator_id, plant_id), "
+    "FOREIGN KEY(pollinator_id) REFERENCES organism (id), "
+    "FOREIGN KEY(plant_id) REFERENCES plant (id))",
+    "CREATE TABLE predationlink (predator_id CHAR(32) NOT NULL, "
+    "prey_id CHAR(32) NOT NULL, PRIMARY KEY (predator_id, prey_id), "
+    "FOREIGN KEY(predator_id) REFERENCES organism (id), "
+    "FOREIGN KEY(prey_id) REFERENCES organism (id))",
+]
+
+INSERT_ECOSYSTEM = (
+    "INSERT INTO ecosystem (id, name, water_available, food_available, "
+    "minimum_water_to_add_per_simulation, max_water_to_add_per_simulation, "
+    "cycle, days, version, simulation_status) VALUES "
+    "('eco', 'Savanna', 100, 0, 1, 2, 'diurnal', 0, 0, 'finished')"
+)
+
+
+@pytest.mark.asyncio
+async def test_startup_upgrades_a_baseline_database(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'baseline.db'}")
+    async with engine.begin() as connection:
+        for statement in BASELINE_SCHEMA:
+            await connection.execute(text(statement))
+        await connection.execute(
+            text(
+                "INSERT INTO ecosystem VALUES ('eco', 'Savanna', 100, 0, 1, 2, "
+                "'diurnal', 0, NULL, 0, 'finished')"
+            )
+        )
+        organism = (
+            "INSERT INTO organism (id, name, type, weight, size, age, max_age, "
+            "reproduction_age, fertility_rate, water_consumption, "
+            "food_consumption, diet_type, ecosystem_id, hunger, thirst, health, "
+            "pregnant) VALUES ('{}', '{}', 'predator', 1, 1, 1, 10, 1, 1, 1, 1, "
+            "'carnivore', {}, 0, 0, 100, 0)"
+        )
+        await connection.execute(text(organism.format("wolf", "Wolf", "NULL")))
+        await connection.execute(text(organism.format("wolf1", "Wolf", "'eco'")))
+
+    # What startup runs, see create_db_tables
+    async with engine.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.create_all)
+        assert await connection.run_sync(migrate) == SCHEMA_VERSION
+
+        individuals = await connection.execute(
+            text("SELECT id, species_id FROM organismindividual")
+        )
+        assert individuals.tuples().all() == [("wolf1", "wolf")]
+        foreign_keys = await connection.run_sync(
+            lambda sync_connection: inspect(sync_connection).get_foreign_keys(
+                "organismindividual"
+            )
+        )
+        # Deleting a species detaches its individuals instead of deleting them
+        assert {
+            key["referred_table"]: key["options"].get("ondelete")
+            for key in foreign_keys
+        } == {"organism": None, "ecosystem": "CASCADE"}
+        indexes = await connection.scalars(
+            text("SELECT name FROM sqlite_master WHERE type = 'index'")
+        )
+        assert {
+            "ix_organism_template_lower_name",
+            "ix_simulation_ecosystem_id",
+        } <= set(indexes)
+        columns = await connection.run_sync(
+            lambda sync_connection: [
+                column["name"]
+                for column in inspect(sync_connection).get_columns("organism")
+            ]
+        )
+        assert "species_id" not in columns
+        # Newer simulations leave their whole log out
+        columns = await connection.run_sync(
+            lambda sync_connection: {
+                column["name"]: column["nullable"]
+                for column in inspect(sync_connection).get_columns("simulation")
+            }
+        )
+        assert columns["simulation_results"]
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_migrate_upgrades_existing_database():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.create_all)
+        # Rewind to the schema create_all produced before the lookup indexes
+        for index in [
+            "ix_organism_template_lower_name",
+            "ix_plant_template_lower_name",
+            "ix_simulation_ecosystem_id",
+        ]:
+            await connection.execute(text(f"DROP INDEX {index}"))
+        await connection.execute(text("ALTER TABLE ecosystem DROP COLUMN version"))
+        await connection.execute(text("DELETE FROM schemaversion"))
+
+        assert await connection.run_sync(migrate) == SCHEMA_VERSION
+        assert await connection.run_sync(get_schema_version) == SCHEMA_VERSION
+
+        columns = await connection.run_sync(
+            lambda sync_connection: [
+                column["name"]
+                for column in inspect(sync_connection).get_columns("ecosystem")
+            ]
+        )
+        indexes = await connection.scalars(
+            text("SELECT name FROM sqlite_master WHERE type = 'index'")
+        )
+        assert "version" in columns
+        assert {
+            "ix_organism_template_lower_name",
+            "ix_plant_template_lower_name",
+            "ix_simulation_ecosystem_id",
+        } <= set(indexes)
+
+        # Running it again is a no-op
+        assert await connection.run_sync(migrate) == SCHEMA_VERSION
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_migrate_moves_individuals_out_of_the_catalog():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.create_all)
+        await connection.run_sync(migrate)
+        await connection.execute(text(INSERT_ECOSYSTEM))
+        columns = (
+            "id, name, type, weight, size, speed, max_age, age, reproduction_age, "
+            "fertility_rate, social_behavior, activity_cycle, diet_type, "
+            "water_consumption, food_consumption, ecosystem_id"
+        )
+        for row_id, name, ecosystem_id in [
+            ("wolf", "Wolf", None),
+            ("rabbit", "Rabbit", None),
+            ("wolf1", "Wolf", "'eco'"),
+            ("rabbit1", "rabbit", "'eco'"),
+            ("fox1", "Fox", "'eco'"),
+        ]:
+            await connection.execute(
+                text(
+                    f"INSERT INTO organism ({columns}) VALUES ('{row_id}', "
+                    f"'{name}', 'predator', 1, 1, 'normal', 10, 1, 1, 1, 'pack', "
+                    f"'diurnal', 'carnivore', 1, 1, {ecosystem_id or 'NULL'})"
+                )
+            )
+        # Links written by the old per-individual copies
+        await connection.execute(
+            text(
+                "INSERT INTO predationlink VALUES "
+                "('wolf', 'rabbit'), ('wolf1', 'rabbit1'), ('wolf1', 'rabbit')"
+            )
+        )
+        await connection.execute(text("UPDATE schemaversion SET version = 3"))
+
+        assert await connection.run_sync(migrate) == SCHEMA_VERSION
+
+        # Without a template the fox stays behind as its own species
+        species = await connection.scalars(text("SELECT id FROM organism"))
+        assert set(species) == {"wolf", "rabbit", "fox1"}
+        individuals = await connection.execute(
+            text("SELECT id, species_id, ecosystem_id FROM organismindividual")
+        )
+        assert set(individuals.tuples().all()) == {
+            ("wolf1", "wolf", "eco"),
+            ("rabbit1", "rabbit", "eco"),
+            ("fox1", "fox1", "eco"),
+        }
+        links = await connection.execute(text("SELECT * FROM predationlink"))
+        assert links.tuples().all() == [("wolf", "rabbit")]
+        view = await connection.execute(
+            text("SELECT name, age FROM organism_view WHERE id = 'wolf1'")
+        )
+        assert view.tuples().all() == [("Wolf", 1)]
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_migrate_adds_cascading_foreign_keys():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.create_all)
+        await connection.run_sync(migrate)
+        # Rewind to the predation links without ON DELETE CASCADE
+        await connection.execute(text("DROP TABLE predationlink"))
+        await connection.execute(
+            text(
+                "CREATE TABLE predationlink ("
+                "predator_id CHAR(32) NOT NULL REFERENCES organism (id), "
+                "prey_id CHAR(32) NOT NULL REFERENCES organism (id), "
+                "PRIMARY KEY (predator_id, prey_id))"
+            )
+        )
+        for name in ("wolf", "rabbit"):
+            await connection.execute(
+                text(
+                    "INSERT INTO organism (id, name, type, weight, size, age, "
+                    "max_age, reproduction_age, fertility_rate, water_consumption, "
+                    "food_consumption, diet_type) VALUES "
+                    f"('{name}', '{name}', 'predator', 1, 1, 0, 1, 0, 1, 1, 1, "
+                    "'carnivore')"
+                )
+            )
+        await connection.execute(
+            text(
+                "INSERT INTO predationlink VALUES "
+                "('wolf', 'rabbit'), ('wolf', 'deleted')"
+            )
+        )
+        await connection.execute(text("UPDATE schemaversion SET version = 5"))
+
+        assert await connection.run_sync(migrate) == SCHEMA_VERSION
+
+        foreign_keys = await connection.run_sync(
+            lambda sync_connection: inspect(sync_connection).get_foreign_keys(
+                "predationlink"
+            )
+        )
+        assert {key["options"].get("ondelete") for key in foreign_keys} == {"CASCADE"}
+        links = await connection.execute(text("SELECT * FROM predationlink"))
+        assert links.tuples().all() == [("wolf", "rabbit")]
+        # The views were rebuilt around the new tables
+        await connection.execute(text("SELECT * FROM organism_view"))
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_migrate_drops_the_catalog_species_ids():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.create_all)
+        await connection.run_sync(migrate)
+        # Rewind to the catalog of revision 7
+        for table in ("organism", "plant"):
+            await connection.execute(
+                text(
+                    f"ALTER TABLE {table} ADD COLUMN species_id CHAR(32) "
+                    f"REFERENCES {table} (id) ON DELETE SET NULL"
+                )
+            )
+            await connection.execute(
+                text(f"CREATE INDEX ix_{table}_species_id ON {table} (species_id)")
+            )
+        await connection.execute(text(INSERT_ECOSYSTEM))
+        for name in ("wolf", "rabbit"):
+            await connection.execute(
+                text(
+                    "INSERT INTO organism (id, name, type, weight, size, age, "
+                    "max_age, reproduction_age, fertility_rate, water_consumption, "
+                    "food_consumption, diet_type) VALUES "
+                    f"('{name}', '{name}', 'predator', 1, 1, 0, 1, 0, 1, 1, 1, "
+                    "'carnivore')"
+                )
+            )
+        await connection.execute(
+            text("INSERT INTO predationlink VALUES ('wolf', 'rabbit')")
+        )
+        await connection.execute(
+            text(
+                "INSERT INTO organismindividual (id, species_id, ecosystem_id, age) "
+                "VALUES ('wolf1', 'wolf', 'eco', 3)"
+            )
+        )
+        await connection.execute(text("UPDATE schemaversion SET version = 7"))
+
+        assert await connection.run_sync(migrate) == SCHEMA_VERSION
+
+        def catalog(sync_connection):
+            inspector = inspect(sync_connection)
+            return {
+                table: [column["name"] for column in inspector.get_columns(table)]
+                for table in ("organism", "plant")
+            }, inspector.get_foreign_keys("organismindividual")
+
+        columns, foreign_keys = await connection.run_sync(catalog)
+        assert all("species_id" not in names for names in columns.values())
+        # The members still point at the rebuilt catalog
+        assert {key["referred_table"] for key in foreign_keys} == {
+            "organism",
+            "ecosystem",
+        }
+        indexes = await connection.scalars(
+            text("SELECT name FROM sqlite_master WHERE type = 'index'")
+        )
+        indexes = set(indexes)
+        assert "ix_organism_species_id" not in indexes
+        assert "ix_organism_template_lower_name" in indexes
+        links = await connection.execute(text("SELECT * FROM predationlink"))
+        assert links.tuples().all() == [("wolf", "rabbit")]
+        view = await connection.execute(
+            text("SELECT name, age, species_id FROM organism_view")
+        )
+        assert view.tuples().all() == [("wolf", 3, "wolf")]
+    await engine.dispose()
@@ -1,9 +1,15 @@
+import json
 from uuid import UUID
 
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.utils import defaults
+from app.api.utils.cache import catalog_cache
+from app.database.models import Organism, PollinationLink, PredationLink
+
 
 @pytest.mark.asyncio
 async def test_create_organism(db_session: AsyncSession, client: AsyncClient):
@@ -161,3 +167,173 @@ async def test_get_organism_by_name(db_session: AsyncSession, client: AsyncClien
 
     response = await client.get("/organism/?search=Ant")
     assert len(response.json()) == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", ["memory", "database"])
+async def test_get_all_organisms_is_cached_until_catalog_write(
+    backend: str, db_session: AsyncSession, client: AsyncClient
+):
+    catalog_cache.configure(backend)
+    organism_payload = {
+        "name": "Ant",
+        "weight": 0.000003,
+        "size": 0.01,
+        "max_age": 1,
+        "water_consumption": 0.0001,
+        "food_consumption": 0.0002,
+    }
+    params = {"type": "omnivore", "diet_type": "omnivore"}
+    try:
+        await client.post("/organism/create", json=organism_payload, params=params)
+        response = await client.get("/organism/all", params={"order_by": "name"})
+        assert response.json()["organisms"] == ["Ant"]
+
+        # Written behind the service's back: served from the cache
+        db_session.add(
+            Organism(
+                **{**organism_payload, "name": "Bee"},
+                type="pollinator",
+                diet_type="nectarivore",
+            )
+        )
+        await db_session.commit()
+        response = await client.get("/organism/all", params={"order_by": "name"})
+        assert response.json()["organisms"] == ["Ant"]
+
+        await client.post(
+            "/organism/create",
+            json={**organism_payload, "name": "Super Ant"},
+            params=params,
+        )
+        response = await client.get("/organism/all", params={"order_by": "name"})
+        assert response.json()["organisms"] == ["Ant", "Bee", "Super Ant"]
+    finally:
+        catalog_cache.configure("memory")
+
+
+@pytest.mark.asyncio
+async def test_stream_all_organisms(db_session: AsyncSession, client: AsyncClient):
+    base = {"weight": 1, "size": 1, "water_consumption": 1, "food_consumption": 1}
+    await client.post(
+        "/organism/bulk",
+        json=[
+            {**base, "name": name, "type": "herbivore", "diet_type": "herbivore"}
+            for name in ("Deer", "Elk", "Moose")
+        ],
+    )
+
+    response = await client.get(
+        "/organism/all/stream", params={"fields": "name,diet_type"}
+    )
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(line["name"] for line in lines) == ["Deer", "Elk", "Moose"]
+    assert lines[0].keys() == {"name", "diet_type"}
+
+    response = await client.get("/organism/all/stream", params={"fields": "nope"})
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_search_organisms_ranked_and_typo_tolerant(
+    db_session: AsyncSession, client: AsyncClient
+):
+    for name in ["Grey Wolf", "Wolf", "Wolverine", "Red Fox"]:
+        await client.post(
+            "/organism/create",
+            json={
+                "name": name,
+                "weight": 30,
+                "size": 1,
+                "water_consumption": 1,
+                "food_consumption": 1,
+            },
+            params={"type": "predator", "diet_type": "carnivore"},
+        )
+
+    response = await client.get("/organism/?search=wolf")
+    names = [organism["name"] for organism in response.json()]
+    assert names[:2] == ["Wolf", "Grey Wolf"]
+    assert "Red Fox" not in names
+
+    response = await client.get("/organism/?search=wolv")
+    assert response.json()[0]["name"] == "Wolverine"
+
+    response = await client.get("/organism/?search=wolff")
+    assert response.json()[0]["name"] == "Wolf"
+
+    response = await client.get("/organism/", params={"search": "wol", "limit": 1})
+    assert len(response.json()) == 1
+
+
+@pytest.mark.asyncio
+async def test_create_organisms_bulk(db_session: AsyncSession, client: AsyncClient):
+    base = {"weight": 1, "size": 1, "water_consumption": 1, "food_consumption": 1}
+    predator = {"type": "predator", "diet_type": "carnivore"}
+    herbivore = {"type": "herbivore", "diet_type": "herbivore"}
+    response = await client.post(
+        "/organism/bulk",
+        json=[
+            {**base, **predator, "name": "Wolf", "prey": "Rabbit,Deer"},
+            {**base, **herbivore, "name": "Rabbit", "predator": "Wolf"},
+            {**base, **herbivore, "name": "Deer"},
+            {**base, **herbivore, "name": "rabbit"},
+            {**base, **predator, "name": "Fox", "prey": "Unicorn"},
+            {**base, **predator, "name": "Lynx", "prey": "Fox"},
+            {"name": "Broken", "type": "herbivore"},
+        ],
+    )
+    assert response.status_code == 201
+    body = response.json()
+    assert [organism["name"] for organism in body["created"]] == [
+        "Wolf",
+        "Rabbit",
+        "Deer",
+    ]
+    assert [error["index"] for error in body["errors"]] == [3, 4, 5, 6]
+
+    # Wolf -> Rabbit is declared on both sides but stored once
+    links = await db_session.execute(select(PredationLink))
+    assert len(links.all()) == 2
+
+
+@pytest.mark.asyncio
+async def test_add_defaults_and_biome_pack(
+    db_session: AsyncSession, client: AsyncClient, monkeypatch: pytest.MonkeyPatch
+):
+    response = await client.post("/defaults/add_defaults")
+    assert response.status_code == 200
+    assert response.json()["organisms added"].startswith("20:")
+
+    response = await client.post("/defaults/add_defaults")
+    assert response.status_code == 400
+
+    # NULL is the environment of the defaults
+    response = await client.post("/defaults/add_defaults", params={"biome": "NULL"})
+    assert response.status_code == 400
+
+    response = await client.post("/defaults/add_defaults", params={"biome": "TAIGA"})
+    assert response.status_code == 200
+    assert response.json()["organisms added"].startswith("10:")
+    assert response.json()["links added"] == 12
+    response = await client.get("/organism/?search=Moose")
+    assert response.json()[0]["environment_type"] == "TAIGA"
+    wolf = await db_session.scalar(
+        select(Organism.id).where(Organism.name == "Timber Wolf")
+    )
+    prey = await db_session.scalars(
+        select(Organism.name)
+        .join(PredationLink, PredationLink.prey_id == Organism.id)
+        .where(PredationLink.predator_id == wolf)
+        .order_by(Organism.name)
+    )
+    assert prey.all() == ["Moose", "Snowshoe Hare"]
+
+    monkeypatch.setattr(defaults.random, "choice", lambda packs: packs[-1])
+    response = await client.post("/defaults/add_defaults", params={"biome": "RANDOM"})
+    assert response.status_code == 200
+    assert response.json()["biome"] == "TUNDRA"
+
+    links = await db_session.execute(select(PollinationLink))
+    assert len(links.all()) >= 5
@@ -0,0 +1,221 @@
+import random
+from types import SimpleNamespace
+from uuid import UUID, uuid4
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event, func, select, update
+from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.services.ecosystem import EcoSystemService
+from app.database.enums import DietType, OrganismType, SimulationStatus
+from app.database.models import Ecosystem, Organism, OrganismIndividual
+from app.database.persistence import insert_rows, records, write_back
+
+
+def test_copy_records_take_defaults_and_enum_names():
+    connection = SimpleNamespace(dialect=asyncpg_dialect())
+    columns, values = records(
+        connection,
+        Ecosystem.__table__,
+        [
+            {
+                "id": uuid4(),
+                "name": "Copied",
+                "water_available": 10,
+                "minimum_water_to_add_per_simulation": 1,
+                "max_water_to_add_per_simulation": 2,
+                "simulation_status": SimulationStatus.processing,
+            }
+        ],
+    )
+    row = dict(zip(columns, values[0]))
+    assert row["simulation_status"] == SimulationStatus.processing.name
+    assert (row["days"], row["version"], row["cycle"]) == (0, 0, "diurnal")
+
+
+@pytest.mark.asyncio
+async def test_write_back_updates_members_without_the_flush(db_session: AsyncSession):
+    ecosystem_id, species_id = uuid4(), uuid4()
+    await insert_rows(
+        db_session,
+        Ecosystem.__table__,
+        [
+            {
+                "id": ecosystem_id,
+                "name": "Bulk",
+                "water_available": 10,
+                "minimum_water_to_add_per_simulation": 1,
+                "max_water_to_add_per_simulation": 2,
+            }
+        ],
+    )
+    await insert_rows(
+        db_session,
+        Organism.__table__,
+        [
+            {
+                "id": species_id,
+                "name": "Wolf",
+                "type": OrganismType.predator,
+                "weight": 40,
+                "size": 1,
+                "water_consumption": 2,
+                "food_consumption": 3,
+                "diet_type": DietType.carnivore,
+            }
+        ],
+    )
+    # Rows missing a column get its default
+    await insert_rows(
+        db_session,
+        OrganismIndividual.__table__,
+        [
+            {"species_id": species_id, "ecosystem_id": ecosystem_id, "age": 3},
+            {"species_id": species_id, "ecosystem_id": ecosystem_id},
+        ],
+    )
+    await db_session.commit()
+
+    members = (await db_session.scalars(select(OrganismIndividual))).all()
+    assert sorted(member.age for member in members) == [0, 3]
+    for member in members:
+        member.health -= 10
+    members[0].hunger = 50
+
+    statements = []
+    bind = db_session.bind.sync_engine
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(bind, "before_cursor_execute", listener)
+    try:
+        assert await write_back(db_session, members) == 2
+        assert not any(db_session.is_modified(member) for member in members)
+        await db_session.commit()
+    finally:
+        event.remove(bind, "before_cursor_execute", listener)
+    assert len([sql for sql in statements if sql.startswith("UPDATE")]) == 1
+
+    rows = await db_session.execute(
+        select(
+            OrganismIndividual.id, OrganismIndividual.health, OrganismIndividual.hunger
+        )
+    )
+    state = {member_id: (health, hunger) for member_id, health, hunger in rows}
+    assert state[members[0].id] == (90, 50)
+    assert state[members[1].id] == (90, 0)
+
+
+@pytest.mark.asyncio
+async def test_simulation_writes_members_back_in_one_update_per_cycle(
+    db_session: AsyncSession, client: AsyncClient
+):
+    response = await client.post(
+        "/ecosystem/create",
+        json={
+            "name": "Written back",
+            "water_available": 1000,
+            "minimum_water_to_add_per_simulation": 50,
+            "max_water_to_add_per_simulation": 200,
+        },
+    )
+    ecosystem_id = response.json()["ecosystem_created"]["id"]
+    for name, organism_type, diet_type in [
+        ("Wolf", "predator", "carnivore"),
+        ("Rabbit", "herbivore", "herbivore"),
+    ]:
+        await client.post(
+            "/organism/create",
+            json={
+                "name": name,
+                "weight": 10,
+                "size": 1,
+                "max_age": 20,
+                "water_consumption": 1,
+                "food_consumption": 1,
+            },
+            params={"type": organism_type, "diet_type": diet_type},
+        )
+    await client.post(
+        "/plant/create",
+        json={"name": "Oak", "water_need": 1, "weight": 50, "max_age": 100},
+        params={"type": "tree"},
+    )
+    await client.post(
+        f"/ecosystem/{ecosystem_id}/seed",
+        json={"composition": {"Wolf": 5, "Rabbit": 20, "Oak": 10}},
+    )
+
+    statements = []
+    bind = db_session.bind.sync_engine
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(bind, "before_cursor_execute", listener)
+    random.seed(3)
+    try:
+        await EcoSystemService(db_session).run_simulation(
+            UUID(ecosystem_id), uuid4(), cycles=3
+        )
+    finally:
+        event.remove(bind, "before_cursor_execute", listener)
+
+    for table in ("organismindividual", "plantindividual"):
+        updates = [sql for sql in statements if sql.startswith(f"UPDATE {table}")]
+        assert len(updates) == 3
+
+
+@pytest.mark.asyncio
+async def test_simulation_births_are_built_without_queries(
+    db_session: AsyncSession, client: AsyncClient
+):
+    response = await client.post(
+        "/ecosystem/create",
+        json={
+            "name": "Nursery",
+            "water_available": 1000,
+            "minimum_water_to_add_per_simulation": 50,
+            "max_water_to_add_per_simulation": 200,
+        },
+    )
+    ecosystem_id = response.json()["ecosystem_created"]["id"]
+    await client.post(
+        "/organism/create",
+        json={
+            "name": "Rabbit",
+            "weight": 10,
+            "size": 1,
+            "max_age": 20,
+            "water_consumption": 1,
+            "food_consumption": 1,
+        },
+        params={"type": "herbivore", "diet_type": "herbivore"},
+    )
+    await client.post(
+        f"/ecosystem/{ecosystem_id}/seed", json={"composition": {"Rabbit": 20}}
+    )
+    # Pregnant rabbits give birth when they draw the reproduce action
+    await db_session.execute(update(OrganismIndividual).values(pregnant=True))
+    await db_session.commit()
+
+    statements = []
+    bind = db_session.bind.sync_engine
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(bind, "before_cursor_execute", listener)
+    random.seed(4)
+    try:
+        await EcoSystemService(db_session).run_simulation(
+            UUID(ecosystem_id), uuid4(), cycles=2
+        )
+    finally:
+        event.remove(bind, "before_cursor_execute", listener)
+
+    members = await db_session.scalar(
+        select(func.count()).select_from(OrganismIndividual)
+    )
+    assert members > 20
+    # Everything is read before the first cycle is written
+    first_write = next(
+        index
+        for index, sql in enumerate(statements)
+        if sql.startswith("UPDATE organismindividual")
+    )
+    assert not any(sql.startswith("SELECT") for sql in statements[first_write:])
@@ -106,3 +106,119 @@ async def test_delete_plant(db_session: AsyncSession, client: AsyncClient):
     )
 
     assert response.status_code == 204
+
+
+@pytest.mark.asyncio
+async def test_recreate_a_deleted_plant_used_by_ecosystems(
+    db_session: AsyncSession, client: AsyncClient
+):
+    plant_payload = {"name": "Oak", "weight": 50, "water_need": 5}
+    await client.post("/plant/create", json=plant_payload, params={"type": "tree"})
+    for name in ("Forest", "Park"):
+        ecosystem = await client.post(
+            "/ecosystem/create", json={"name": name, "water_available": 1000}
+        )
+        await client.post(
+            f"/ecosystem/{ecosystem.json()['ecosystem_created']['id']}/seed",
+            json={"composition": {"Oak": 2}},
+        )
+
+    response = await client.delete("/plant/Oak/delete")
+    assert response.status_code == 204
+    # Both ecosystems keep a private Oak, which isn't the template
+    response = await client.delete("/plant/Oak/delete")
+    assert response.status_code == 404
+
+    response = await client.post(
+        "/plant/create", json=plant_payload, params={"type": "tree"}
+    )
+    assert response.status_code == 201
+    response = await client.patch("/plant/Oak/update", json={"water_need": 3})
+    assert response.status_code == 200
+    response = await client.delete("/plant/Oak/delete")
+    assert response.status_code == 204
+
+
+@pytest.mark.asyncio
+async def test_get_all_plants_paginated(db_session: AsyncSession, client: AsyncClient):
+    for name in ["Oak", "Fern", "Lily"]:
+        await client.post(
+            "/plant/create",
+            json={"name": name, "water_need": 5},
+            params={"type": "tree"},
+        )
+
+    response = await client.get(
+        "/plant/all",
+        params={
+            "detailed": True,
+            "fields": "name,type",
+            "order_by": "name",
+            "limit": 2,
+        },
+    )
+    assert response.status_code == 200
+    first_page = response.json()
+    assert first_page["plants"] == [
+        {"name": "Fern", "type": "tree"},
+        {"name": "Lily", "type": "tree"},
+    ]
+
+    response = await client.get(
+        "/plant/all",
+        params={
+            "order_by": "name",
+            "limit": 2,
+            "after": first_page["next_cursor"],
+        },
+    )
+    assert response.json() == {"plants": ["Oak"], "next_cursor": None}
+
+    response = await client.get(
+        "/plant/all", params={"detailed": True, "fields": "name,unknown"}
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_get_all_plants_etag(db_session: AsyncSession, client: AsyncClient):
+    await client.post(
+        "/plant/create", json={"name": "Oak", "water_need": 5}, params={"type": "tree"}
+    )
+
+    response = await client.get("/plant/all")
+    etag = response.headers["etag"]
+
+    response = await client.get("/plant/all", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    response = await client.get("/plant/?search=oak", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    await client.post(
+        "/plant/create", json={"name": "Fern", "water_need": 5}, params={"type": "tree"}
+    )
+    response = await client.get("/plant/all", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()["plants"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_create_plants_bulk_ndjson(db_session: AsyncSession, client: AsyncClient):
+    lines = [
+        b'{"name": "Oak", "type": "tree", "water_need": 5}',
+        b'{"name": "Fern", "type": "bush"',
+        b'{"name": "Lily", "type": "flower", "pollinators": "Bee"}',
+    ]
+    response = await client.post(
+        "/plant/bulk",
+        content=b"\n".join(lines),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 201
+    body = response.json()
+    assert [plant["name"] for plant in body["created"]] == ["Oak"]
+    assert [error["index"] for error in body["errors"]] == [1, 2]
+
+    response = await client.post("/plant/bulk", json={"name": "Oak"})
+    assert response.status_code == 400
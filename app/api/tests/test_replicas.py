@@ -0,0 +1,159 @@
+import time
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+from sqlmodel import SQLModel
+
+from app.api.utils import search
+from app.api.utils.cache import catalog_cache
+from app.api.utils.read_your_writes import ReadYourWritesMiddleware
+from app.api.utils.search import search_templates
+from app.database import session as database
+from app.database.engine import EngineProfile
+from app.database.enums import DietType, OrganismType
+from app.database.models import Organism
+from app.database.replicas import STICKY_COOKIE
+from app.main import app
+
+
+@pytest.mark.asyncio
+async def test_reads_go_to_the_replica_unless_the_client_just_wrote(
+    tmp_path, monkeypatch: pytest.MonkeyPatch
+):
+    profile = EngineProfile(pool_size=1, max_overflow=0)
+    primary = database.build_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}", profile
+    )
+    replica = database.build_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}", profile
+    )
+    try:
+        for engine in (primary, replica):
+            async with engine.begin() as connection:
+                await connection.run_sync(SQLModel.metadata.create_all)
+
+        monkeypatch.setattr(app, "dependency_overrides", {})
+        database.set_replica_sessionmakers(
+            [database.build_replica_sessionmaker(replica)]
+        )
+        monkeypatch.setattr(
+            database, "_sessionmaker_global", database.build_sessionmaker(primary)
+        )
+        transport = ASGITransport(app=ReadYourWritesMiddleware(app))
+
+        async with AsyncClient(transport=transport, base_url="http://test") as writer:
+            response = await writer.post(
+                "/ecosystem/create",
+                json={
+                    "name": "Replicated",
+                    "water_available": 1000,
+                    "minimum_water_to_add_per_simulation": 50,
+                    "max_water_to_add_per_simulation": 200,
+                },
+            )
+            assert response.status_code == 201
+            assert STICKY_COOKIE in response.cookies
+
+            # The replica never received the row, only the primary has it
+            response = await writer.get("/ecosystem/all")
+            assert len(response.json()["ecosystems"]) == 1
+
+            writer.cookies.set(STICKY_COOKIE, str(time.time() - 1))
+            response = await writer.get("/ecosystem/all")
+            assert response.json()["ecosystems"] == []
+
+        async with AsyncClient(transport=transport, base_url="http://test") as reader:
+            response = await reader.get("/ecosystem/all")
+            assert response.json()["ecosystems"] == []
+            assert STICKY_COOKIE not in response.cookies
+    finally:
+        database.set_replica_sessionmakers([])
+        await primary.dispose()
+        await replica.dispose()
+
+
+@pytest.mark.asyncio
+async def test_replica_search_reads_a_bounded_candidate_set(tmp_path):
+    replica = database.build_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}", EngineProfile()
+    )
+    try:
+        async with replica.begin() as connection:
+            await connection.run_sync(SQLModel.metadata.create_all)
+        async_session = database.build_replica_sessionmaker(replica)
+        async with async_session() as session:
+            for name in ["Grey Wolf", "Wolf", "Wolverine", "Red Fox"]:
+                session.add(
+                    Organism(
+                        name=name,
+                        type=OrganismType.predator,
+                        diet_type=DietType.carnivore,
+                        weight=30,
+                        size=1,
+                        water_consumption=1,
+                        food_consumption=1,
+                    )
+                )
+            # Replica sessions are read-only in production, the rows are
+            # written through one here to set the replica up
+            await session.commit()
+
+        catalog_cache.clear()
+        statements = []
+        listener = lambda *args: statements.append(args[2])  # noqa: E731
+        event.listen(replica.sync_engine, "before_cursor_execute", listener)
+        try:
+            async with async_session() as session:
+                results = await search_templates(session, Organism, "wolff")
+                assert results[0]["name"] == "Wolf"
+                results = await search_templates(session, Organism, "wolf")
+                assert [row["name"] for row in results] == [
+                    "Wolf",
+                    "Grey Wolf",
+                    "Wolverine",
+                ]
+        finally:
+            event.remove(replica.sync_engine, "before_cursor_execute", listener)
+
+        # One bounded query per search, and no index cached from the replica
+        assert len(statements) == 2
+        assert all("LIKE" in sql and "LIMIT" in sql for sql in statements)
+        assert not catalog_cache._entries
+    finally:
+        await replica.dispose()
+
+
+@pytest.mark.asyncio
+async def test_replica_search_keeps_the_best_matches_past_the_limit(
+    tmp_path, monkeypatch: pytest.MonkeyPatch
+):
+    replica = database.build_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}", EngineProfile()
+    )
+    try:
+        async with replica.begin() as connection:
+            await connection.run_sync(SQLModel.metadata.create_all)
+        async_session = database.build_replica_sessionmaker(replica)
+        names = [f"Awolf {index}" for index in range(20)] + ["Wolfhound", "Wolf"]
+        async with async_session() as session:
+            session.add_all(
+                Organism(
+                    name=name,
+                    type=OrganismType.predator,
+                    diet_type=DietType.carnivore,
+                    weight=30,
+                    size=1,
+                    water_consumption=1,
+                    food_consumption=1,
+                )
+                for name in names
+            )
+            await session.commit()
+
+        monkeypatch.setattr(search, "SEARCH_CANDIDATE_LIMIT", 3)
+        async with async_session() as session:
+            results = await search_templates(session, Organism, "wolf")
+        assert [row["name"] for row in results] == ["Wolf", "Wolfhound", "Awolf 0"]
+    finally:
+        await replica.dispose()
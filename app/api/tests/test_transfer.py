@@ -0,0 +1,196 @@
+import json
+
+import orjson
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.models import Ecosystem, Organism, PollinationLink, PredationLink
+
+
+async def create_source_ecosystem(client: AsyncClient) -> str:
+    base = {"weight": 1, "size": 1, "water_consumption": 1, "food_consumption": 1}
+    await client.post(
+        "/organism/bulk",
+        json=[
+            {
+                **base,
+                "name": "Wolf",
+                "type": "predator",
+                "diet_type": "carnivore",
+                "prey": "Rabbit",
+            },
+            {**base, "name": "Rabbit", "type": "herbivore", "diet_type": "herbivore"},
+            {
+                **base,
+                "name": "Bee",
+                "type": "pollinator",
+                "diet_type": "nectarivore",
+            },
+        ],
+    )
+    await client.post(
+        "/plant/create",
+        json={"name": "Clover", "water_need": 1, "pollinators": "Bee"},
+        params={"type": "flower"},
+    )
+    response = await client.post(
+        "/ecosystem/create",
+        json={
+            "name": "Source",
+            "water_available": 1000,
+            "minimum_water_to_add_per_simulation": 50,
+            "max_water_to_add_per_simulation": 200,
+        },
+    )
+    ecosystem_id = response.json()["ecosystem_created"]["id"]
+    await client.post(
+        f"/ecosystem/{ecosystem_id}/seed",
+        json={"composition": {"Wolf": 1, "Rabbit": 2, "Bee": 1, "Clover": 3}},
+    )
+    return ecosystem_id
+
+
+def species_counts(response) -> dict[str, int]:
+    counts = {}
+    for line in response.text.splitlines():
+        name = json.loads(line)["name"]
+        counts[name] = counts.get(name, 0) + 1
+    return counts
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("export_format", ["ndjson", "columnar"])
+async def test_ecosystem_export_import_round_trip(
+    db_session: AsyncSession, client: AsyncClient, export_format: str
+):
+    ecosystem_id = await create_source_ecosystem(client)
+
+    response = await client.get(
+        f"/ecosystem/{ecosystem_id}/export", params={"format": export_format}
+    )
+    assert response.status_code == 200
+    records = [json.loads(line) for line in response.text.splitlines()]
+    kinds = list(dict.fromkeys(record["kind"] for record in records))
+    assert kinds == [
+        "organism_species",
+        "plant_species",
+        "predation",
+        "pollination",
+        "ecosystem",
+        "organism",
+        "plant",
+    ]
+    if export_format == "columnar":
+        assert len(records) == len(kinds)
+        assert records[-1]["columns"]["species"] == ["Clover"] * 3
+    else:
+        assert {"predator": "Wolf", "prey": "Rabbit"} in [
+            {key: value for key, value in record.items() if key != "kind"}
+            for record in records
+        ]
+
+    export = response.content
+    response = await client.post(
+        "/ecosystem/import", params={"name": "Copy"}, content=export
+    )
+    assert response.status_code == 201
+    assert response.json()["imported"] == {
+        "organism_species": 3,
+        "plant_species": 1,
+        "predation": 1,
+        "pollination": 1,
+        "ecosystem": 1,
+        "organism": 4,
+        "plant": 3,
+    }
+
+    # The species were matched by name, not copied
+    templates = await db_session.scalar(
+        select(func.count())
+        .select_from(Organism)
+        .where(Organism.ecosystem_id.is_(None))
+    )
+    assert templates == 3
+    for model in (PredationLink, PollinationLink):
+        assert await db_session.scalar(select(func.count()).select_from(model)) == 1
+
+    copy = await client.get("/ecosystem/Copy/organisms/stream")
+    assert species_counts(copy) == {"Wolf": 1, "Rabbit": 2, "Bee": 1}
+    copy = await client.get("/ecosystem/Copy/plants/stream")
+    assert species_counts(copy) == {"Clover": 3}
+
+    response = await client.post(
+        "/ecosystem/import", params={"name": "copy"}, content=export
+    )
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_ecosystem_import_is_all_or_nothing(
+    db_session: AsyncSession, client: AsyncClient
+):
+    lines = [
+        {
+            "kind": "ecosystem",
+            "name": "Broken",
+            "water_available": 10,
+            "minimum_water_to_add_per_simulation": 1,
+            "max_water_to_add_per_simulation": 2,
+        },
+        {"kind": "organism", "species": "Unicorn", "age": 1},
+    ]
+    response = await client.post(
+        "/ecosystem/import",
+        content=b"\n".join(orjson.dumps(line) for line in lines),
+    )
+    assert response.status_code == 404
+    assert await db_session.scalar(select(func.count()).select_from(Ecosystem)) == 0
+
+    response = await client.post("/ecosystem/import", content=b'{"name": "Nameless"}')
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Line 1:")
+
+
+@pytest.mark.asyncio
+async def test_catalog_export_import(db_session: AsyncSession, client: AsyncClient):
+    await create_source_ecosystem(client)
+
+    response = await client.get("/catalog/export", params={"format": "columnar"})
+    assert response.status_code == 200
+    groups = {
+        group["kind"]: group["columns"]
+        for group in map(json.loads, response.text.splitlines())
+    }
+    assert groups["organism_species"]["name"] == ["Bee", "Rabbit", "Wolf"]
+    assert groups["pollination"] == {"pollinator": ["Bee"], "plant": ["Clover"]}
+
+    organisms = await client.get("/organism/all")
+    etag = organisms.headers["ETag"]
+
+    # Known species are kept, the new one and its link are added
+    groups["organism_species"] = {
+        key: values + [values[-1]] for key, values in groups["organism_species"].items()
+    }
+    groups["organism_species"]["name"][-1] = "Lynx"
+    groups["predation"] = {"predator": ["Lynx", "Wolf"], "prey": ["Rabbit", "Rabbit"]}
+    response = await client.post(
+        "/catalog/import",
+        content=b"\n".join(
+            orjson.dumps({"kind": kind, "columns": columns})
+            for kind, columns in groups.items()
+        ),
+    )
+    assert response.status_code == 201
+    assert response.json()["imported"]["organism_species"] == 4
+
+    response = await client.get("/organism/all")
+    assert sorted(response.json()["organisms"]) == ["Bee", "Lynx", "Rabbit", "Wolf"]
+    assert response.headers["ETag"] != etag
+    assert await db_session.scalar(select(func.count()).select_from(PredationLink)) == 2
+
+    response = await client.post(
+        "/catalog/import", content=b'{"kind": "organism", "species": "Wolf"}'
+    )
+    assert response.status_code == 400
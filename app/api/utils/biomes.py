@@ -0,0 +1,921 @@
+from app.database.enums import (
+    ActivityCycle,
+    DietType,
+    EnvironmentType,
+    OrganismType,
+    PlantType,
+    SocialBehavior,
+    Speed,
+)
+
+
+def organism(name, type, diet_type, weight, size, max_age, reproduction_age, **extra):
+    return {
+        "name": name,
+        "type": type,
+        "diet_type": diet_type,
+        "weight": weight,
+        "size": size,
+        "max_age": max_age,
+        "reproduction_age": reproduction_age,
+        "water_consumption": extra.pop("water_consumption", weight * 0.05),
+        "food_consumption": extra.pop("food_consumption", weight * 0.08),
+        **extra,
+    }
+
+
+def plant(name, type, weight, max_age, water_need):
+    return {
+        "name": name,
+        "type": type,
+        "weight": weight,
+        "max_age": max_age,
+        "water_need": water_need,
+    }
+
+
+# Species packs loaded by /defaults/add_defaults?biome=..., one per environment.
+# Links are (predator, prey) and (pollinator, plant) names within the pack.
+BIOME_PACKS: dict[EnvironmentType, dict[str, list]] = {
+    EnvironmentType.desert: {
+        "organisms": [
+            organism(
+                "Fennec Fox",
+                OrganismType.predator,
+                DietType.carnivore,
+                1.2,
+                0.4,
+                12,
+                1,
+                activity_cycle=ActivityCycle.nocturnal,
+                speed=Speed.fast,
+            ),
+            organism(
+                "Camel",
+                OrganismType.herbivore,
+                DietType.herbivore,
+                500,
+                2.0,
+                40,
+                4,
+                water_consumption=5,
+                activity_cycle=ActivityCycle.diurnal,
+                social_behavior=SocialBehavior.herd,
+            ),
+            organism(
+                "Jerboa",
+                OrganismType.herbivore,
+                DietType.herbivore,
+                0.1,
+                0.1,
+                6,
+                0.5,
+                fertility_rate=5,
+                activity_cycle=ActivityCycle.nocturnal,
+                speed=Speed.fast,
+            ),
+            organism(
+                "Desert Locust",
+                OrganismType.herbivore,
+                DietType.herbivore,
+                0.002,
+                0.07,
+                1,
+                0.1,
+                fertility_rate=80,
+                social_behavior=SocialBehavior.herd,
+            ),
+            organism(
+                "Sidewinder",
+                OrganismType.predator,
+                DietType.carnivore,
+                0.3,
+                0.6,
+                20,
+                2,
+                activity_cycle=ActivityCycle.nocturnal,
+            ),
+            organism(
+                "Roadrunner",
+                OrganismType.predator,
+                DietType.carnivore,
+                0.3,
+                0.55,
+                8,
+                1,
+                speed=Speed.fast,
+            ),
+            organism(
+                "Coyote",
+                OrganismType.omnivore,
+                DietType.omnivore,
+                12,
+                1.0,
+                14,
+                2,
+                activity_cycle=ActivityCycle.crepuscular,
+                social_behavior=SocialBehavior.pack,
+            ),
+            organism(
+                "Desert Tortoise",
+                OrganismType.herbivore,
+                DietType.herbivore,
+                8,
+                0.35,
+                80,
+                15,
+                speed=Speed.slow,
+            ),
+            organism(
+                "Carpenter Bee",
+                OrganismType.pollinator,
+                DietType.nectarivore,
+                0.001,
+                0.02,
+                0.3,
+                0.05,
+                fertility_rate=20,
+            ),
+            organism(
+                "Sphinx Moth",
+                OrganismType.pollinator,
+                DietType.nectarivore,
+                0.002,
+                0.05,
+                0.2,
+                0.05,
+                fertility_rate=100,
+                activity_cycle=ActivityCycle.nocturnal,
+            ),
+        ],
+        "plants": [
+            plant("Saguaro", PlantType.tree, 2000, 150, 1),
+            plant("Creosote Bush", PlantType.shrub, 20, 100, 1),
+            plant("Desert Marigold", PlantType.flower, 0.2, 2, 1),
+            plant("Joshua Tree", PlantType.tree, 1000, 150, 1),
+            plant("Prickly Pear", PlantType.shrub, 15, 20, 1),
+            plant("Desert Sage", PlantType.shrub, 2, 10, 1),
+        ],
+        "predation": [
+            ("Fennec Fox", "Jerboa"),
+            ("Fennec Fox", "Desert Locust"),
+            ("Sidewinder", "Jerboa"),
+            ("Roadrunner", "Sidewinder"),
+            ("Roadrunner", "Desert Locust"),
+            ("Coyote", "Jerboa"),
+            ("Coyote", "Desert Tortoise"),
+        ],
+        "pollination": [
+            ("Carpenter Bee", "Desert Marigold"),
+            ("Carpenter Bee", "Prickly Pear"),
+            ("Carpenter Bee", "Desert Sage"),
+            ("Sphinx Moth", "Saguaro"),
+            ("Sphinx Moth", "Joshua Tree"),
+        ],
+    },
+    EnvironmentType.rainforest: {
+        "organisms": [
+            organism(
+                "Jaguar",
+                OrganismType.predator,
+                DietType.carnivore,
+                90,
+                1.8,
+                15,
+                3,
+                activity_cycle=ActivityCycle.crepuscular,
+                speed=Speed.fast,
+            ),
+            organism(
+                "Capybara",
+                OrganismType.herbivore,
+                DietType.herbivore,
+                50,
+                1.2,
+                10,
+                1.5,
+                fertility_rate=4,
+                social_behavior=SocialBehavior.herd,
+            ),
+            organism(
+                "Howler Monkey",
+                OrganismType.omnivore,
+                DietType.omnivore,
+                8,
+                0.6,
+                20,
+                4,
+                social_behavior=SocialBehavior.pack,
+            ),
+            organism(
+                "Morpho Butterfly",
+                OrganismType.pollinator,
+                DietType.nectarivore,
+                0.001,
+                0.15,
+                0.5,
+                0.1,
+                fertility_rate=100,
+                speed=Speed.fast,
+            ),
+            organism(
+                "Green Anaconda",
+                OrganismType.predator,
+                DietType.carnivore,
+                70,
+                5.0,
+                10,
+                3,
+                speed=Speed.slow,
+            ),
+            organism(
+                "Harpy Eagle",
+                OrganismType.predator,
+                DietType.carnivore,
+                7,
+                1.0,
+                35,
+                5,
+                speed=Speed.fast,
+            ),
+            organism(
+                "Poison Dart Frog",
+                OrganismType.predator,
+                DietType.carnivore,
+                0.002,
+                0.03,
+                10,
+                1,
+                fertility_rate=10,
+            ),
+            organism(
+                "Leafcutter Ant",
+                OrganismType.herbivore,
+                DietType.herbivore,
+                1e-05,
+                0.01,
+                0.5,
+                0.05,
+                fertility_rate=200,
+                social_behavior=SocialBehavior.herd,
+            ),
+            organism(
+                "Toucan", OrganismType.omnivore, DietType.omnivore, 0.6, 0.6, 20, 3
+            ),
+            organism(
+                "Orchid Bee",
+                OrganismType.pollinator,
+                DietType.nectarivore,
+                0.0002,
+                0.02,
+                0.5,
+                0.05,
+                fertility_rate=30,
+                speed=Speed.fast,
+            ),
+        ],
+        "plants": [
+            plant("Kapok", PlantType.tree, 5000, 200, 30),
+            plant("Bromeliad", PlantType.herb, 0.5, 5, 3),
+            plant("Passion Flower", PlantType.flower, 0.3, 6, 4),
+            plant("Strangler Fig", PlantType.tree, 3000, 300, 25),
+            plant("Cacao", PlantType.tree, 300, 80, 20),
+            plant("Heliconia", PlantType.flower, 1, 4, 6),
+        ],
+        "predation": [
+            ("Jaguar", "Capybara"),
+            ("Jaguar", "Howler Monkey"),
+            ("Green Anaconda", "Capybara"),
+            ("Harpy Eagle", "Howler Monkey"),
+            ("Harpy Eagle", "Toucan"),
+            ("Poison Dart Frog", "Leafcutter Ant"),
+        ],
+        "pollination": [
+            ("Morpho Butterfly", "Passion Flower"),
+            ("Morpho Butterfly", "Heliconia"),
+            ("Orchid Bee", "Bromeliad"),
+            ("Orchid Bee", "Passion Flower"),
+            ("Orchid Bee", "Cacao"),
+        ],
+    },
+    EnvironmentType.savanna: {
+        "organisms": [
+            organism(
+                "Lion",
+                OrganismType.predator,
+                DietType.carnivore,
+                190,
+                2.0,
+                14,
+                3,
+                activity_cycle=ActivityCycle.crepuscular,
+                social_behavior=SocialBehavior.pack,
+            ),
+            organism(
+                "Zebra",
+                OrganismType.herbivore,
+                DietType.herbivore,
+                350,
+                2.2,
+                25,
+                3,
+                social_behavior=SocialBehavior.herd,
+                speed=Speed.fast,
+            ),
+            organism(
+                "Warthog",
+                OrganismType.omnivore,
+                DietType.omnivore,
+                75,
+                1.0,
+                15,
+                1.5,
+                fertility_rate=3,
+            ),
+            organism(
+                "Honeybee",
+                OrganismType.pollinator,
+                DietType.nectarivore,
+                0.0001,
+                0.015,
+                0.2,
+                0.05,
+                fertility_rate=200,
+                social_behavior=SocialBehavior.herd,
+            ),
+            organism(
+                "Cheetah",
+                OrganismType.predator,
+                DietType.carnivore,
+                50,
+                1.3,
+                12,
+                2,
+                speed=Speed.fast,
+            ),
+            organism(
+                "Spotted Hyena",
+                OrganismType.predator,
+                DietType.carnivore,
+                60,
+                1.3,
+                20,
+                3,
+                activity_cycle=ActivityCycle.nocturnal,
+                social_behavior=SocialBehavior.pack,
+            ),
+            organism(
+                "Wildebeest",
+                OrganismType.herbivore,
+                DietType.herbivore,
+                200,
+                2.0,
+                20,
+                2,
+                social_behavior=SocialBehavior.herd,
+            ),
+            organism(
+                "Giraffe", OrganismType.herbivore, DietType.herbivore, 1000, 5.0, 25, 4
+            ),
+            organism(
+                "Elephant",
+                OrganismType.herbivore,
+                DietType.herbivore,
+                5000,
+                3.3,
+                65,
+                12,
+                social_behavior=SocialBehavior.herd,
+                speed=Speed.slow,
+            ),
+            organism(
+                "Sunbird",
+                OrganismType.pollinator,
+                DietType.nectarivore,
+                0.01,
+                0.12,
+                8,
+                1,
+                speed=Speed.fast,
+            ),
+        ],
+        "plants": [
+            plant("Acacia", PlantType.tree, 1500, 100, 5),
+            plant("Red Oat Grass", PlantType.herb, 0.1, 3, 2),
+            plant("Fireball Lily", PlantType.flower, 0.2, 5, 2),
+            plant("Baobab", PlantType.tree, 80000, 1000, 10),
+            plant("Whistling Thorn", PlantType.shrub, 50, 60, 3),
+            plant("Flame Lily", PlantType.flower, 0.2, 6, 2),
+        ],
+        "predation": [
+            ("Lion", "Zebra"),
+            ("Lion", "Wildebeest"),
+            ("Lion", "Warthog"),
+            ("Lion", "Giraffe"),
+            ("Cheetah", "Warthog"),
+            ("Cheetah", "Wildebeest"),
+            ("Spotted Hyena", "Zebra"),
+            ("Spotted Hyena", "Wildebeest"),
+        ],
+        "pollination": [
+            ("Honeybee", "Acacia"),
+            ("Honeybee", "Fireball Lily"),
+            ("Honeybee", "Whistling Thorn"),
+            ("Sunbird", "Fireball Lily"),
+            ("Sunbird", "Flame Lily"),
+        ],
+    },
+    EnvironmentType.swamp: {
+        "organisms": [
+            organism(
+                "Alligator",
+                OrganismType.predator,
+                DietType.carnivore,
+                360,
+                4.0,
+                50,
+                10,
+                speed=Speed.slow,
+            ),
+            organism(
+                "Bullfrog",
+                OrganismType.predator,
+                DietType.carnivore,
+                0.5,
+                0.2,
+                8,
+                2,
+                fertility_rate=20,
+                activity_cycle=ActivityCycle.nocturnal,
+            ),
+            organism(
+                "Muskrat",
+                OrganismType.herbivore,
+                DietType.herbivore,
+                1.5,
+                0.5,
+                4,
+                0.5,
+                fertility_rate=6,
+            ),
+            organism(
+                "Dragonfly",
+                OrganismType.predator,
+                DietType.carnivore,
+                0.001,
+                0.08,
+                0.5,
+                0.1,
+                fertility_rate=50,
+                speed=Speed.fast,
+            ),
+            organism(
+                "Great Blue Heron",
+                OrganismType.predator,
+                DietType.carnivore,
+                2.5,
+                1.2,
+                15,
+                2,
+            ),
+            organism(
+                "Cottonmouth",
+                OrganismType.predator,
+                DietType.carnivore,
+                1.5,
+                1.0,
+                10,
+                3,
+            ),
+            organism(
+                "Opossum",
+                OrganismType.omnivore,
+                DietType.omnivore,
+                3,
+                0.7,
+                4,
+                1,
+                fertility_rate=8,
+                activity_cycle=ActivityCycle.nocturnal,
+            ),
+            organism(
+                "Marsh Rabbit",
+                OrganismType.herbivore,
+                DietType.herbivore,
+                1.2,
+                0.4,
+                4,
+                0.5,
+                fertility_rate=5,
+            ),
+            organism(
+                "Bumblebee",
+                OrganismType.pollinator,
+                DietType.nectarivore,
+                0.0002,
+                0.02,
+                0.3,
+                0.05,
+                fertility_rate=50,
+            ),
+            organism(
+                "Swallowtail Butterfly",
+                OrganismType.pollinator,
+                DietType.nectarivore,
+                0.0005,
+                0.1,
+                0.5,
+                0.1,
+                fertility_rate=60,
+            ),
+        ],
+        "plants": [
+            plant("Bald Cypress", PlantType.tree, 3000, 600, 40),
+            plant("Cattail", PlantType.herb, 0.5, 3, 10),
+            plant("Water Lily", PlantType.flower, 0.3, 4, 15),
+            plant("Swamp Rose", PlantType.shrub, 5, 30, 8),
+            plant("Buttonbush", PlantType.shrub, 10, 40, 12),
+            plant("Pickerelweed", PlantType.flower, 0.4, 5, 12),
+        ],
+        "predation": [
+            ("Alligator", "Muskrat"),
+            ("Alligator", "Great Blue Heron"),
+            ("Alligator", "Opossum"),
+            ("Alligator", "Marsh Rabbit"),
+            ("Bullfrog", "Dragonfly"),
+            ("Great Blue Heron", "Bullfrog"),
+            ("Great Blue Heron", "Muskrat"),
+            ("Cottonmouth", "Bullfrog"),
+            ("Cottonmouth", "Marsh Rabbit"),
+        ],
+        "pollination": [
+            ("Bumblebee", "Swamp Rose"),
+            ("Bumblebee", "Pickerelweed"),
+            ("Swallowtail Butterfly", "Buttonbush"),
+            ("Swallowtail Butterfly", "Pickerelweed"),
+            ("Swallowtail Butterfly", "Water Lily"),
+        ],
+    },
+    EnvironmentType.mountain: {
+        "organisms": [
+            organism(
+                "Snow Leopard",
+                OrganismType.predator,
+                DietType.carnivore,
+                45,
+                1.3,
+                18,
+                3,
+                activity_cycle=ActivityCycle.crepuscular,
+                speed=Speed.fast,
+            ),
+            organism(
+                "Mountain Goat",
+                OrganismType.herbivore,
+                DietType.herbivore,
+                80,
+                1.0,
+                15,
+                2.5,
+                social_behavior=SocialBehavior.herd,
+            ),
+            organism(
+                "Marmot",
+                OrganismType.herbivore,
+                DietType.herbivore,
+                5,
+                0.6,
+                15,
+                2,
+                fertility_rate=4,
+            ),
+            organism(
+                "Golden Eagle",
+                OrganismType.predator,
+                DietType.carnivore,
+                5,
+                0.9,
+                30,
+                5,
+                speed=Speed.fast,
+            ),
+            organism(
+                "Ibex",
+                OrganismType.herbivore,
+                DietType.herbivore,
+                90,
+                1.4,
+                17,
+                2,
+                social_behavior=SocialBehavior.herd,
+            ),
+            organism(
+                "Pika",
+                OrganismType.herbivore,
+                DietType.herbivore,
+                0.15,
+                0.18,
+                3,
+                0.5,
+                fertility_rate=4,
+            ),
+            organism(
+                "Red Fox",
+                OrganismType.predator,
+                DietType.carnivore,
+                6,
+                0.9,
+                5,
+                1,
+                activity_cycle=ActivityCycle.crepuscular,
+            ),
+            organism(
+                "Black Bear", OrganismType.omnivore, DietType.omnivore, 150, 1.8, 25, 4
+            ),
+            organism(
+                "Apollo Butterfly",
+                OrganismType.pollinator,
+                DietType.nectarivore,
+                0.0005,
+                0.08,
+                0.5,
+                0.1,
+                fertility_rate=80,
+            ),
+            organism(
+                "Mountain Bumblebee",
+                OrganismType.pollinator,
+                DietType.nectarivore,
+                0.0003,
+                0.02,
+                0.3,
+                0.05,
+                fertility_rate=50,
+            ),
+        ],
+        "plants": [
+            plant("Mountain Pine", PlantType.tree, 800, 400, 8),
+            plant("Alpine Juniper", PlantType.shrub, 15, 200, 3),
+            plant("Edelweiss", PlantType.flower, 0.05, 10, 2),
+            plant("Rhododendron", PlantType.shrub, 20, 100, 5),
+            plant("Alpine Gentian", PlantType.flower, 0.05, 8, 2),
+            plant("Mountain Avens", PlantType.flower, 0.05, 20, 2),
+        ],
+        "predation": [
+            ("Snow Leopard", "Mountain Goat"),
+            ("Snow Leopard", "Ibex"),
+            ("Snow Leopard", "Marmot"),
+            ("Golden Eagle", "Marmot"),
+            ("Golden Eagle", "Pika"),
+            ("Red Fox", "Pika"),
+            ("Red Fox", "Marmot"),
+        ],
+        "pollination": [
+            ("Apollo Butterfly", "Edelweiss"),
+            ("Apollo Butterfly", "Alpine Gentian"),
+            ("Mountain Bumblebee", "Rhododendron"),
+            ("Mountain Bumblebee", "Alpine Gentian"),
+            ("Mountain Bumblebee", "Mountain Avens"),
+        ],
+    },
+    EnvironmentType.taiga: {
+        "organisms": [
+            organism(
+                "Eurasian Lynx",
+                OrganismType.predator,
+                DietType.carnivore,
+                20,
+                1.0,
+                15,
+                2,
+                activity_cycle=ActivityCycle.nocturnal,
+            ),
+            organism(
+                "Moose",
+                OrganismType.herbivore,
+                DietType.herbivore,
+                500,
+                2.5,
+                20,
+                2,
+                speed=Speed.normal,
+            ),
+            organism(
+                "Snowshoe Hare",
+                OrganismType.herbivore,
+                DietType.herbivore,
+                1.5,
+                0.5,
+                5,
+                1,
+                fertility_rate=6,
+                speed=Speed.fast,
+            ),
+            organism(
+                "Brown Bear", OrganismType.omnivore, DietType.omnivore, 300, 2.2, 25, 5
+            ),
+            organism(
+                "Timber Wolf",
+                OrganismType.predator,
+                DietType.carnivore,
+                45,
+                1.5,
+                13,
+                2,
+                social_behavior=SocialBehavior.pack,
+            ),
+            organism(
+                "Wolverine", OrganismType.predator, DietType.carnivore, 15, 0.9, 12, 2
+            ),
+            organism(
+                "Red Squirrel",
+                OrganismType.herbivore,
+                DietType.herbivore,
+                0.3,
+                0.35,
+                7,
+                1,
+                fertility_rate=4,
+            ),
+            organism(
+                "Capercaillie",
+                OrganismType.herbivore,
+                DietType.herbivore,
+                4,
+                0.9,
+                10,
+                1,
+            ),
+            organism(
+                "Hoverfly",
+                OrganismType.pollinator,
+                DietType.nectarivore,
+                0.0001,
+                0.012,
+                0.3,
+                0.05,
+                fertility_rate=80,
+            ),
+            organism(
+                "Boreal Bumblebee",
+                OrganismType.pollinator,
+                DietType.nectarivore,
+                0.0003,
+                0.02,
+                0.3,
+                0.05,
+                fertility_rate=50,
+            ),
+        ],
+        "plants": [
+            plant("Norway Spruce", PlantType.tree, 1200, 300, 10),
+            plant("Lingonberry", PlantType.shrub, 0.3, 20, 2),
+            plant("Fireweed", PlantType.flower, 0.2, 5, 3),
+            plant("Paper Birch", PlantType.tree, 700, 120, 8),
+            plant("Blueberry", PlantType.shrub, 0.5, 30, 3),
+            plant("Twinflower", PlantType.flower, 0.01, 10, 2),
+        ],
+        "predation": [
+            ("Eurasian Lynx", "Snowshoe Hare"),
+            ("Eurasian Lynx", "Red Squirrel"),
+            ("Timber Wolf", "Moose"),
+            ("Timber Wolf", "Snowshoe Hare"),
+            ("Wolverine", "Snowshoe Hare"),
+            ("Wolverine", "Capercaillie"),
+            ("Brown Bear", "Moose"),
+        ],
+        "pollination": [
+            ("Hoverfly", "Fireweed"),
+            ("Hoverfly", "Twinflower"),
+            ("Boreal Bumblebee", "Lingonberry"),
+            ("Boreal Bumblebee", "Blueberry"),
+            ("Boreal Bumblebee", "Fireweed"),
+        ],
+    },
+    EnvironmentType.tundra: {
+        "organisms": [
+            organism(
+                "Arctic Fox",
+                OrganismType.predator,
+                DietType.carnivore,
+                4,
+                0.6,
+                6,
+                1,
+                fertility_rate=6,
+            ),
+            organism(
+                "Caribou",
+                OrganismType.herbivore,
+                DietType.herbivore,
+                150,
+                1.8,
+                15,
+                2,
+                social_behavior=SocialBehavior.herd,
+            ),
+            organism(
+                "Lemming",
+                OrganismType.herbivore,
+                DietType.herbivore,
+                0.05,
+                0.12,
+                2,
+                0.1,
+                fertility_rate=8,
+            ),
+            organism(
+                "Snowy Owl",
+                OrganismType.predator,
+                DietType.carnivore,
+                2,
+                0.6,
+                10,
+                2,
+                activity_cycle=ActivityCycle.diurnal,
+            ),
+            organism(
+                "Polar Bear", OrganismType.predator, DietType.carnivore, 450, 2.5, 25, 5
+            ),
+            organism(
+                "Arctic Hare",
+                OrganismType.herbivore,
+                DietType.herbivore,
+                4,
+                0.6,
+                5,
+                1,
+                fertility_rate=6,
+            ),
+            organism(
+                "Musk Ox",
+                OrganismType.herbivore,
+                DietType.herbivore,
+                300,
+                2.3,
+                20,
+                3,
+                social_behavior=SocialBehavior.herd,
+                speed=Speed.slow,
+            ),
+            organism(
+                "Ptarmigan",
+                OrganismType.herbivore,
+                DietType.herbivore,
+                0.5,
+                0.35,
+                4,
+                1,
+                fertility_rate=8,
+            ),
+            organism(
+                "Arctic Bumblebee",
+                OrganismType.pollinator,
+                DietType.nectarivore,
+                0.0004,
+                0.02,
+                0.3,
+                0.05,
+                fertility_rate=30,
+            ),
+            organism(
+                "Tundra Mosquito",
+                OrganismType.pollinator,
+                DietType.nectarivore,
+                2e-06,
+                0.006,
+                0.1,
+                0.02,
+                fertility_rate=200,
+            ),
+        ],
+        "plants": [
+            plant("Arctic Willow", PlantType.shrub, 2, 50, 2),
+            plant("Reindeer Lichen", PlantType.herb, 0.05, 100, 1),
+            plant("Arctic Poppy", PlantType.flower, 0.02, 3, 1),
+            plant("Dwarf Birch", PlantType.shrub, 1, 60, 2),
+            plant("Cotton Grass", PlantType.herb, 0.05, 10, 3),
+            plant("Purple Saxifrage", PlantType.flower, 0.01, 20, 1),
+        ],
+        "predation": [
+            ("Arctic Fox", "Lemming"),
+            ("Arctic Fox", "Ptarmigan"),
+            ("Snowy Owl", "Lemming"),
+            ("Snowy Owl", "Arctic Hare"),
+            ("Snowy Owl", "Ptarmigan"),
+            ("Polar Bear", "Caribou"),
+            ("Polar Bear", "Musk Ox"),
+        ],
+        "pollination": [
+            ("Arctic Bumblebee", "Arctic Poppy"),
+            ("Arctic Bumblebee", "Purple Saxifrage"),
+            ("Arctic Bumblebee", "Arctic Willow"),
+            ("Tundra Mosquito", "Arctic Poppy"),
+            ("Tundra Mosquito", "Purple Saxifrage"),
+        ],
+    },
+}
+
+for environment_type, pack in BIOME_PACKS.items():
+    for entry in pack["organisms"] + pack["plants"]:
+        entry["environment_type"] = environment_type
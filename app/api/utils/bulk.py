@@ -0,0 +1,192 @@
+from uuid import UUID, uuid4
+
+import orjson
+from fastapi import Request
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import bindparam, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.exceptions.exceptions import INVALID_BULK_BODY_ERROR
+from app.database.models import PollinationLink, PredationLink
+from app.database.persistence import BATCH_SIZE as BULK_BATCH_SIZE
+from app.database.persistence import insert_rows, write_connection
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+# NDJSON lines are kept raw so a malformed line only fails its own item
+async def read_bulk_body(request: Request) -> list:
+    body = await request.body()
+    content_type = request.headers.get("content-type", "")
+    if content_type.split(";")[0].strip() in NDJSON_MEDIA_TYPES:
+        return [line for line in body.splitlines() if line.strip()]
+    try:
+        items = orjson.loads(body)
+    except orjson.JSONDecodeError:
+        raise INVALID_BULK_BODY_ERROR()
+    if not isinstance(items, list):
+        raise INVALID_BULK_BODY_ERROR()
+    return items
+
+
+def bulk_error(index: int, name: str | None, detail) -> dict:
+    return {"index": index, "name": name, "detail": detail}
+
+
+def validate_bulk_items(raw_items: list, schema: type[BaseModel]):
+    items, errors = [], []
+    for index, raw_item in enumerate(raw_items):
+        try:
+            if isinstance(raw_item, bytes):
+                item = schema.model_validate_json(raw_item)
+            else:
+                item = schema.model_validate(raw_item)
+        except ValidationError as error:
+            name = raw_item.get("name") if isinstance(raw_item, dict) else None
+            messages = [
+                f"{'.'.join(map(str, e['loc']))}: {e['msg']}" if e["loc"] else e["msg"]
+                for e in error.errors()
+            ]
+            errors.append(bulk_error(index, name, messages))
+            continue
+        items.append((index, item))
+    return items, errors
+
+
+def split_names(value: str | None) -> list[str]:
+    if not value:
+        return []
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+# Lowercased template name -> id, one IN query per BULK_BATCH_SIZE names
+async def resolve_template_names(
+    session: AsyncSession, model, names: set[str]
+) -> dict[str, UUID]:
+    resolved = {}
+    names = sorted(names)
+    for start in range(0, len(names), BULK_BATCH_SIZE):
+        rows = await session.execute(
+            select(func.lower(model.name), model.id).where(
+                model.ecosystem_id.is_(None),
+                func.lower(model.name).in_(names[start : start + BULK_BATCH_SIZE]),
+            )
+        )
+        resolved.update(rows.tuples().all())
+    return resolved
+
+
+# Streamed with COPY on Postgres, see app/database/persistence.py
+async def insert_in_batches(session: AsyncSession, model, rows: list[dict]):
+    await insert_rows(session, model.__table__, rows)
+
+
+# Drops the items referencing names that can't be resolved. Repeats until
+# stable, since a dropped item also breaks the items of the batch naming it.
+# references(item) returns (name, lookup) pairs, own is the lookup the items'
+# own names were added to.
+def drop_unresolved(
+    pending: dict[int, tuple], own: dict[str, UUID], references, errors: list
+):
+    dropped = True
+    while dropped:
+        dropped = False
+        for index, (item, _) in list(pending.items()):
+            missing = [
+                name for name, lookup in references(item) if name.lower() not in lookup
+            ]
+            if missing:
+                detail = f"Unknown references: {', '.join(missing)}"
+                errors.append(bulk_error(index, item.name, detail))
+                own.pop(item.name.lower(), None)
+                del pending[index]
+                dropped = True
+
+
+# Inserts the (left, right) pairs of a link table that aren't stored yet and
+# returns them
+async def insert_missing_links(
+    session: AsyncSession, link_model, pairs: set[tuple[UUID, UUID]]
+) -> set[tuple[UUID, UUID]]:
+    if not pairs:
+        return set()
+    left, right = link_model.__table__.primary_key.columns
+    existing = await session.execute(
+        select(left, right).where(
+            left.in_({pair[0] for pair in pairs}),
+            right.in_({pair[1] for pair in pairs}),
+        )
+    )
+    missing = pairs - set(existing.tuples().all())
+    await insert_in_batches(
+        session,
+        link_model,
+        [{left.key: a, right.key: b} for a, b in sorted(missing, key=str)],
+    )
+    return missing
+
+
+# Gives the individuals of a species about to be deleted a private copy of it
+# in each ecosystem holding them, out of the catalog like the individuals whose
+# template was gone before the split (see split_individuals). The copies keep
+# the species' links.
+async def detach_individuals(
+    session: AsyncSession, species, individual, species_id: UUID
+):
+    ecosystem_ids = await session.scalars(
+        select(individual.ecosystem_id)
+        .where(individual.species_id == species_id)
+        .distinct()
+    )
+    copies = {ecosystem_id: uuid4() for ecosystem_id in ecosystem_ids}
+    if not copies:
+        return
+    table = species.__table__
+    template = await session.execute(select(table).where(table.c.id == species_id))
+    template = template.mappings().one()
+    await insert_rows(
+        session,
+        table,
+        [
+            {
+                **template,
+                "id": copy_id,
+                "ecosystem_id": ecosystem_id,
+            }
+            for ecosystem_id, copy_id in copies.items()
+        ],
+    )
+
+    members = individual.__table__
+    connection = await write_connection(session, members)
+    await connection.execute(
+        update(members)
+        .where(
+            members.c.species_id == species_id,
+            members.c.ecosystem_id == bindparam("_ecosystem_id"),
+        )
+        .values(species_id=bindparam("_copy_id")),
+        [
+            {"_ecosystem_id": ecosystem_id, "_copy_id": copy_id}
+            for ecosystem_id, copy_id in copies.items()
+        ],
+    )
+
+    for link_model in (PredationLink, PollinationLink):
+        columns = list(link_model.__table__.primary_key.columns)
+        links = await session.execute(
+            select(*columns).where(or_(*(column == species_id for column in columns)))
+        )
+        links = links.tuples().all()
+        await insert_rows(
+            session,
+            link_model.__table__,
+            [
+                {
+                    column.key: copy_id if value == species_id else value
+                    for column, value in zip(columns, link)
+                }
+                for copy_id in copies.values()
+                for link in links
+            ],
+        )
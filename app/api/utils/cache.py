@@ -0,0 +1,95 @@
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+from uuid import uuid4
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.utils.etag import make_etag
+from app.database.models import CatalogVersion
+
+
+# Read-through cache for species catalog queries. Every entry is tagged with
+# the catalog version it was loaded at and is ignored once the version moves.
+# Entries are usually encoded responses, but derived structures such as the
+# name search index are cached the same way.
+# With the "database" backend the version lives in the catalogversion table, so
+# a write on one worker invalidates the entries of every worker.
+class CatalogCache:
+    def __init__(self, backend: str = "memory", max_entries: int = 1024):
+        self.backend = backend
+        self.max_entries = max_entries
+        self.version = 0
+        self.boot_id = uuid4().hex[:8]
+        self._entries: OrderedDict[Hashable, tuple[int, Any]] = OrderedDict()
+
+    def configure(self, backend: str | None, max_entries: int | None = None):
+        self.backend = backend or "memory"
+        if max_entries:
+            self.max_entries = max_entries
+        self.clear()
+
+    @property
+    def shared(self) -> bool:
+        return self.backend == "database"
+
+    def clear(self):
+        self._entries.clear()
+
+    async def current_version(self, session: AsyncSession) -> int:
+        if not self.shared:
+            return self.version
+        version = await session.scalar(
+            select(CatalogVersion.version).where(CatalogVersion.id == 1)
+        )
+        return version or 0
+
+    # Per-worker versions restart at 0, so they are only comparable together
+    # with the worker they come from
+    def etag(self, version: int) -> str:
+        if self.shared:
+            return make_etag("catalog", version)
+        return make_etag("catalog", self.boot_id, version)
+
+    async def get_or_load(
+        self,
+        session: AsyncSession,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        version: int | None = None,
+    ) -> Any:
+        # A replica can lag behind the per-worker version, bumped on the
+        # primary, and its rows would be cached as current
+        if session.info.get("replica") and not self.shared:
+            return await loader()
+        if version is None:
+            version = await self.current_version(session)
+        entry = self._entries.get(key)
+        if entry and entry[0] == version:
+            self._entries.move_to_end(key)
+            return entry[1]
+
+        value = await loader()
+        self._entries[key] = (version, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+    # Called after the write is committed, so a reader can never cache the
+    # pre-write rows under the new version
+    async def bump(self, session: AsyncSession):
+        self.version += 1
+        self.clear()
+        if self.shared:
+            result = await session.execute(
+                update(CatalogVersion)
+                .where(CatalogVersion.id == 1)
+                .values(version=CatalogVersion.version + 1)
+            )
+            if not result.rowcount:
+                session.add(CatalogVersion(id=1, version=1))
+            await session.commit()
+
+
+catalog_cache = CatalogCache()
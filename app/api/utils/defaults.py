@@ -1,360 +1,449 @@
-from typing import List
+import random
 from uuid import uuid4
 
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.utils.biomes import BIOME_PACKS
+from app.api.utils.bulk import (
+    insert_in_batches,
+    insert_missing_links,
+    resolve_template_names,
+)
+from app.api.utils.etag import touch_ecosystems_holding
+from app.api.utils.utils import column_keys
 from app.database.enums import (
     ActivityCycle,
     DietType,
+    EnvironmentType,
     OrganismType,
     PlantType,
     SocialBehavior,
     Speed,
 )
-from app.database.models import Organism, Plant
+from app.database.models import (
+    Organism,
+    OrganismIndividual,
+    Plant,
+    PlantIndividual,
+    PollinationLink,
+    PredationLink,
+)
+
+DEFAULT_ORGANISMS: list[dict] = [
+    {
+        "name": "Wolf",
+        "type": OrganismType.predator,
+        "weight": 40,
+        "size": 1.1,
+        "age": 0,
+        "max_age": 14,
+        "reproduction_age": 2,
+        "fertility_rate": 4,
+        "water_consumption": 2,
+        "food_consumption": 3,
+        "diet_type": DietType.carnivore,
+        "activity_cycle": ActivityCycle.nocturnal,
+        "speed": Speed.fast,
+        "social_behavior": SocialBehavior.pack,
+    },
+    {
+        "name": "Rabbit",
+        "type": OrganismType.herbivore,
+        "weight": 2,
+        "size": 0.3,
+        "age": 0,
+        "max_age": 9,
+        "reproduction_age": 0.4,
+        "fertility_rate": 6,
+        "water_consumption": 0.3,
+        "food_consumption": 0.5,
+        "diet_type": DietType.herbivore,
+        "activity_cycle": ActivityCycle.diurnal,
+        "speed": Speed.fast,
+        "social_behavior": SocialBehavior.herd,
+    },
+    {
+        "name": "Bear",
+        "type": OrganismType.omnivore,
+        "weight": 250,
+        "size": 2.0,
+        "age": 0,
+        "max_age": 25,
+        "reproduction_age": 4,
+        "fertility_rate": 2,
+        "water_consumption": 5,
+        "food_consumption": 7,
+        "diet_type": DietType.omnivore,
+        "activity_cycle": ActivityCycle.nocturnal,
+        "speed": Speed.normal,
+        "social_behavior": SocialBehavior.solitary,
+    },
+    {
+        "name": "Eagle",
+        "type": OrganismType.predator,
+        "weight": 6,
+        "size": 0.7,
+        "age": 0,
+        "max_age": 20,
+        "reproduction_age": 3,
+        "fertility_rate": 2,
+        "water_consumption": 0.2,
+        "food_consumption": 0.3,
+        "diet_type": DietType.carnivore,
+        "activity_cycle": ActivityCycle.diurnal,
+        "speed": Speed.fast,
+    },
+    {
+        "name": "Deer",
+        "type": OrganismType.herbivore,
+        "weight": 80,
+        "size": 1.5,
+        "age": 0,
+        "max_age": 15,
+        "reproduction_age": 2,
+        "fertility_rate": 1,
+        "water_consumption": 3,
+        "food_consumption": 4,
+        "diet_type": DietType.herbivore,
+        "activity_cycle": ActivityCycle.diurnal,
+        "speed": Speed.fast,
+        "social_behavior": SocialBehavior.herd,
+    },
+    {
+        "name": "Fox",
+        "type": OrganismType.omnivore,
+        "weight": 7,
+        "size": 0.5,
+        "age": 0,
+        "max_age": 12,
+        "reproduction_age": 1,
+        "fertility_rate": 4,
+        "water_consumption": 1,
+        "food_consumption": 1.5,
+        "diet_type": DietType.omnivore,
+        "activity_cycle": ActivityCycle.nocturnal,
+        "speed": Speed.fast,
+    },
+    {
+        "name": "Owl",
+        "type": OrganismType.predator,
+        "weight": 1.2,
+        "size": 0.3,
+        "age": 0,
+        "max_age": 15,
+        "reproduction_age": 1,
+        "fertility_rate": 3,
+        "water_consumption": 0.1,
+        "food_consumption": 0.2,
+        "diet_type": DietType.carnivore,
+        "activity_cycle": ActivityCycle.nocturnal,
+        "speed": Speed.normal,
+    },
+    {
+        "name": "Squirrel",
+        "type": OrganismType.herbivore,
+        "weight": 0.4,
+        "size": 0.2,
+        "age": 0,
+        "max_age": 8,
+        "reproduction_age": 0.6,
+        "fertility_rate": 5,
+        "water_consumption": 0.05,
+        "food_consumption": 0.1,
+        "diet_type": DietType.herbivore,
+        "activity_cycle": ActivityCycle.diurnal,
+        "speed": Speed.normal,
+        "social_behavior": SocialBehavior.solitary,
+    },
+    {
+        "name": "Wild Boar",
+        "type": OrganismType.omnivore,
+        "weight": 90,
+        "size": 1.2,
+        "age": 0,
+        "max_age": 10,
+        "reproduction_age": 2,
+        "fertility_rate": 6,
+        "water_consumption": 3,
+        "food_consumption": 5,
+        "diet_type": DietType.omnivore,
+        "activity_cycle": ActivityCycle.nocturnal,
+        "speed": Speed.fast,
+    },
+    {
+        "name": "Tiger",
+        "type": OrganismType.predator,
+        "weight": 220,
+        "size": 2.3,
+        "age": 0,
+        "max_age": 20,
+        "reproduction_age": 3,
+        "fertility_rate": 3,
+        "water_consumption": 4,
+        "food_consumption": 8,
+        "diet_type": DietType.carnivore,
+        "activity_cycle": ActivityCycle.nocturnal,
+        "speed": Speed.fast,
+        "social_behavior": SocialBehavior.solitary,
+    },
+    {
+        "name": "Antelope",
+        "type": OrganismType.herbivore,
+        "weight": 70,
+        "size": 1.3,
+        "age": 0,
+        "max_age": 12,
+        "reproduction_age": 2,
+        "fertility_rate": 1,
+        "water_consumption": 2,
+        "food_consumption": 3,
+        "diet_type": DietType.herbivore,
+        "activity_cycle": ActivityCycle.diurnal,
+        "speed": Speed.fast,
+        "social_behavior": SocialBehavior.herd,
+    },
+    {
+        "name": "Badger",
+        "type": OrganismType.omnivore,
+        "weight": 12,
+        "size": 0.6,
+        "age": 0,
+        "max_age": 14,
+        "reproduction_age": 1,
+        "fertility_rate": 3,
+        "water_consumption": 1,
+        "food_consumption": 1.5,
+        "diet_type": DietType.omnivore,
+        "activity_cycle": ActivityCycle.nocturnal,
+        "speed": Speed.normal,
+    },
+    {
+        "name": "Falcon",
+        "type": OrganismType.predator,
+        "weight": 1,
+        "size": 0.35,
+        "age": 0,
+        "max_age": 16,
+        "reproduction_age": 2,
+        "fertility_rate": 2,
+        "water_consumption": 0.1,
+        "food_consumption": 0.2,
+        "diet_type": DietType.carnivore,
+        "activity_cycle": ActivityCycle.diurnal,
+        "speed": Speed.fast,
+    },
+    {
+        "name": "Goat",
+        "type": OrganismType.herbivore,
+        "weight": 30,
+        "size": 0.9,
+        "age": 0,
+        "max_age": 12,
+        "reproduction_age": 1.2,
+        "fertility_rate": 2,
+        "water_consumption": 1.5,
+        "food_consumption": 2.5,
+        "diet_type": DietType.herbivore,
+        "activity_cycle": ActivityCycle.diurnal,
+        "speed": Speed.normal,
+    },
+    {
+        "name": "Raccoon",
+        "type": OrganismType.omnivore,
+        "weight": 7,
+        "size": 0.5,
+        "age": 0,
+        "max_age": 13,
+        "reproduction_age": 1,
+        "fertility_rate": 4,
+        "water_consumption": 1,
+        "food_consumption": 1.5,
+        "diet_type": DietType.omnivore,
+        "activity_cycle": ActivityCycle.nocturnal,
+        "speed": Speed.normal,
+    },
+    {
+        "name": "Lynx",
+        "type": OrganismType.predator,
+        "weight": 30,
+        "size": 1.0,
+        "age": 0,
+        "max_age": 17,
+        "reproduction_age": 2,
+        "fertility_rate": 2,
+        "water_consumption": 1.5,
+        "food_consumption": 3,
+        "diet_type": DietType.carnivore,
+        "activity_cycle": ActivityCycle.nocturnal,
+        "speed": Speed.fast,
+    },
+    {
+        "name": "Buffalo",
+        "type": OrganismType.herbivore,
+        "weight": 500,
+        "size": 2.0,
+        "age": 0,
+        "max_age": 25,
+        "reproduction_age": 3,
+        "fertility_rate": 1,
+        "water_consumption": 20,
+        "food_consumption": 25,
+        "diet_type": DietType.herbivore,
+        "activity_cycle": ActivityCycle.diurnal,
+        "speed": Speed.normal,
+        "social_behavior": SocialBehavior.herd,
+    },
+    {
+        "name": "Vulture",
+        "type": OrganismType.omnivore,
+        "weight": 2,
+        "size": 0.6,
+        "age": 0,
+        "max_age": 20,
+        "reproduction_age": 2,
+        "fertility_rate": 2,
+        "water_consumption": 0.2,
+        "food_consumption": 0.4,
+        "diet_type": DietType.omnivore,
+        "activity_cycle": ActivityCycle.diurnal,
+        "speed": Speed.normal,
+    },
+    {
+        "name": "Macaw",
+        "type": OrganismType.pollinator,
+        "weight": 1,
+        "size": 0.8,
+        "age": 0,
+        "max_age": 50,
+        "reproduction_age": 4,
+        "fertility_rate": 2,
+        "water_consumption": 0.2,
+        "food_consumption": 0.3,
+        "diet_type": DietType.nectarivore,
+        "activity_cycle": ActivityCycle.diurnal,
+        "speed": Speed.fast,
+    },
+    {
+        "name": "Hummingbird",
+        "type": OrganismType.pollinator,
+        "weight": 0.005,
+        "size": 0.1,
+        "age": 0,
+        "max_age": 5,
+        "reproduction_age": 1,
+        "fertility_rate": 2,
+        "water_consumption": 0.01,
+        "food_consumption": 0.02,
+        "diet_type": DietType.nectarivore,
+        "activity_cycle": ActivityCycle.diurnal,
+        "speed": Speed.fast,
+    },
+]
+
+DEFAULT_PLANTS: list[dict] = [
+    {"name": "Oak", "type": PlantType.tree},
+    {"name": "Pine", "type": PlantType.tree},
+    {"name": "Maple", "type": PlantType.tree},
+    {"name": "Fern", "type": PlantType.herb},
+    {"name": "Cactus", "type": PlantType.herb},
+    {"name": "Grass", "type": PlantType.herb},
+    {"name": "Shrub", "type": PlantType.shrub},
+    {"name": "Lily", "type": PlantType.flower},
+    {"name": "Sunflower", "type": PlantType.flower},
+    {"name": "Mushroom", "type": PlantType.flower},
+]
+
+
+# Full column rows (model defaults applied) so every row of an executemany
+# INSERT has the same keys. Built once, only the ids are generated per load.
+def catalog_rows(model, dataset: list[dict]) -> list[dict]:
+    columns = [column for column in column_keys(model) if column != "id"]
+    rows = []
+    for entry in dataset:
+        template = model(**entry)
+        rows.append({column: getattr(template, column, None) for column in columns})
+    return rows
+
+
+DEFAULT_DATASET = {
+    Organism: catalog_rows(Organism, DEFAULT_ORGANISMS),
+    Plant: catalog_rows(Plant, DEFAULT_PLANTS),
+}
+
+# Link model -> the species models of its two ends
+LINK_ENDS = {
+    PredationLink: (Organism, Organism),
+    PollinationLink: (Organism, Plant),
+}
+
+BIOME_DATASETS = {
+    environment_type: {
+        Organism: catalog_rows(Organism, pack["organisms"]),
+        Plant: catalog_rows(Plant, pack["plants"]),
+        PredationLink: pack["predation"],
+        PollinationLink: pack["pollination"],
+    }
+    for environment_type, pack in BIOME_PACKS.items()
+}
+
 
+# RANDOM loads one of the packs, NULL the defaults, which have no environment
+def biome_dataset(biome: EnvironmentType | None) -> tuple[EnvironmentType | None, dict]:
+    if biome == EnvironmentType.random:
+        biome = random.choice(list(BIOME_DATASETS))
+    if biome in (None, EnvironmentType.null):
+        return None, DEFAULT_DATASET
+    return biome, BIOME_DATASETS[biome]
 
-def return_defaults():
-    default_organisms: List[Organism] = [
-        Organism(
-            id=uuid4(),
-            name="Wolf",
-            type=OrganismType.predator,
-            weight=40,
-            size=1.1,
-            age=0,
-            max_age=14,
-            reproduction_age=2,
-            fertility_rate=4,
-            water_consumption=2,
-            food_consumption=3,
-            diet_type=DietType.carnivore,
-            activity_cycle=ActivityCycle.nocturnal,
-            speed=Speed.fast,
-            social_behavior=SocialBehavior.pack,
-        ),
-        Organism(
-            id=uuid4(),
-            name="Rabbit",
-            type=OrganismType.herbivore,
-            weight=2,
-            size=0.3,
-            age=0,
-            max_age=9,
-            reproduction_age=0.4,
-            fertility_rate=6,
-            water_consumption=0.3,
-            food_consumption=0.5,
-            diet_type=DietType.herbivore,
-            activity_cycle=ActivityCycle.diurnal,
-            speed=Speed.fast,
-            social_behavior=SocialBehavior.herd,
-        ),
-        Organism(
-            id=uuid4(),
-            name="Bear",
-            type=OrganismType.omnivore,
-            weight=250,
-            size=2.0,
-            age=0,
-            max_age=25,
-            reproduction_age=4,
-            fertility_rate=2,
-            water_consumption=5,
-            food_consumption=7,
-            diet_type=DietType.omnivore,
-            activity_cycle=ActivityCycle.nocturnal,
-            speed=Speed.normal,
-            social_behavior=SocialBehavior.solitary,
-        ),
-        Organism(
-            id=uuid4(),
-            name="Eagle",
-            type=OrganismType.predator,
-            weight=6,
-            size=0.7,
-            age=0,
-            max_age=20,
-            reproduction_age=3,
-            fertility_rate=2,
-            water_consumption=0.2,
-            food_consumption=0.3,
-            diet_type=DietType.carnivore,
-            activity_cycle=ActivityCycle.diurnal,
-            speed=Speed.fast,
-        ),
-        Organism(
-            id=uuid4(),
-            name="Deer",
-            type=OrganismType.herbivore,
-            weight=80,
-            size=1.5,
-            age=0,
-            max_age=15,
-            reproduction_age=2,
-            fertility_rate=1,
-            water_consumption=3,
-            food_consumption=4,
-            diet_type=DietType.herbivore,
-            activity_cycle=ActivityCycle.diurnal,
-            speed=Speed.fast,
-            social_behavior=SocialBehavior.herd,
-        ),
-        Organism(
-            id=uuid4(),
-            name="Fox",
-            type=OrganismType.omnivore,
-            weight=7,
-            size=0.5,
-            age=0,
-            max_age=12,
-            reproduction_age=1,
-            fertility_rate=4,
-            water_consumption=1,
-            food_consumption=1.5,
-            diet_type=DietType.omnivore,
-            activity_cycle=ActivityCycle.nocturnal,
-            speed=Speed.fast,
-        ),
-        Organism(
-            id=uuid4(),
-            name="Owl",
-            type=OrganismType.predator,
-            weight=1.2,
-            size=0.3,
-            age=0,
-            max_age=15,
-            reproduction_age=1,
-            fertility_rate=3,
-            water_consumption=0.1,
-            food_consumption=0.2,
-            diet_type=DietType.carnivore,
-            activity_cycle=ActivityCycle.nocturnal,
-            speed=Speed.normal,
-        ),
-        Organism(
-            id=uuid4(),
-            name="Squirrel",
-            type=OrganismType.herbivore,
-            weight=0.4,
-            size=0.2,
-            age=0,
-            max_age=8,
-            reproduction_age=0.6,
-            fertility_rate=5,
-            water_consumption=0.05,
-            food_consumption=0.1,
-            diet_type=DietType.herbivore,
-            activity_cycle=ActivityCycle.diurnal,
-            speed=Speed.normal,
-            social_behavior=SocialBehavior.solitary,
-        ),
-        Organism(
-            id=uuid4(),
-            name="Wild Boar",
-            type=OrganismType.omnivore,
-            weight=90,
-            size=1.2,
-            age=0,
-            max_age=10,
-            reproduction_age=2,
-            fertility_rate=6,
-            water_consumption=3,
-            food_consumption=5,
-            diet_type=DietType.omnivore,
-            activity_cycle=ActivityCycle.nocturnal,
-            speed=Speed.fast,
-        ),
-        Organism(
-            id=uuid4(),
-            name="Tiger",
-            type=OrganismType.predator,
-            weight=220,
-            size=2.3,
-            age=0,
-            max_age=20,
-            reproduction_age=3,
-            fertility_rate=3,
-            water_consumption=4,
-            food_consumption=8,
-            diet_type=DietType.carnivore,
-            activity_cycle=ActivityCycle.nocturnal,
-            speed=Speed.fast,
-            social_behavior=SocialBehavior.solitary,
-        ),
-        Organism(
-            id=uuid4(),
-            name="Antelope",
-            type=OrganismType.herbivore,
-            weight=70,
-            size=1.3,
-            age=0,
-            max_age=12,
-            reproduction_age=2,
-            fertility_rate=1,
-            water_consumption=2,
-            food_consumption=3,
-            diet_type=DietType.herbivore,
-            activity_cycle=ActivityCycle.diurnal,
-            speed=Speed.fast,
-            social_behavior=SocialBehavior.herd,
-        ),
-        Organism(
-            id=uuid4(),
-            name="Badger",
-            type=OrganismType.omnivore,
-            weight=12,
-            size=0.6,
-            age=0,
-            max_age=14,
-            reproduction_age=1,
-            fertility_rate=3,
-            water_consumption=1,
-            food_consumption=1.5,
-            diet_type=DietType.omnivore,
-            activity_cycle=ActivityCycle.nocturnal,
-            speed=Speed.normal,
-        ),
-        Organism(
-            id=uuid4(),
-            name="Falcon",
-            type=OrganismType.predator,
-            weight=1,
-            size=0.35,
-            age=0,
-            max_age=16,
-            reproduction_age=2,
-            fertility_rate=2,
-            water_consumption=0.1,
-            food_consumption=0.2,
-            diet_type=DietType.carnivore,
-            activity_cycle=ActivityCycle.diurnal,
-            speed=Speed.fast,
-        ),
-        Organism(
-            id=uuid4(),
-            name="Goat",
-            type=OrganismType.herbivore,
-            weight=30,
-            size=0.9,
-            age=0,
-            max_age=12,
-            reproduction_age=1.2,
-            fertility_rate=2,
-            water_consumption=1.5,
-            food_consumption=2.5,
-            diet_type=DietType.herbivore,
-            activity_cycle=ActivityCycle.diurnal,
-            speed=Speed.normal,
-        ),
-        Organism(
-            id=uuid4(),
-            name="Raccoon",
-            type=OrganismType.omnivore,
-            weight=7,
-            size=0.5,
-            age=0,
-            max_age=13,
-            reproduction_age=1,
-            fertility_rate=4,
-            water_consumption=1,
-            food_consumption=1.5,
-            diet_type=DietType.omnivore,
-            activity_cycle=ActivityCycle.nocturnal,
-            speed=Speed.normal,
-        ),
-        Organism(
-            id=uuid4(),
-            name="Lynx",
-            type=OrganismType.predator,
-            weight=30,
-            size=1.0,
-            age=0,
-            max_age=17,
-            reproduction_age=2,
-            fertility_rate=2,
-            water_consumption=1.5,
-            food_consumption=3,
-            diet_type=DietType.carnivore,
-            activity_cycle=ActivityCycle.nocturnal,
-            speed=Speed.fast,
-        ),
-        Organism(
-            id=uuid4(),
-            name="Buffalo",
-            type=OrganismType.herbivore,
-            weight=500,
-            size=2.0,
-            age=0,
-            max_age=25,
-            reproduction_age=3,
-            fertility_rate=1,
-            water_consumption=20,
-            food_consumption=25,
-            diet_type=DietType.herbivore,
-            activity_cycle=ActivityCycle.diurnal,
-            speed=Speed.normal,
-            social_behavior=SocialBehavior.herd,
-        ),
-        Organism(
-            id=uuid4(),
-            name="Vulture",
-            type=OrganismType.omnivore,
-            weight=2,
-            size=0.6,
-            age=0,
-            max_age=20,
-            reproduction_age=2,
-            fertility_rate=2,
-            water_consumption=0.2,
-            food_consumption=0.4,
-            diet_type=DietType.omnivore,
-            activity_cycle=ActivityCycle.diurnal,
-            speed=Speed.normal,
-        ),
-        Organism(
-            id=uuid4(),
-            name="Macaw",
-            type=OrganismType.pollinator,
-            weight=1,
-            size=0.8,
-            age=0,
-            max_age=50,
-            reproduction_age=4,
-            fertility_rate=2,
-            water_consumption=0.2,
-            food_consumption=0.3,
-            diet_type=DietType.nectarivore,
-            activity_cycle=ActivityCycle.diurnal,
-            speed=Speed.fast,
-        ),
-        Organism(
-            id=uuid4(),
-            name="Hummingbird",
-            type=OrganismType.pollinator,
-            weight=0.005,
-            size=0.1,
-            age=0,
-            max_age=5,
-            reproduction_age=1,
-            fertility_rate=2,
-            water_consumption=0.01,
-            food_consumption=0.02,
-            diet_type=DietType.nectarivore,
-            activity_cycle=ActivityCycle.diurnal,
-            speed=Speed.fast,
-        ),
-    ]
 
-    default_plants: List[Plant] = [
-        Plant(id=uuid4(), name="Oak", type=PlantType.tree),
-        Plant(id=uuid4(), name="Pine", type=PlantType.tree),
-        Plant(id=uuid4(), name="Maple", type=PlantType.tree),
-        Plant(id=uuid4(), name="Fern", type=PlantType.herb),
-        Plant(id=uuid4(), name="Cactus", type=PlantType.herb),
-        Plant(id=uuid4(), name="Grass", type=PlantType.herb),
-        Plant(id=uuid4(), name="Shrub", type=PlantType.shrub),
-        Plant(id=uuid4(), name="Lily", type=PlantType.flower),
-        Plant(id=uuid4(), name="Sunflower", type=PlantType.flower),
-        Plant(id=uuid4(), name="Mushroom", type=PlantType.flower),
-    ]
+# Inserts the templates of the dataset that aren't in the catalog yet, with one
+# name lookup and a batched INSERT per model, then the links between the names
+# of the dataset that aren't stored yet. Returns model -> (added, skipped) for
+# the species and model -> added pairs for the links.
+async def load_catalog_dataset(session: AsyncSession, dataset: dict[type, list]):
+    result = {}
+    templates = {}
+    for model in (Organism, Plant):
+        rows = dataset.get(model, [])
+        existing = await resolve_template_names(
+            session, model, {row["name"].lower() for row in rows}
+        )
+        missing = [
+            {**row, "id": uuid4()}
+            for row in rows
+            if row["name"].lower() not in existing
+        ]
+        await insert_in_batches(session, model, missing)
+        templates[model] = existing | {
+            row["name"].lower(): row["id"] for row in missing
+        }
+        result[model] = (
+            [row["name"] for row in missing],
+            [row["name"] for row in rows if row["name"].lower() in existing],
+        )
 
-    return default_organisms, default_plants
+    for link_model, (left_model, right_model) in LINK_ENDS.items():
+        links = await insert_missing_links(
+            session,
+            link_model,
+            {
+                (
+                    templates[left_model][left.lower()],
+                    templates[right_model][right.lower()],
+                )
+                for left, right in dataset.get(link_model, [])
+            },
+        )
+        # Links between species already in use change those ecosystems
+        if links:
+            await touch_ecosystems_holding(
+                session, OrganismIndividual, {link[0] for link in links}
+            )
+            await touch_ecosystems_holding(
+                session,
+                OrganismIndividual if right_model is Organism else PlantIndividual,
+                {link[1] for link in links},
+            )
+        result[link_model] = links
+    await session.commit()
+    return result
@@ -0,0 +1,47 @@
+from uuid import UUID
+
+from fastapi import Response
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.models import Ecosystem
+
+
+def make_etag(*parts) -> str:
+    return '"' + "-".join(str(part) for part in parts) + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in candidates
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
+
+
+# Members read their attributes from the species, so editing or deleting a
+# template changes every ecosystem holding one of its individuals
+async def touch_species_ecosystems(session: AsyncSession, individual, species_id):
+    await touch_ecosystems_holding(session, individual, {species_id})
+
+
+async def touch_ecosystems_holding(
+    session: AsyncSession, individual, species_ids: set[UUID]
+):
+    await session.execute(
+        update(Ecosystem)
+        .where(
+            Ecosystem.id.in_(
+                select(individual.ecosystem_id).where(
+                    individual.species_id.in_(species_ids)
+                )
+            )
+        )
+        .values(version=Ecosystem.version + 1)
+        .execution_options(synchronize_session=False)
+    )
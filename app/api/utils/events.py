@@ -0,0 +1,63 @@
+import zlib
+from collections import defaultdict
+from uuid import UUID
+
+import orjson
+
+from app.api.utils.utils import make_json_serializable
+from app.database.models import SimulationChunk, SimulationEventIndex
+
+
+def compress_json(value) -> bytes:
+    return zlib.compress(orjson.dumps(make_json_serializable(value)))
+
+
+def decompress_json(value: bytes):
+    return orjson.loads(zlib.decompress(value))
+
+
+# Events of a running simulation. Each day is written as a SimulationChunk once
+# it's over, so only the current day and the actor index are held in memory.
+class SimulationEventLog:
+    def __init__(self):
+        self.days: dict[str, list] = {}
+        self.index: dict[str, list[list]] = defaultdict(list)
+
+    def open_day(self, day: str):
+        return self.days.setdefault(day, [])
+
+    def add(self, day: str, event, *actors):
+        events = self.open_day(day)
+        offset = len(events)
+        events.append(event)
+        for actor in actors:
+            if actor is None:
+                continue
+            for key in (actor.name, str(actor.id)):
+                postings = self.index[key]
+                # The same species can be on both sides of an event (Wolf vs Wolf)
+                if not postings or postings[-1] != [day, offset]:
+                    postings.append([day, offset])
+
+    # The chunk of a finished day, its events leave the log
+    def close_day(self, simulation_id: UUID, day: str) -> SimulationChunk:
+        return SimulationChunk(
+            simulation_id=simulation_id,
+            day=day,
+            events=compress_json(self.days.pop(day)),
+        )
+
+    # Written once the simulation ends, the postings span all its days
+    def index_rows(self, simulation_id: UUID) -> list[SimulationEventIndex]:
+        return [
+            SimulationEventIndex(
+                simulation_id=simulation_id,
+                actor=actor,
+                postings=compress_json(postings),
+            )
+            for actor, postings in self.index.items()
+        ]
+
+
+def day_number(day: str) -> int:
+    return int(day.removeprefix("day "))
@@ -0,0 +1,277 @@
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+def escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# Minimal in-process metrics in the Prometheus text format, one set per
+# worker. Everything runs on the event loop, so no locking.
+class Metric(ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.series: dict[tuple, object] = {}
+
+    def key(self, labels: dict) -> tuple:
+        return tuple(labels[name] for name in self.labels)
+
+    # (sample name, label text, value) for every line of the metric
+    @abstractmethod
+    def samples(self):
+        pass
+
+    def render(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} {self.kind}",
+            *(
+                f"{name}{label_text} {format_value(value)}"
+                for name, label_text, value in self.samples()
+            ),
+        ]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self.key(labels)
+        self.series[key] = self.series.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self.series.get(self.key(labels), 0)
+
+    def samples(self):
+        for key, value in sorted(self.series.items()):
+            yield self.name, format_labels(self.labels, key), value
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        self.series[self.key(labels)] = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, help, labels)
+        self.buckets = (*buckets, float("inf"))
+
+    # Per series: [count per bucket (not cumulative), sum]
+    def observe(self, value: float, **labels):
+        key = self.key(labels)
+        if key not in self.series:
+            self.series[key] = [[0] * len(self.buckets), 0.0]
+        counts, _ = series = self.series[key]
+        counts[bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def count(self, **labels) -> int:
+        series = self.series.get(self.key(labels))
+        return sum(series[0]) if series else 0
+
+    def samples(self):
+        for key, (counts, total) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = f'le="{format_value(bound)}"'
+                yield (
+                    f"{self.name}_bucket",
+                    format_labels(self.labels, key, le),
+                    cumulative,
+                )
+            labels = format_labels(self.labels, key)
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, cumulative
+
+
+HTTP_REQUEST_DURATION = Histogram(
+    "ecosim_http_request_duration_seconds",
+    "Time to send the whole response, by route template",
+    ("method", "route", "status"),
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "ecosim_db_queries_per_request",
+    "Statements executed while serving a request",
+    ("route",),
+    COUNT_BUCKETS,
+)
+DB_QUERY_TIME_PER_REQUEST = Histogram(
+    "ecosim_db_query_time_per_request_seconds",
+    "Time spent in the database while serving a request",
+    ("route",),
+)
+DB_QUERY_DURATION = Histogram(
+    "ecosim_db_query_duration_seconds",
+    "Duration of every statement, requests and background tasks alike",
+    buckets=QUERY_BUCKETS,
+)
+SIMULATION_CYCLES = Counter(
+    "ecosim_simulation_cycles_total", "Simulation cycles completed"
+)
+SIMULATION_CYCLE_DURATION = Histogram(
+    "ecosim_simulation_cycle_duration_seconds",
+    "Duration of a simulation cycle, commit included",
+)
+SIMULATION_CYCLES_PER_SECOND = Gauge(
+    "ecosim_simulation_cycles_per_second", "Throughput of the last simulation run"
+)
+SIMULATION_ORGANISMS_PROCESSED = Counter(
+    "ecosim_simulation_organisms_processed_total",
+    "Organisms that took their turn in a cycle",
+)
+SIMULATION_BIRTHS = Counter(
+    "ecosim_simulation_births_total", "Individuals born in simulations", ("kind",)
+)
+SIMULATION_DEATHS = Counter(
+    "ecosim_simulation_deaths_total", "Individuals dead in simulations", ("kind",)
+)
+SIMULATION_COMMIT_DURATION = Histogram(
+    "ecosim_simulation_commit_duration_seconds",
+    "Time to write back and commit the state of a cycle",
+)
+
+METRICS = [
+    HTTP_REQUEST_DURATION,
+    DB_QUERIES_PER_REQUEST,
+    DB_QUERY_TIME_PER_REQUEST,
+    DB_QUERY_DURATION,
+    SIMULATION_CYCLES,
+    SIMULATION_CYCLE_DURATION,
+    SIMULATION_CYCLES_PER_SECOND,
+    SIMULATION_ORGANISMS_PROCESSED,
+    SIMULATION_BIRTHS,
+    SIMULATION_DEATHS,
+    SIMULATION_COMMIT_DURATION,
+]
+
+
+def render_metrics() -> str:
+    return "\n".join(line for metric in METRICS for line in metric.render()) + "\n"
+
+
+class RequestQueries:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+current_request_queries: ContextVar[RequestQueries | None] = ContextVar(
+    "current_request_queries", default=None
+)
+
+
+# Listens on the Engine class, so every engine (primary, read pool, replicas)
+# is counted. The start times are stacked on the connection, statements on one
+# connection never overlap.
+@event.listens_for(Engine, "before_cursor_execute")
+def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("query_started")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    DB_QUERY_DURATION.observe(elapsed)
+    queries = current_request_queries.get()
+    if queries is not None:
+        queries.count += 1
+        queries.seconds += elapsed
+
+
+def route_of(scope) -> str:
+    route = scope.get("route")
+    # Unmatched paths share one label, so scanners can't grow the series
+    return getattr(route, "path", None) or "unmatched"
+
+
+# Times each request until the last byte of the response is sent, background
+# tasks (such as the simulation) run after that and aren't counted. Plain ASGI
+# like ReadYourWritesMiddleware.
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        queries = RequestQueries()
+        token = current_request_queries.set(queries)
+        status = 500
+        observed = False
+
+        def observe():
+            nonlocal observed
+            if observed:
+                return
+            observed = True
+            route = route_of(scope)
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                route=route,
+                status=status,
+            )
+            DB_QUERIES_PER_REQUEST.observe(queries.count, route=route)
+            DB_QUERY_TIME_PER_REQUEST.observe(queries.seconds, route=route)
+
+        async def send_and_observe(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get(
+                "more_body", False
+            ):
+                observe()
+
+        try:
+            await self.app(scope, receive, send_and_observe)
+        finally:
+            observe()
+            current_request_queries.reset(token)
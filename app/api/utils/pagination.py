@@ -0,0 +1,81 @@
+import base64
+import json
+from typing import Literal
+from uuid import UUID
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.exceptions.exceptions import INVALID_CURSOR_ERROR, INVALID_FIELDS_ERROR
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+PageOrder = Literal["id", "name"]
+
+
+def parse_fields(model, fields: str | None) -> list[str]:
+    columns = list(model.__table__.columns.keys())
+    if not fields:
+        return columns
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in columns]
+    if unknown:
+        raise INVALID_FIELDS_ERROR(unknown)
+    return requested
+
+
+def encode_cursor(values: list) -> str:
+    raw = json.dumps([str(value) for value in values]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str, order_by: PageOrder) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        if order_by == "name":
+            name, last_id = values
+            return [name, UUID(last_id)]
+        (last_id,) = values
+        return [UUID(last_id)]
+    except (ValueError, TypeError):
+        raise INVALID_CURSOR_ERROR()
+
+
+# Keyset pagination: the cursor carries the sort key of the last row returned,
+# so every page is an index range scan instead of an OFFSET over the whole table
+async def paginate(
+    session: AsyncSession,
+    model,
+    fields: list[str],
+    order_by: PageOrder = "id",
+    after: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    where: tuple = (),
+):
+    sort_keys = ["name", "id"] if order_by == "name" else ["id"]
+    selected = list(dict.fromkeys([*fields, *sort_keys]))
+    columns = model.__table__.columns
+
+    query = select(*[columns[field] for field in selected]).where(*where)
+    if after:
+        last = decode_cursor(after, order_by)
+        if order_by == "name":
+            query = query.where(
+                or_(
+                    columns["name"] > last[0],
+                    and_(columns["name"] == last[0], columns["id"] > last[1]),
+                )
+            )
+        else:
+            query = query.where(columns["id"] > last[0])
+    query = query.order_by(*[columns[key] for key in sort_keys]).limit(limit + 1)
+
+    rows = (await session.execute(query)).mappings().all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1][key] for key in sort_keys])
+
+    items = [{field: row[field] for field in fields} for row in rows]
+    return items, next_cursor
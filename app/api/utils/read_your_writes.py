@@ -0,0 +1,56 @@
+import math
+import time
+from http.cookies import SimpleCookie
+
+from app.database.replicas import STICKY_COOKIE, ClientWrites, current_client
+
+DEFAULT_STICKY_SECONDS = 5.0
+
+
+def primary_until(headers: list[tuple[bytes, bytes]]) -> float:
+    cookies = SimpleCookie()
+    for name, value in headers:
+        if name == b"cookie":
+            cookies.load(value.decode("latin-1"))
+    try:
+        return float(cookies[STICKY_COOKIE].value)
+    except (KeyError, ValueError):
+        return 0
+
+
+# Remembers in a cookie that the client wrote, so its reads skip the replicas
+# for sticky_seconds. Plain ASGI, the session sees the client through a
+# context variable set for the whole request.
+class ReadYourWritesMiddleware:
+    def __init__(self, app, sticky_seconds: float = DEFAULT_STICKY_SECONDS):
+        self.app = app
+        self.sticky_seconds = sticky_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        client = ClientWrites(primary_until(scope["headers"]))
+        token = current_client.set(client)
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and client.wrote:
+                cookie = (
+                    f"{STICKY_COOKIE}={time.time() + self.sticky_seconds:.3f}; "
+                    f"Max-Age={math.ceil(self.sticky_seconds)}; Path=/; "
+                    "HttpOnly; SameSite=Lax"
+                )
+                message = {
+                    **message,
+                    "headers": [
+                        *message.get("headers", []),
+                        (b"set-cookie", cookie.encode("latin-1")),
+                    ],
+                }
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_cookie)
+        finally:
+            current_client.reset(token)
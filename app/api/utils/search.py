@@ -0,0 +1,170 @@
+import re
+from collections import defaultdict
+from uuid import UUID
+
+from sqlalchemy import case, func, literal, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.utils.cache import catalog_cache
+from app.api.utils.utils import rows_to_dicts
+
+DEFAULT_SEARCH_LIMIT = 50
+# Same default as pg_trgm.word_similarity_threshold
+WORD_SIMILARITY_THRESHOLD = 0.6
+# Templates read per search where the index can't be cached
+SEARCH_CANDIDATE_LIMIT = 1000
+
+
+# pg_trgm style trigrams: lowercased words padded with two spaces in front and
+# one behind, so prefixes share more trigrams than infixes
+def trigrams(value: str) -> set[str]:
+    grams = set()
+    for word in re.findall(r"\w+", value.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+# Trigrams inside the words of the value. Every name containing the value
+# as a substring has all of them among its padded trigrams
+def inner_trigrams(value: str) -> set[str]:
+    grams = set()
+    for word in re.findall(r"\w+", value.lower()):
+        grams.update(word[i : i + 3] for i in range(len(word) - 2))
+    return grams
+
+
+# In-process replacement for a pg_trgm GIN index, used on databases without
+# pg_trgm. Built from the template names and cached per catalog version.
+class TrigramIndex:
+    def __init__(self, rows):
+        self.names: dict[UUID, str] = {}
+        self.sizes: dict[UUID, int] = {}
+        self.postings: dict[str, set[UUID]] = defaultdict(set)
+        for row_id, name in rows:
+            self.names[row_id] = name.lower()
+            grams = trigrams(name)
+            self.sizes[row_id] = len(grams)
+            for gram in grams:
+                self.postings[gram].add(row_id)
+
+    def substring_candidates(self, term: str) -> set[UUID]:
+        grams = inner_trigrams(term)
+        if not grams:
+            # Shorter than a trigram, nothing to narrow the scan with
+            return set(self.names)
+        postings = sorted((self.postings.get(gram, set()) for gram in grams), key=len)
+        return set.intersection(*postings)
+
+    def search(self, term: str, limit: int) -> list[UUID]:
+        term = term.lower()
+        grams = trigrams(term)
+        shared = defaultdict(int)
+        for gram in grams:
+            for row_id in self.postings.get(gram, ()):
+                shared[row_id] += 1
+
+        ranked = []
+        for row_id in self.substring_candidates(term) | set(shared):
+            name = self.names[row_id]
+            word_similarity = shared[row_id] / len(grams) if grams else 0
+            if term not in name and word_similarity < WORD_SIMILARITY_THRESHOLD:
+                continue
+            # Whole-name similarity breaks ties in favour of the closest name
+            union = len(grams) + self.sizes[row_id] - shared[row_id]
+            similarity = shared[row_id] / union if union else 0
+            ranked.append(
+                (
+                    name != term,
+                    not name.startswith(term),
+                    -word_similarity,
+                    -similarity,
+                    name,
+                    row_id,
+                )
+            )
+        ranked.sort()
+        return [entry[-1] for entry in ranked[:limit]]
+
+
+async def load_trigram_index(session: AsyncSession, model) -> TrigramIndex:
+    async def build_index():
+        rows = await session.execute(
+            select(model.id, model.name).where(model.ecosystem_id.is_(None))
+        )
+        return TrigramIndex(rows.all())
+
+    return await catalog_cache.get_or_load(
+        session, ("search_index", model.__tablename__), build_index
+    )
+
+
+# A replica can lag behind the per-worker catalog version, so nothing read
+# from it is cached (see CatalogCache.get_or_load). Instead of indexing the
+# whole catalog on every search, only the templates sharing a trigram with the
+# term are read, with a bounded LIKE query. The query ranks like the index
+# (exact, prefix, substring, then the most trigrams shared) before the limit,
+# so the best matches are never the ones cut off.
+async def search_candidates(
+    session: AsyncSession, model, term: str, limit: int
+) -> list[dict]:
+    name = func.lower(model.name)
+    lowered = term.lower()
+    matches = [
+        name.contains(pattern, autoescape=True)
+        for pattern in sorted(inner_trigrams(term) or {lowered})
+    ]
+    query = await session.execute(
+        select(*model.__table__.columns)
+        .where(model.ecosystem_id.is_(None), or_(*matches))
+        .order_by(
+            (name == lowered).desc(),
+            name.startswith(lowered, autoescape=True).desc(),
+            name.contains(lowered, autoescape=True).desc(),
+            sum(case((match, 1), else_=0) for match in matches).desc(),
+            name,
+            model.id,
+        )
+        .limit(SEARCH_CANDIDATE_LIMIT)
+    )
+    rows = {row["id"]: row for row in rows_to_dicts(query)}
+    index = TrigramIndex((row_id, row["name"]) for row_id, row in rows.items())
+    return [rows[row_id] for row_id in index.search(term, limit)]
+
+
+# Ranks template names containing the term first (exact, then prefix), then
+# the ones within the similarity threshold, so "wolv" still finds "Wolf"
+async def search_templates(
+    session: AsyncSession, model, term: str, limit: int = DEFAULT_SEARCH_LIMIT
+) -> list[dict]:
+    columns = model.__table__.columns
+    if session.bind.dialect.name == "postgresql":
+        lowered = term.lower()
+        query = await session.execute(
+            select(*columns)
+            .where(
+                model.ecosystem_id.is_(None),
+                model.name.icontains(term, autoescape=True)
+                | literal(lowered).op("<%")(model.name),
+            )
+            .order_by(
+                (func.lower(model.name) == lowered).desc(),
+                model.name.istartswith(term, autoescape=True).desc(),
+                func.word_similarity(lowered, model.name).desc(),
+                func.similarity(lowered, model.name).desc(),
+                model.name,
+            )
+            .limit(limit)
+        )
+        return rows_to_dicts(query)
+
+    if session.info.get("replica") and not catalog_cache.shared:
+        return await search_candidates(session, model, term, limit)
+
+    index = await load_trigram_index(session, model)
+    ids = index.search(term, limit)
+    if not ids:
+        return []
+    query = await session.execute(select(*columns).where(model.id.in_(ids)))
+    rows = {row["id"]: row for row in rows_to_dicts(query)}
+    return [rows[row_id] for row_id in ids if row_id in rows]
@@ -0,0 +1,30 @@
+import orjson
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+STREAM_BATCH_SIZE = 1000
+
+
+# Reads through a server-side cursor and encodes STREAM_BATCH_SIZE rows at a
+# time, so memory doesn't grow with the table and the first line goes out as
+# soon as the first batch arrives
+async def ndjson_rows(
+    session: AsyncSession, statement: Select, batch_size: int = STREAM_BATCH_SIZE
+):
+    result = await session.stream(statement.execution_options(yield_per=batch_size))
+    # Result keys can be str subclasses, which orjson refuses as dict keys
+    keys = [str(key) for key in result.keys()]
+    async for rows in result.partitions():
+        yield b"".join(orjson.dumps(dict(zip(keys, row))) + b"\n" for row in rows)
+
+
+def ndjson_response(
+    session: AsyncSession, statement: Select, headers: dict | None = None
+) -> StreamingResponse:
+    return StreamingResponse(
+        ndjson_rows(session, statement),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers=headers,
+    )
@@ -0,0 +1,98 @@
+from typing import AsyncIterator, Literal
+
+import orjson
+from fastapi import Request
+from sqlalchemy import Enum, Select, Table
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.exceptions.exceptions import INVALID_IMPORT_ERROR
+from app.api.utils.streaming import STREAM_BATCH_SIZE
+
+TransferFormat = Literal["ndjson", "columnar"]
+
+
+# Ids are regenerated on import and references travel as names, so the
+# exported columns leave them out
+def export_columns(table: Table, excluded: set[str]) -> list:
+    return [column for column in table.columns if column.key not in excluded]
+
+
+# ndjson is one {"kind": ..., **row} object per line. columnar is one line per
+# row group of STREAM_BATCH_SIZE rows, {"kind": ..., "columns": {name: [...]}},
+# so repeated keys are written once per group instead of once per row.
+async def export_lines(
+    session: AsyncSession, kind: str, statement: Select, columnar: bool
+) -> AsyncIterator[bytes]:
+    result = await session.stream(
+        statement.execution_options(yield_per=STREAM_BATCH_SIZE)
+    )
+    # Result keys can be str subclasses, which orjson refuses as dict keys
+    keys = [str(key) for key in result.keys()]
+    async for rows in result.partitions():
+        if columnar:
+            columns = dict(zip(keys, map(list, zip(*rows))))
+            yield orjson.dumps({"kind": kind, "columns": columns}) + b"\n"
+        else:
+            yield b"".join(
+                orjson.dumps({"kind": kind, **dict(zip(keys, row))}) + b"\n"
+                for row in rows
+            )
+
+
+def parse_line(number: int, line: bytes) -> list[tuple[int, str, dict]]:
+    if not line.strip():
+        return []
+    try:
+        record = orjson.loads(line)
+    except orjson.JSONDecodeError:
+        raise INVALID_IMPORT_ERROR(number, "Not a JSON object")
+    if not isinstance(record, dict) or not isinstance(record.get("kind"), str):
+        raise INVALID_IMPORT_ERROR(number, "Every record needs a kind")
+    kind = record.pop("kind")
+    if "columns" not in record:
+        return [(number, kind, record)]
+
+    columns = record["columns"]
+    if not isinstance(columns, dict) or not all(
+        isinstance(values, list) for values in columns.values()
+    ):
+        raise INVALID_IMPORT_ERROR(number, "columns must map names to lists")
+    if len({len(values) for values in columns.values()}) > 1:
+        raise INVALID_IMPORT_ERROR(number, "All the columns must have the same length")
+    return [(number, kind, dict(zip(columns, row))) for row in zip(*columns.values())]
+
+
+# Reads the body as it arrives instead of buffering the whole upload, both
+# layouts come out as (line number, kind, row)
+async def read_records(request: Request) -> AsyncIterator[tuple[int, str, dict]]:
+    buffer, number = b"", 0
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            number += 1
+            for record in parse_line(number, line):
+                yield record
+    for record in parse_line(number + 1, buffer):
+        yield record
+
+
+# Keeps the row to the table's columns and turns enum values back into enums
+def coerce_row(table: Table, row: dict, line: int) -> dict:
+    unknown = [key for key in row if key not in table.c]
+    if unknown:
+        raise INVALID_IMPORT_ERROR(line, f"Unknown fields: {', '.join(unknown)}")
+    coerced = {}
+    for key, value in row.items():
+        column_type = table.c[key].type
+        if (
+            isinstance(column_type, Enum)
+            and column_type.enum_class
+            and value is not None
+        ):
+            try:
+                value = column_type.enum_class(value)
+            except ValueError:
+                raise INVALID_IMPORT_ERROR(line, f"Invalid value for {key}: {value}")
+        coerced[key] = value
+    return coerced
@@ -1,3 +1,4 @@
+from functools import cache
 from uuid import UUID
 
 from fastapi import HTTPException, status
@@ -25,3 +26,22 @@ def make_json_serializable(obj):
 
     else:
         return obj
+
+
+@cache
+def column_keys(model) -> tuple[str, ...]:
+    return tuple(model.__table__.columns.keys())
+
+
+# Plain column values, ready for ORJSONResponse without going through pydantic
+def entity_to_dict(entity) -> dict:
+    return {key: getattr(entity, key) for key in column_keys(type(entity))}
+
+
+# Individuals keep the response shape of the wide rows they were split from
+def individual_to_dict(individual) -> dict:
+    return {**entity_to_dict(individual.species), **entity_to_dict(individual)}
+
+
+def rows_to_dicts(result) -> list[dict]:
+    return [dict(row) for row in result.mappings()]
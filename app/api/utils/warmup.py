@@ -0,0 +1,52 @@
+import logging
+import time
+from uuid import uuid4
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.services.organism import OrganismService
+from app.api.services.plant import PlantService
+from app.api.utils.search import load_trigram_index
+from app.database.loaders import (
+    ECOSYSTEM_MEMBERS,
+    ECOSYSTEM_ORGANISMS,
+    ECOSYSTEM_PLANTS,
+)
+from app.database.models import Organism, Plant
+from app.database.statements import (
+    ORGANISM_TEMPLATE_BY_NAME,
+    PLANT_TEMPLATE_BY_NAME,
+    ecosystem_by_id,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# Runs the hot statements once so the first requests find them compiled in
+# the engine's cache (and prepared, on the asyncpg connection used). The
+# parameters never match, nothing is loaded.
+async def warm_statements(session: AsyncSession):
+    for options in ((), ECOSYSTEM_ORGANISMS, ECOSYSTEM_PLANTS, ECOSYSTEM_MEMBERS):
+        await session.scalar(ecosystem_by_id(options), {"ecosystem_id": uuid4()})
+    for statement in (ORGANISM_TEMPLATE_BY_NAME, PLANT_TEMPLATE_BY_NAME):
+        await session.scalar(statement, {"name": ""})
+
+
+# Loads the first page of the species catalogs, and the in-process search
+# indexes where they are used, into the catalog cache
+async def warm_catalog(session: AsyncSession):
+    await OrganismService(session).get_organisms(detailed=False)
+    await OrganismService(session).get_organisms(detailed=True)
+    await PlantService(session).get_plants(detailed=False)
+    await PlantService(session).get_plants(detailed=True)
+    if session.bind.dialect.name != "postgresql":
+        for model in (Organism, Plant):
+            await load_trigram_index(session, model)
+
+
+async def warm_up(session: AsyncSession):
+    started = time.perf_counter()
+    await warm_statements(session)
+    await warm_catalog(session)
+    await session.rollback()
+    logger.info("Warmed up in %.0f ms", (time.perf_counter() - started) * 1000)
@@ -0,0 +1,180 @@
+import os
+import time
+
+from pydantic import BaseModel
+from sqlalchemy import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+SQLITE_URL = "sqlite+aiosqlite:///./sqlite.db"
+
+
+class EngineProfile(BaseModel):
+    name: str = "default"
+    pool_size: int = 5
+    max_overflow: int = 10
+    # Seconds a request waits for a free connection before failing
+    pool_timeout: float = 30
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = True
+    # Seconds the startup connection check waits for the database
+    probe_timeout: float = 10
+    # asyncpg prepared statements kept per connection, 0 behind pgbouncer
+    statement_cache_size: int = 100
+    # Connections of the separate read pool of a SQLite file, 0 shares the pool
+    read_pool_size: int = 0
+    # PRAGMAs run on every SQLite connection, None keeps SQLite's default
+    sqlite_journal_mode: str | None = None
+    sqlite_synchronous: str | None = None
+    sqlite_mmap_size: int | None = None
+    # Negative values are KiB, positive ones pages
+    sqlite_cache_size: int | None = None
+    sqlite_busy_timeout: int | None = None
+
+    def sqlite_pragmas(self) -> dict[str, str | int]:
+        pragmas = {
+            "journal_mode": self.sqlite_journal_mode,
+            "synchronous": self.sqlite_synchronous,
+            "mmap_size": self.sqlite_mmap_size,
+            "cache_size": self.sqlite_cache_size,
+            "busy_timeout": self.sqlite_busy_timeout,
+        }
+        return {name: value for name, value in pragmas.items() if value is not None}
+
+
+ENGINE_PROFILES = {
+    "default": EngineProfile(),
+    "high_concurrency": EngineProfile(
+        name="high_concurrency", pool_size=20, max_overflow=40, pool_timeout=10
+    ),
+    "low_memory": EngineProfile(name="low_memory", pool_size=2, max_overflow=3),
+    # Transaction pooling hands every statement a different server connection
+    "pgbouncer": EngineProfile(name="pgbouncer", statement_cache_size=0),
+    # SQLite file with a single writer connection, so writers queue on the pool
+    # instead of failing on the database lock, and a pool of readers that WAL
+    # lets run next to it. synchronous=NORMAL only syncs on WAL checkpoints.
+    # Commits of different sessions are serialized, not merged into one: a
+    # shared commit would tie the rollback of one request to the others.
+    "embedded": EngineProfile(
+        name="embedded",
+        pool_size=1,
+        max_overflow=0,
+        read_pool_size=4,
+        sqlite_journal_mode="WAL",
+        sqlite_synchronous="NORMAL",
+        sqlite_mmap_size=256 * 1024 * 1024,
+        sqlite_cache_size=-64 * 1024,
+        sqlite_busy_timeout=5000,
+    ),
+}
+
+
+# DATABASE_ENGINE_PROFILE picks the profile, DATABASE_<FIELD> overrides a field
+def engine_profile_from_env() -> EngineProfile:
+    name = os.getenv("DATABASE_ENGINE_PROFILE", "default")
+    if name not in ENGINE_PROFILES:
+        raise ValueError(
+            f"Unknown DATABASE_ENGINE_PROFILE {name!r}, "
+            f"expected one of {', '.join(ENGINE_PROFILES)}"
+        )
+    overrides = {
+        field: os.environ[f"DATABASE_{field.upper()}"]
+        for field in EngineProfile.model_fields
+        if field != "name" and f"DATABASE_{field.upper()}" in os.environ
+    }
+    return EngineProfile.model_validate(
+        {**ENGINE_PROFILES[name].model_dump(), **overrides}
+    )
+
+
+class PoolTelemetry:
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.overflow_connections = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    # Timed out checkouts count too, they waited the longest
+    def record_wait(self, waited: float):
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+
+# Times every checkout, so a stalled request shows up as waiting on the pool
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.telemetry = PoolTelemetry()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        overflow = self.overflow()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.telemetry.timeouts += 1
+            raise
+        finally:
+            self.telemetry.record_wait(time.perf_counter() - started)
+        self.telemetry.checkouts += 1
+        if self.overflow() > max(overflow, 0):
+            self.telemetry.overflow_connections += 1
+        return connection
+
+
+def is_sqlite_file(database_url: str) -> bool:
+    url = make_url(database_url)
+    return url.get_backend_name() == "sqlite" and url.database not in (
+        None,
+        "",
+        ":memory:",
+    )
+
+
+def engine_options(database_url: str, profile: EngineProfile) -> dict:
+    url = make_url(database_url)
+    options = {"echo": False, "pool_pre_ping": profile.pool_pre_ping}
+    # In-memory SQLite lives in a single connection, there's no pool to size
+    if url.get_backend_name() == "sqlite" and not is_sqlite_file(database_url):
+        return options
+    options.update(
+        poolclass=InstrumentedPool,
+        pool_size=profile.pool_size,
+        max_overflow=profile.max_overflow,
+        pool_timeout=profile.pool_timeout,
+        pool_recycle=profile.pool_recycle,
+    )
+    if url.get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            "statement_cache_size": profile.statement_cache_size,
+            "prepared_statement_cache_size": profile.statement_cache_size,
+        }
+    return options
+
+
+def pool_status(pool: Pool) -> dict:
+    status = {"pool": type(pool).__name__}
+    if not isinstance(pool, InstrumentedPool):
+        return status
+    telemetry = pool.telemetry
+    return {
+        **status,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": pool._max_overflow,
+        "checkouts": telemetry.checkouts,
+        "timeouts": telemetry.timeouts,
+        "overflow_connections": telemetry.overflow_connections,
+        "checkout_wait_ms": {
+            "avg": round(
+                telemetry.wait_seconds_total
+                * 1000
+                / max(telemetry.checkouts + telemetry.timeouts, 1),
+                3,
+            ),
+            "max": round(telemetry.wait_seconds_max * 1000, 3),
+        },
+    }
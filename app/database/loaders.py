@@ -0,0 +1,24 @@
+from sqlalchemy.orm import selectinload
+
+from .models import Ecosystem, Organism, OrganismIndividual, Plant, PlantIndividual
+
+# Every relationship is lazy="raise" in models.py: queries pick one of these
+# profiles to declare which relationships they are going to touch.
+ORGANISM_LINKS = (
+    selectinload(Organism.prey),
+    selectinload(Organism.predator),
+    selectinload(Organism.pollination_target),
+)
+
+PLANT_LINKS = (selectinload(Plant.pollinators),)
+
+# Members always come with their species, which holds most of their attributes
+ECOSYSTEM_ORGANISMS = (
+    selectinload(Ecosystem.organisms).selectinload(OrganismIndividual.species),
+)
+
+ECOSYSTEM_PLANTS = (
+    selectinload(Ecosystem.plants).selectinload(PlantIndividual.species),
+)
+
+ECOSYSTEM_MEMBERS = ECOSYSTEM_ORGANISMS + ECOSYSTEM_PLANTS
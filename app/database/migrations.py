@@ -0,0 +1,390 @@
+import warnings
+
+from sqlalchemy import (
+    Connection,
+    MetaData,
+    Table,
+    Uuid,
+    inspect,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.exc import SAWarning
+from sqlalchemy.schema import AddConstraint, CreateTable
+
+from .models import SchemaVersion, create_views, drop_views
+
+
+# create_all only creates missing tables, so anything added to an existing
+# table has to be applied here. Every step must be safe to run on a database
+# that create_all has just built with the current models.
+def add_ecosystem_version(connection: Connection):
+    columns = {
+        column["name"] for column in inspect(connection).get_columns("ecosystem")
+    }
+    if "version" not in columns:
+        connection.execute(
+            text("ALTER TABLE ecosystem ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+        )
+
+
+# The indexes of revision 2, spelled out so that later changes to the models
+# can't change what an old database is upgraded to
+LOOKUP_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_organism_template_lower_name "
+    "ON organism (lower(name)) WHERE ecosystem_id IS NULL",
+    "CREATE INDEX IF NOT EXISTS ix_plant_template_lower_name "
+    "ON plant (lower(name)) WHERE ecosystem_id IS NULL",
+    "CREATE INDEX IF NOT EXISTS ix_simulation_ecosystem_id "
+    "ON simulation (ecosystem_id)",
+    "CREATE INDEX IF NOT EXISTS ix_ecosystem_id ON ecosystem (id)",
+]
+
+
+def create_lookup_indexes(connection: Connection):
+    for index in LOOKUP_INDEXES:
+        connection.execute(text(index))
+
+
+# Trigram GIN indexes back the name search on Postgres, other databases use
+# the in-process index from app/api/utils/search.py
+def create_trigram_indexes(connection: Connection):
+    if connection.dialect.name != "postgresql":
+        return
+    connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    for table in ("organism", "plant"):
+        connection.execute(
+            text(
+                f"CREATE INDEX IF NOT EXISTS ix_{table}_template_name_trgm "
+                f"ON {table} USING gin (name gin_trgm_ops) "
+                "WHERE ecosystem_id IS NULL"
+            )
+        )
+
+
+# Predation and pollination links used to be copied onto every individual,
+# now they only exist between templates and individuals point to theirs
+def add_species_links(connection: Connection):
+    for table in ("organism", "plant"):
+        columns = {column["name"] for column in inspect(connection).get_columns(table)}
+        if "species_id" not in columns:
+            column_type = Uuid().compile(dialect=connection.dialect)
+            connection.execute(
+                text(
+                    f"ALTER TABLE {table} ADD COLUMN species_id {column_type} "
+                    f"REFERENCES {table} (id) ON DELETE SET NULL"
+                )
+            )
+        connection.execute(
+            text(
+                f"UPDATE {table} SET species_id = ("
+                f"SELECT template.id FROM {table} AS template "
+                "WHERE template.ecosystem_id IS NULL "
+                f"AND lower(template.name) = lower({table}.name) LIMIT 1) "
+                "WHERE ecosystem_id IS NOT NULL AND species_id IS NULL"
+            )
+        )
+
+    links = [
+        ("predationlink", "predator_id", "organism", "prey_id", "organism"),
+        ("pollinationlink", "pollinator_id", "organism", "plant_id", "plant"),
+    ]
+    for link, left, left_table, right, right_table in links:
+        connection.execute(
+            text(
+                f"INSERT INTO {link} ({left}, {right}) "
+                "SELECT DISTINCT COALESCE(a.species_id, a.id), "
+                "COALESCE(b.species_id, b.id) "
+                f"FROM {link} AS l "
+                f"JOIN {left_table} AS a ON a.id = l.{left} "
+                f"JOIN {right_table} AS b ON b.id = l.{right} "
+                "WHERE (a.species_id IS NOT NULL OR b.species_id IS NOT NULL) "
+                f"AND NOT EXISTS (SELECT 1 FROM {link} AS e "
+                f"WHERE e.{left} = COALESCE(a.species_id, a.id) "
+                f"AND e.{right} = COALESCE(b.species_id, b.id))"
+            )
+        )
+        connection.execute(
+            text(
+                f"DELETE FROM {link} WHERE "
+                f"{left} IN (SELECT id FROM {left_table} "
+                "WHERE species_id IS NOT NULL) "
+                f"OR {right} IN (SELECT id FROM {right_table} "
+                "WHERE species_id IS NOT NULL)"
+            )
+        )
+    for table in ("organism", "plant"):
+        connection.execute(
+            text(
+                f"CREATE INDEX IF NOT EXISTS ix_{table}_species_id "
+                f"ON {table} (species_id)"
+            )
+        )
+
+
+# The state columns of the individuals as of revision 5, besides species_id
+INDIVIDUAL_COLUMNS = {
+    ("organismindividual", "organism"): [
+        "id",
+        "ecosystem_id",
+        "age",
+        "health",
+        "hunger",
+        "thirst",
+        "pregnant",
+    ],
+    ("plantindividual", "plant"): [
+        "id",
+        "ecosystem_id",
+        "age",
+        "health",
+        "weight",
+        "fruiting",
+    ],
+}
+
+
+# Moves the individuals out of the catalog tables into the narrow state tables
+# create_all has just added. Individuals whose template was deleted stay behind
+# as the species of their single individual, out of the catalog like before.
+def split_individuals(connection: Connection):
+    for (individual, species), columns in INDIVIDUAL_COLUMNS.items():
+        connection.execute(
+            text(
+                f"INSERT INTO {individual} ({', '.join(columns)}, species_id) "
+                f"SELECT {', '.join(columns)}, COALESCE(species_id, id) "
+                f"FROM {species} WHERE ecosystem_id IS NOT NULL"
+            )
+        )
+        connection.execute(
+            text(
+                f"DELETE FROM {species} "
+                "WHERE ecosystem_id IS NOT NULL AND species_id IS NOT NULL"
+            )
+        )
+    for index in (
+        "ix_organism_ecosystem_id_name_pregnant",
+        "ix_plant_ecosystem_id_name",
+    ):
+        connection.execute(text(f"DROP INDEX IF EXISTS {index}"))
+    create_views(connection)
+
+
+# Indexes aren't taken from the reflected tables, see rebuild_tables
+def reflect(
+    connection: Connection, metadata: MetaData, name: str, exclude_columns=()
+) -> Table:
+    table = Table(name, metadata)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", SAWarning)
+        inspect(connection).reflect_table(table, None, exclude_columns=exclude_columns)
+    return table
+
+
+# SQLite can't alter a foreign key or drop a column under one, so there the
+# tables are rebuilt from their new definition instead, leaving out the rows
+# whose parent is already gone (SQLite didn't enforce foreign keys before
+# revision 7). Renaming a table rewrites the views and the foreign keys using
+# it, the tables referencing a rebuilt one are rebuilt after it as they are.
+def rebuild_tables(connection: Connection, tables: list[Table]):
+    inspector = inspect(connection)
+    metadata = tables[0].metadata
+    names = [table.name for table in tables]
+    for name in inspector.get_table_names():
+        if name not in names and any(
+            foreign_key["referred_table"] in names
+            for foreign_key in inspector.get_foreign_keys(name)
+        ):
+            names.append(name)
+            tables.append(reflect(connection, metadata, name))
+
+    drop_views(connection)
+    # Reflection skips expression indexes on SQLite, they're copied as stored
+    indexes = []
+    for table in tables:
+        stored = connection.execute(
+            text(
+                "SELECT name, sql FROM sqlite_master WHERE type = 'index' "
+                "AND tbl_name = :table AND sql IS NOT NULL"
+            ),
+            {"table": table.name},
+        )
+        for name, sql in stored.tuples():
+            connection.execute(text(f"DROP INDEX {name}"))
+            indexes.append(sql)
+        connection.execute(
+            text(f"ALTER TABLE {table.name} RENAME TO _{table.name}_old")
+        )
+
+    for table in tables:
+        connection.execute(CreateTable(table))
+        columns = ", ".join(table.columns.keys())
+        parents = [
+            f"({foreign_key.parent.name} IS NULL OR {foreign_key.parent.name} IN "
+            f"(SELECT {foreign_key.column.name} FROM {foreign_key.column.table.name}))"
+            for foreign_key in table.foreign_keys
+        ]
+        connection.execute(
+            text(
+                f"INSERT INTO {table.name} ({columns}) "
+                f"SELECT {columns} FROM _{table.name}_old"
+                + (f" WHERE {' AND '.join(parents)}" if parents else "")
+            )
+        )
+    for table in reversed(tables):
+        connection.execute(text(f"DROP TABLE _{table.name}_old"))
+    for index in indexes:
+        connection.execute(text(index))
+    create_views(connection)
+
+
+def ondelete(value: str | None) -> str:
+    value = (value or "").upper()
+    return "" if value == "NO ACTION" else value
+
+
+# The ON DELETE of the foreign keys of links and members as of revision 7, by
+# constrained column. Deleting a species detaches its individuals instead of
+# deleting them (see detach_individuals in app/api/utils/bulk.py).
+FOREIGN_KEY_ACTIONS = {
+    "predationlink": {"predator_id": "CASCADE", "prey_id": "CASCADE"},
+    "pollinationlink": {"pollinator_id": "CASCADE", "plant_id": "CASCADE"},
+    "organismindividual": {"species_id": None, "ecosystem_id": "CASCADE"},
+    "plantindividual": {"species_id": None, "ecosystem_id": "CASCADE"},
+}
+
+
+# Whether the stored foreign keys of the table delete like they should
+def foreign_keys_match(connection: Connection, table: str) -> bool:
+    stored = {
+        (
+            tuple(foreign_key["constrained_columns"]),
+            ondelete(foreign_key["options"].get("ondelete")),
+        )
+        for foreign_key in inspect(connection).get_foreign_keys(table)
+    }
+    expected = {
+        ((column,), ondelete(action))
+        for column, action in FOREIGN_KEY_ACTIONS[table].items()
+    }
+    return stored == expected
+
+
+# Revision 6 also cascaded the deletes of a species to its individuals,
+# revision 7 replaced it so that a database at 6 runs it again
+def cascade_deletes(connection: Connection):
+    metadata = MetaData()
+    tables = [
+        reflect(connection, metadata, name)
+        for name in FOREIGN_KEY_ACTIONS
+        if not foreign_keys_match(connection, name)
+    ]
+    if not tables:
+        return
+    for table in tables:
+        for constraint in table.foreign_key_constraints:
+            constraint.ondelete = FOREIGN_KEY_ACTIONS[table.name][
+                constraint.column_keys[0]
+            ]
+    if connection.dialect.name == "sqlite":
+        rebuild_tables(connection, tables)
+        return
+    for table in tables:
+        for constraint in table.foreign_key_constraints:
+            connection.execute(
+                text(f"ALTER TABLE {table.name} DROP CONSTRAINT {constraint.name}")
+            )
+            connection.execute(AddConstraint(constraint))
+
+
+# The catalog tables kept species_id from before split_individuals, where it
+# pointed the individuals at their template
+def drop_catalog_species_ids(connection: Connection):
+    tables = [
+        table
+        for table in ("organism", "plant")
+        if "species_id"
+        in {column["name"] for column in inspect(connection).get_columns(table)}
+    ]
+    if connection.dialect.name != "sqlite":
+        # Takes the foreign key and the index along
+        for table in tables:
+            connection.execute(text(f"ALTER TABLE {table} DROP COLUMN species_id"))
+        return
+    if not tables:
+        return
+    for table in tables:
+        connection.execute(text(f"DROP INDEX IF EXISTS ix_{table}_species_id"))
+    metadata = MetaData()
+    rebuild_tables(
+        connection,
+        [reflect(connection, metadata, table, {"species_id"}) for table in tables],
+    )
+
+
+# Simulations write their events as SimulationChunk rows while they run, the
+# whole log is only kept for the older ones
+def make_simulation_results_nullable(connection: Connection):
+    column = next(
+        column
+        for column in inspect(connection).get_columns("simulation")
+        if column["name"] == "simulation_results"
+    )
+    if column["nullable"]:
+        return
+    if connection.dialect.name != "sqlite":
+        connection.execute(
+            text("ALTER TABLE simulation ALTER COLUMN simulation_results DROP NOT NULL")
+        )
+        return
+    table = reflect(connection, MetaData(), "simulation")
+    table.c.simulation_results.nullable = True
+    rebuild_tables(connection, [table])
+
+
+MIGRATIONS = [
+    (1, add_ecosystem_version),
+    (2, create_lookup_indexes),
+    (3, create_trigram_indexes),
+    (4, add_species_links),
+    (5, split_individuals),
+    # 6 was cascade_deletes with the species deletes cascading
+    (7, cascade_deletes),
+    (8, drop_catalog_species_ids),
+    (9, make_simulation_results_nullable),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(connection: Connection) -> int | None:
+    return connection.execute(
+        select(SchemaVersion.version).where(SchemaVersion.id == 1)
+    ).scalar_one_or_none()
+
+
+# A single lookup instead of the reflection create_all does for every table
+def schema_is_current(connection: Connection) -> bool:
+    if not inspect(connection).has_table(SchemaVersion.__tablename__):
+        return False
+    return get_schema_version(connection) == SCHEMA_VERSION
+
+
+def migrate(connection: Connection) -> int:
+    current = get_schema_version(connection)
+    for revision, step in MIGRATIONS:
+        if revision > (current or 0):
+            step(connection)
+
+    if current is None:
+        connection.execute(
+            SchemaVersion.__table__.insert().values(id=1, version=SCHEMA_VERSION)
+        )
+    elif current < SCHEMA_VERSION:
+        connection.execute(
+            update(SchemaVersion)
+            .where(SchemaVersion.id == 1)
+            .values(version=SCHEMA_VERSION)
+        )
+    return SCHEMA_VERSION
@@ -1,7 +1,7 @@
-from typing import List, Optional
+from typing import ClassVar, List, Optional
 from uuid import UUID, uuid4
 
-from sqlalchemy import Column
+from sqlalchemy import Column, Index, MetaData, Table, event, func, select, text
 from sqlalchemy.dialects import postgresql
 from sqlmodel import Field, Relationship, SQLModel
 
@@ -19,18 +19,57 @@ from .enums import (
 
 class Simulation(SQLModel, table=True):
     simulation_id: UUID = Field(default_factory=uuid4, primary_key=True)
-    ecosystem_id: UUID
-    simulation_results: str
+    ecosystem_id: UUID = Field(index=True)
+    # Whole compressed log of the simulations run before the events were split
+    # into SimulationChunk rows, read as a fallback by read_simulation
+    simulation_results: Optional[str] = None
 
 
+class SimulationChunk(SQLModel, table=True):
+    simulation_id: UUID = Field(
+        foreign_key="simulation.simulation_id", primary_key=True
+    )
+    day: str = Field(primary_key=True)
+    events: bytes
+
+
+# Inverted index: actor (species name or individual ID) -> [(day, event offset)]
+class SimulationEventIndex(SQLModel, table=True):
+    simulation_id: UUID = Field(
+        foreign_key="simulation.simulation_id", primary_key=True
+    )
+    actor: str = Field(primary_key=True)
+    postings: bytes
+
+
+# Single row holding the last migration applied, see migrations.py
+class SchemaVersion(SQLModel, table=True):
+    id: int = Field(default=1, primary_key=True)
+    version: int = Field(default=0)
+
+
+# Single row bumped on every write to the species catalog
+class CatalogVersion(SQLModel, table=True):
+    id: int = Field(default=1, primary_key=True)
+    version: int = Field(default=0)
+
+
+# Links and members go away with their species or ecosystem through ON DELETE
+# CASCADE, the relationships use passive_deletes so the ORM never loads them
 class PredationLink(SQLModel, table=True):
-    predator_id: UUID = Field(foreign_key="organism.id", primary_key=True)
-    prey_id: UUID = Field(foreign_key="organism.id", primary_key=True)
+    predator_id: UUID = Field(
+        foreign_key="organism.id", primary_key=True, ondelete="CASCADE"
+    )
+    prey_id: UUID = Field(
+        foreign_key="organism.id", primary_key=True, ondelete="CASCADE"
+    )
 
 
 class PollinationLink(SQLModel, table=True):
-    pollinator_id: UUID = Field(foreign_key="organism.id", primary_key=True)
-    plant_id: UUID = Field(foreign_key="plant.id", primary_key=True)
+    pollinator_id: UUID = Field(
+        foreign_key="organism.id", primary_key=True, ondelete="CASCADE"
+    )
+    plant_id: UUID = Field(foreign_key="plant.id", primary_key=True, ondelete="CASCADE")
 
 
 class Organism(SQLModel, table=True):
@@ -59,6 +98,8 @@ class Organism(SQLModel, table=True):
             "primaryjoin": lambda: Organism.id == PredationLink.prey_id,
             "secondaryjoin": lambda: Organism.id == PredationLink.predator_id,
             "foreign_keys": [PredationLink.prey_id, PredationLink.predator_id],
+            "lazy": "raise",
+            "passive_deletes": True,
         },
     )
     prey: Optional[List["Organism"]] = Relationship(
@@ -68,12 +109,14 @@ class Organism(SQLModel, table=True):
             "primaryjoin": lambda: Organism.id == PredationLink.predator_id,
             "secondaryjoin": lambda: Organism.id == PredationLink.prey_id,
             "foreign_keys": [PredationLink.predator_id, PredationLink.prey_id],
+            "lazy": "raise",
+            "passive_deletes": True,
         },
     )
     pollination_target: Optional[List["Plant"]] = Relationship(
         back_populates="pollinators",
         link_model=PollinationLink,
-        sa_relationship_kwargs={"lazy": "selectin"},
+        sa_relationship_kwargs={"lazy": "raise", "passive_deletes": True},
     )
 
     # Behavior
@@ -87,12 +130,10 @@ class Organism(SQLModel, table=True):
 
     environment_type: EnvironmentType | None = Field(nullable=True)
 
+    # Left from when individuals shared this table, always NULL in the catalog
     ecosystem_id: UUID = Field(foreign_key="ecosystem.id", nullable=True)
-    ecosystem: "Ecosystem" = Relationship(
-        back_populates="organisms", sa_relationship_kwargs={"lazy": "selectin"}
-    )
 
-    # Uniques for each ecosystem they are added
+    # Initial state of the individuals added to an ecosystem
     hunger: Optional[float] = Field(default=0.0)
     thirst: Optional[float] = Field(default=0.0)
     health: Optional[float] = Field(default=100.0)
@@ -119,16 +160,110 @@ class Plant(SQLModel, table=True):
 
     # Interactions
     pollinators: Optional[List["Organism"]] = Relationship(
-        back_populates="pollination_target", link_model=PollinationLink
+        back_populates="pollination_target",
+        link_model=PollinationLink,
+        sa_relationship_kwargs={"lazy": "raise", "passive_deletes": True},
     )
 
-    # Current state
+    # Initial state of the individuals added to an ecosystem
     health: float = 100.0
     fruiting: bool = False
 
+    # Left from when individuals shared this table, always NULL in the catalog
     ecosystem_id: UUID = Field(foreign_key="ecosystem.id", nullable=True)
+
+
+# Individuals only store their own state and read every other attribute from
+# their species, which has to be loaded with them (see loaders.py)
+class Individual:
+    species_fields: ClassVar[frozenset[str]] = frozenset()
+
+    def __getattr__(self, name):
+        if name in type(self).species_fields:
+            return getattr(self.species, name)
+        return super().__getattr__(name)
+
+
+class OrganismIndividual(Individual, SQLModel, table=True):
+    species_fields: ClassVar[frozenset[str]] = frozenset(
+        {
+            "name",
+            "type",
+            "weight",
+            "size",
+            "max_age",
+            "reproduction_age",
+            "fertility_rate",
+            "water_consumption",
+            "food_consumption",
+            "diet_type",
+            "activity_cycle",
+            "speed",
+            "social_behavior",
+            "environment_type",
+        }
+    )
+
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    # No cascade, deleting a template detaches its individuals first
+    species_id: UUID = Field(foreign_key="organism.id")
+    ecosystem_id: UUID = Field(foreign_key="ecosystem.id", ondelete="CASCADE")
+    age: float = 0
+    health: Optional[float] = Field(default=100.0)
+    hunger: Optional[float] = Field(default=0.0)
+    thirst: Optional[float] = Field(default=0.0)
+    pregnant: Optional[bool] = Field(default=False)
+
+    species: Organism = Relationship(sa_relationship_kwargs={"lazy": "raise"})
     ecosystem: "Ecosystem" = Relationship(
-        back_populates="plants", sa_relationship_kwargs={"lazy": "selectin"}
+        back_populates="organisms", sa_relationship_kwargs={"lazy": "raise"}
+    )
+
+
+class PlantIndividual(Individual, SQLModel, table=True):
+    species_fields: ClassVar[frozenset[str]] = frozenset(
+        {
+            "name",
+            "type",
+            "size",
+            "max_age",
+            "reproduction_age",
+            "fertility_rate",
+            "environment_type",
+            "water_need",
+        }
+    )
+
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    species_id: UUID = Field(foreign_key="plant.id")
+    ecosystem_id: UUID = Field(foreign_key="ecosystem.id", ondelete="CASCADE")
+    age: float = Field(ge=0, default=0)
+    health: float = 100.0
+    weight: Optional[float] = Field(default=0)  # biomass
+    fruiting: bool = False
+
+    species: Plant = Relationship(sa_relationship_kwargs={"lazy": "raise"})
+    ecosystem: "Ecosystem" = Relationship(
+        back_populates="plants", sa_relationship_kwargs={"lazy": "raise"}
+    )
+
+
+# New individuals start with the initial state of their species
+def new_organism_individual(species: Organism) -> OrganismIndividual:
+    return OrganismIndividual(
+        id=uuid4(),
+        species=species,
+        age=species.age,
+        health=species.health,
+        hunger=species.hunger,
+        thirst=species.thirst,
+        pregnant=species.pregnant,
+    )
+
+
+def new_plant_individual(species: Plant) -> PlantIndividual:
+    return PlantIndividual(
+        id=uuid4(), species=species, weight=species.weight, fruiting=species.fruiting
     )
 
 
@@ -142,16 +277,109 @@ class Ecosystem(SQLModel, table=True):
     max_water_to_add_per_simulation: int
     cycle: ActivityCycle = Field(default=ActivityCycle.diurnal)
     days: int = Field(default=0)
-    organisms: List[Organism] = Relationship(
+    # Bumped by every write to the ecosystem or its members, used as ETag
+    version: int = Field(default=0)
+    organisms: List[OrganismIndividual] = Relationship(
         back_populates="ecosystem",
-        sa_relationship_kwargs={"lazy": "selectin", "cascade": "all, delete-orphan"},
+        sa_relationship_kwargs={
+            "lazy": "raise",
+            "cascade": "all, delete-orphan",
+            "passive_deletes": True,
+        },
     )
 
-    plants: List[Plant] = Relationship(
+    plants: List[PlantIndividual] = Relationship(
         back_populates="ecosystem",
-        sa_relationship_kwargs={"lazy": "selectin", "cascade": "all, delete-orphan"},
+        sa_relationship_kwargs={
+            "lazy": "raise",
+            "cascade": "all, delete-orphan",
+            "passive_deletes": True,
+        },
     )
 
     environment_type: EnvironmentType | None = Field(nullable=True)
     year: Optional[int] = 0
     simulation_status: SimulationStatus = Field(default=SimulationStatus.finished)
+
+
+# Lookup indexes for the hot predicates: members are filtered by ecosystem and
+# species, templates by case-insensitive name
+Index(
+    "ix_organismindividual_ecosystem_id_species_id",
+    OrganismIndividual.ecosystem_id,
+    OrganismIndividual.species_id,
+)
+Index(
+    "ix_organism_template_lower_name",
+    func.lower(Organism.name),
+    postgresql_where=Organism.ecosystem_id.is_(None),
+    sqlite_where=Organism.ecosystem_id.is_(None),
+)
+Index(
+    "ix_plantindividual_ecosystem_id_species_id",
+    PlantIndividual.ecosystem_id,
+    PlantIndividual.species_id,
+)
+Index(
+    "ix_plant_template_lower_name",
+    func.lower(Plant.name),
+    postgresql_where=Plant.ecosystem_id.is_(None),
+    sqlite_where=Plant.ecosystem_id.is_(None),
+)
+
+
+# Read-only views with the wide rows individuals had before they were split
+# from their species, so the ecosystem endpoints keep their response shapes
+VIEWS = MetaData()
+
+
+def individual_view_query(individual, species):
+    own = individual.__table__.columns
+    return select(
+        *[own.get(column.key, column) for column in species.__table__.columns],
+        *[column for column in own if column.key not in species.__table__.columns],
+    ).join_from(individual, species, own.species_id == species.id)
+
+
+def individual_view(name: str, individual, species) -> Table:
+    query = individual_view_query(individual, species)
+    return Table(
+        name,
+        VIEWS,
+        *[
+            Column(column.key, column.type, primary_key=column.key == "id")
+            for column in query.selected_columns
+        ],
+        info={"query": query},
+    )
+
+
+ORGANISM_VIEW = individual_view("organism_view", OrganismIndividual, Organism)
+PLANT_VIEW = individual_view("plant_view", PlantIndividual, Plant)
+
+
+def create_views(connection):
+    for view in VIEWS.tables.values():
+        query = view.info["query"].compile(
+            dialect=connection.dialect, compile_kwargs={"literal_binds": True}
+        )
+        connection.execute(text(f"DROP VIEW IF EXISTS {view.name}"))
+        connection.execute(text(f"CREATE VIEW {view.name} AS {query}"))
+
+
+def drop_views(connection):
+    for view in VIEWS.tables.values():
+        connection.execute(text(f"DROP VIEW IF EXISTS {view.name}"))
+
+
+# create_all/drop_all only know about tables
+event.listen(
+    SQLModel.metadata,
+    "after_create",
+    lambda target, connection, **kw: create_views(connection),
+)
+event.listen(
+    SQLModel.metadata,
+    "before_drop",
+    lambda target, connection, **kw: drop_views(connection),
+)
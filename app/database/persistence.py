@@ -0,0 +1,181 @@
+from collections import defaultdict
+from typing import Iterable
+from uuid import uuid4
+
+from sqlalchemy import Table, bindparam, insert, inspect, text, update
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+
+BATCH_SIZE = 1000
+# Below this, creating and dropping a staging table costs more than it saves
+COPY_MIN_ROWS = 100
+
+
+# The statement routes the session to the writer (see RoutingSession)
+async def write_connection(session: AsyncSession, table: Table) -> AsyncConnection:
+    return await session.connection(bind_arguments={"clause": insert(table)})
+
+
+def uses_copy(connection: AsyncConnection, rows: list[dict]) -> bool:
+    return connection.dialect.driver == "asyncpg" and len(rows) >= COPY_MIN_ROWS
+
+
+def column_default(column):
+    default = column.default
+    if default is None:
+        return None
+    if default.is_callable:
+        return default.arg(None)
+    if default.is_scalar:
+        return default.arg
+    return None
+
+
+# Every row gets every column, missing values take the column default.
+# executemany compiles the statement for the first row only, and COPY skips
+# the Python-side defaults.
+def complete_rows(table: Table, rows: list[dict]):
+    columns = [
+        column
+        for column in table.columns
+        if column.default is not None or any(column.key in row for row in rows)
+    ]
+    return columns, [
+        {
+            column.key: row[column.key] if column.key in row else column_default(column)
+            for column in columns
+        }
+        for row in rows
+    ]
+
+
+# The values go through the same bind processors as a regular INSERT, so
+# enums become their names
+def records(connection: AsyncConnection, table: Table, rows: list[dict]):
+    columns, rows = complete_rows(table, rows)
+    processors = [column.type.bind_processor(connection.dialect) for column in columns]
+    values = [
+        tuple(
+            processor(row[column.key]) if processor else row[column.key]
+            for column, processor in zip(columns, processors)
+        )
+        for row in rows
+    ]
+    return [column.name for column in columns], values
+
+
+# Streams the rows into a temporary table with asyncpg's binary COPY. The
+# staging table has no constraints, the statement merging it checks them.
+async def copy_to_staging(
+    connection: AsyncConnection, table: Table, rows: list[dict]
+) -> tuple[str, list[str]]:
+    columns, values = records(connection, table, rows)
+    quote = connection.dialect.identifier_preparer.quote
+    staging = f"_staging_{table.name}_{uuid4().hex[:8]}"
+    # Also starts the transaction the COPY below has to run in
+    await connection.execute(
+        text(
+            f"CREATE TEMP TABLE {staging} ON COMMIT DROP AS "
+            f"SELECT {', '.join(map(quote, columns))} FROM {quote(table.name)} "
+            "WITH NO DATA"
+        )
+    )
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        staging, records=values, columns=columns
+    )
+    return staging, columns
+
+
+# COPY on asyncpg, batched executemany INSERTs everywhere else
+async def insert_rows(session: AsyncSession, table: Table, rows: list[dict]):
+    if not rows:
+        return
+    connection = await write_connection(session, table)
+    if not uses_copy(connection, rows):
+        _, rows = complete_rows(table, rows)
+        for start in range(0, len(rows), BATCH_SIZE):
+            await connection.execute(insert(table), rows[start : start + BATCH_SIZE])
+        return
+
+    quote = connection.dialect.identifier_preparer.quote
+    staging, columns = await copy_to_staging(connection, table, rows)
+    columns = ", ".join(map(quote, columns))
+    await connection.execute(
+        text(
+            f"INSERT INTO {quote(table.name)} ({columns}) "
+            f"SELECT {columns} FROM {staging}"
+        )
+    )
+    await connection.execute(text(f"DROP TABLE {staging}"))
+
+
+# Every row holds the primary key and the same columns to set. One UPDATE
+# joined to the staging table on asyncpg, batched executemany elsewhere.
+async def update_rows(session: AsyncSession, table: Table, rows: list[dict]):
+    if not rows:
+        return
+    keys = [column.key for column in table.primary_key.columns]
+    values = [key for key in rows[0] if key not in keys]
+    connection = await write_connection(session, table)
+    if not uses_copy(connection, rows):
+        statement = (
+            update(table)
+            .where(*(table.c[key] == bindparam(f"_{key}") for key in keys))
+            .values({key: bindparam(f"_{key}") for key in values})
+        )
+        params = [{f"_{key}": value for key, value in row.items()} for row in rows]
+        for start in range(0, len(params), BATCH_SIZE):
+            await connection.execute(statement, params[start : start + BATCH_SIZE])
+        return
+
+    quote = connection.dialect.identifier_preparer.quote
+    target = quote(table.name)
+    staging, _ = await copy_to_staging(connection, table, rows)
+    await connection.execute(
+        text(
+            f"UPDATE {target} SET "
+            + ", ".join(
+                f"{quote(table.c[key].name)} = staging.{quote(table.c[key].name)}"
+                for key in values
+            )
+            + f" FROM {staging} AS staging WHERE "
+            + " AND ".join(
+                f"{target}.{quote(table.c[key].name)} = "
+                f"staging.{quote(table.c[key].name)}"
+                for key in keys
+            )
+        )
+    )
+    await connection.execute(text(f"DROP TABLE {staging}"))
+
+
+# Writes the loaded rows that changed with update_rows, instead of one
+# unit-of-work UPDATE per object, then marks them as saved so the next flush
+# skips them. New and deleted objects are left to the flush.
+async def write_back(session: AsyncSession, instances: Iterable) -> int:
+    dirty = defaultdict(list)
+    for instance in instances:
+        state = inspect(instance)
+        # A changed relationship only reaches its foreign key in the flush
+        if (
+            state.persistent
+            and state.committed_state
+            and set(state.committed_state) <= set(state.mapper.column_attrs.keys())
+        ):
+            dirty[type(instance)].append(state)
+
+    for model, states in dirty.items():
+        table = model.__table__
+        # Expired columns aren't written, they can't have changed
+        loaded = [
+            column.key
+            for column in table.columns
+            if all(column.key in state.dict for state in states)
+        ]
+        rows = [{key: state.dict[key] for key in loaded} for state in states]
+        await update_rows(session, table, rows)
+        for state in states:
+            for key in list(state.committed_state):
+                set_committed_value(state.obj(), key, state.dict.get(key))
+    return sum(len(states) for states in dirty.values())
@@ -0,0 +1,33 @@
+import time
+from contextvars import ContextVar
+
+# Holds the time until which the client reads from the primary
+STICKY_COOKIE = "ecosim_primary_until"
+
+
+class ClientWrites:
+    def __init__(self, primary_until: float = 0):
+        self.primary_until = primary_until
+        self.wrote = False
+
+    # A client reads its own writes: once it wrote, the replicas may lag behind
+    # for a while, so it stays on the primary until the cookie expires
+    @property
+    def sticky(self) -> bool:
+        return self.wrote or self.primary_until > time.time()
+
+
+current_client: ContextVar[ClientWrites | None] = ContextVar(
+    "current_client", default=None
+)
+
+
+def record_write():
+    client = current_client.get()
+    if client is not None:
+        client.wrote = True
+
+
+def reads_from_primary() -> bool:
+    client = current_client.get()
+    return client is not None and client.sticky
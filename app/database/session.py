@@ -1,36 +1,181 @@
-from sqlalchemy import text
+import asyncio
+import itertools
+import logging
+
+from sqlalchemy import event, make_url, text
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.dml import UpdateBase
 from sqlmodel import SQLModel
 
+from .engine import SQLITE_URL, EngineProfile, engine_options, is_sqlite_file
+from .migrations import SCHEMA_VERSION, migrate, schema_is_current
+from .replicas import reads_from_primary, record_write
+
+logger = logging.getLogger(__name__)
+
 engine: AsyncEngine | None = None
+read_engine: AsyncEngine | None = None
+replica_engines: list[AsyncEngine] = []
+engine_profile: EngineProfile | None = None
 
 _sessionmaker_global: sessionmaker | None = None
+_replica_sessionmakers = itertools.cycle(())
+
+
+def set_sqlite_pragmas(engine: AsyncEngine, pragmas: dict[str, str | int]):
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def build_engine(
+    database_url: str, profile: EngineProfile, read_only: bool = False
+) -> AsyncEngine:
+    new_engine = create_async_engine(
+        database_url, **engine_options(database_url, profile)
+    )
+    # SQLite only enforces foreign keys, and so their ON DELETE CASCADE, when
+    # each connection asks for it
+    pragmas = {"foreign_keys": "ON", **profile.sqlite_pragmas()}
+    if read_only:
+        pragmas["query_only"] = "ON"
+    set_sqlite_pragmas(new_engine, pragmas)
+    return new_engine
+
+
+# Reads go to the read pool until the session writes. From then on, and so
+# for the reads that must see the uncommitted writes, the session sticks to
+# the writer. The first write also makes the client stick to the primary.
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if not self.info.get("wrote") and (
+            self._flushing or isinstance(clause, UpdateBase)
+        ):
+            self.info["wrote"] = True
+            record_write()
+        read_bind = self.info.get("read_bind")
+        if read_bind is None or self.info.get("wrote"):
+            return super().get_bind(mapper, clause=clause, **kwargs)
+        return read_bind
+
+
+def build_sessionmaker(
+    writer: AsyncEngine, reader: AsyncEngine | None = None
+) -> sessionmaker:
+    return sessionmaker(
+        bind=writer,
+        class_=AsyncSession,
+        sync_session_class=RoutingSession,
+        info={"read_bind": reader.sync_engine} if reader else {},
+        expire_on_commit=False,
+    )
+
+
+# Replica sessions are read-only, the database rejects their writes
+def build_replica_sessionmaker(replica: AsyncEngine) -> sessionmaker:
+    return sessionmaker(
+        bind=replica,
+        class_=AsyncSession,
+        info={"replica": True},
+        expire_on_commit=False,
+    )
+
+
+async def select_one(new_engine: AsyncEngine):
+    async with new_engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
 
+# An unreachable host can otherwise hang the startup for the OS TCP timeout
+async def probe(new_engine: AsyncEngine, timeout: float | None = None):
+    await asyncio.wait_for(select_one(new_engine), timeout)
+
+
+# Connects to DATABASE_URL, or to SQLite when it isn't set. An unreachable
+# DATABASE_URL only falls back to SQLite when fallback_to_sqlite is set
+async def init_engine(
+    database_url: str | None,
+    profile: EngineProfile | None = None,
+    fallback_to_sqlite: bool = False,
+    replica_urls: list[str] | None = None,
+) -> AsyncEngine:
+    global engine, read_engine, replica_engines, engine_profile
+    global _sessionmaker_global, _replica_sessionmakers
+    profile = profile or EngineProfile()
+    if not database_url:
+        logger.warning("DATABASE_URL is not set, using SQLite at %s", SQLITE_URL)
+        database_url = SQLITE_URL
 
-# Tries to connect with the DATABASE_URL provided in .env, and use SQLite as a fallback
-async def init_engine(database_url: str) -> AsyncEngine:
-    global engine, _sessionmaker_global
     try:
-        test_engine = create_async_engine(database_url, echo=False)
-        async with test_engine.connect() as conn:
-            await conn.execute(text("SELECT 1"))
-        engine = test_engine
+        new_engine = build_engine(database_url, profile)
+        await probe(new_engine, profile.probe_timeout)
     except Exception:
-        engine = create_async_engine("sqlite+aiosqlite:///./sqlite.db", echo=False)
+        safe_url = make_url(database_url).render_as_string(hide_password=True)
+        if not fallback_to_sqlite or database_url == SQLITE_URL:
+            logger.exception("Could not connect to the database at %s", safe_url)
+            raise
+        logger.exception(
+            "Could not connect to the database at %s, FALLING BACK to SQLite at %s",
+            safe_url,
+            SQLITE_URL,
+        )
+        new_engine = build_engine(SQLITE_URL, profile)
+
+    engine, engine_profile = new_engine, profile
+    read_engine = None
+    read_profile = profile
+    if profile.read_pool_size:
+        read_profile = profile.model_copy(update={"pool_size": profile.read_pool_size})
+    database_url = engine.url.render_as_string(hide_password=False)
+    if profile.read_pool_size and is_sqlite_file(database_url):
+        read_engine = build_engine(database_url, read_profile, read_only=True)
+    logger.info(
+        "Database engine ready: %s (profile %s%s)",
+        engine.url.render_as_string(hide_password=True),
+        profile.name,
+        f", {profile.read_pool_size} read connections" if read_engine else "",
+    )
+    _sessionmaker_global = build_sessionmaker(engine, read_engine)
 
-    _sessionmaker_global = sessionmaker(
-        bind=engine, class_=AsyncSession, expire_on_commit=False
+    replica_engines = []
+    for replica_url in replica_urls or ():
+        replica = build_engine(replica_url, read_profile, read_only=True)
+        try:
+            await probe(replica, read_profile.probe_timeout)
+        except Exception:
+            logger.exception(
+                "Could not connect to the replica at %s",
+                make_url(replica_url).render_as_string(hide_password=True),
+            )
+            raise
+        replica_engines.append(replica)
+    _replica_sessionmakers = itertools.cycle(
+        [build_replica_sessionmaker(replica) for replica in replica_engines]
     )
+    if replica_engines:
+        logger.info("Routing read-only requests to %d replicas", len(replica_engines))
 
     return engine
 
 
-async def create_db_tables():
+# With check_stamp, a database already stamped with the latest schema version
+# skips create_all and the migrations
+async def create_db_tables(check_stamp: bool = False):
     if engine is None:
         raise RuntimeError("Engine not initialized. Call init_engine first.")
     async with engine.begin() as connection:
+        if check_stamp and await connection.run_sync(schema_is_current):
+            logger.info("Schema is at version %d, skipping create_all", SCHEMA_VERSION)
+            return
         await connection.run_sync(SQLModel.metadata.create_all)
+        await connection.run_sync(migrate)
 
 
 def get_sessionmaker():
@@ -42,9 +187,29 @@ def set_sessionmaker(sm):
     _sessionmaker_global = sm
 
 
+def set_replica_sessionmakers(sessionmakers: list[sessionmaker]):
+    global _replica_sessionmakers
+    _replica_sessionmakers = itertools.cycle(sessionmakers)
+
+
+# The replicas take turns, a client that just wrote reads from the primary
+def get_read_sessionmaker():
+    if reads_from_primary():
+        return _sessionmaker_global
+    return next(_replica_sessionmakers, _sessionmaker_global)
+
+
 async def get_session():
     if _sessionmaker_global is None:
         raise RuntimeError("Sessionmaker not initialized. Call init_engine first.")
     async with _sessionmaker_global() as session:
         yield session
         await session.close()
+
+
+async def get_read_session():
+    read_sessionmaker = get_read_sessionmaker()
+    if read_sessionmaker is None:
+        raise RuntimeError("Sessionmaker not initialized. Call init_engine first.")
+    async with read_sessionmaker() as session:
+        yield session
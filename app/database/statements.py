@@ -0,0 +1,33 @@
+from functools import lru_cache
+
+from sqlalchemy import bindparam, select, update
+
+from .models import Ecosystem, Organism, Plant
+
+# Hot statements are built once with bound parameters, so every call reuses
+# the same construct and cache key instead of building and hashing a new one.
+# The SQL text never changes either, which lets asyncpg reuse its prepared
+# statement (statement_cache_size in engine.py).
+ECOSYSTEM_BY_ID = select(Ecosystem).where(Ecosystem.id == bindparam("ecosystem_id"))
+
+TOUCH_ECOSYSTEM = (
+    update(Ecosystem)
+    .where(Ecosystem.id == bindparam("ecosystem_id"))
+    .values(version=Ecosystem.version + 1)
+    .execution_options(synchronize_session=False)
+)
+
+ORGANISM_TEMPLATE_BY_NAME = select(Organism).where(
+    Organism.name == bindparam("name"), Organism.ecosystem_id.is_(None)
+)
+
+PLANT_TEMPLATE_BY_NAME = select(Plant).where(
+    Plant.name == bindparam("name"), Plant.ecosystem_id.is_(None)
+)
+
+
+# One statement per loader profile (app/database/loaders.py), the profiles are
+# module-level tuples so they hash the same on every call
+@lru_cache(maxsize=32)
+def ecosystem_by_id(options: tuple = ()):
+    return ECOSYSTEM_BY_ID.options(*options)
@@ -3,21 +3,53 @@ from contextlib import asynccontextmanager
 
 from dotenv import load_dotenv
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 
-from app.api.routers import defaults, plant
+from app.api.routers import catalog, defaults, metrics, plant, telemetry
 
 from .api.routers import ecosystem, organism
-from .database.session import create_db_tables, init_engine
+from .api.utils.cache import catalog_cache
+from .api.utils.metrics import MetricsMiddleware
+from .api.utils.read_your_writes import DEFAULT_STICKY_SECONDS, ReadYourWritesMiddleware
+from .api.utils.warmup import warm_up
+from .database.engine import engine_profile_from_env
+from .database.session import create_db_tables, get_sessionmaker, init_engine
 
 load_dotenv()
 
 database_url = os.getenv("DATABASE_URL")
+catalog_cache_backend = os.getenv("CATALOG_CACHE_BACKEND", "memory")
+database_fallback_to_sqlite = os.getenv(
+    "DATABASE_FALLBACK_TO_SQLITE", "false"
+).lower() in ("1", "true", "yes")
+# Comma-separated, read-only endpoints are spread over them
+database_replica_urls = [
+    url.strip()
+    for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",")
+    if url.strip()
+]
+database_replica_sticky_seconds = float(
+    os.getenv("DATABASE_REPLICA_STICKY_SECONDS", DEFAULT_STICKY_SECONDS)
+)
+# "create" runs create_all and the migrations on every boot, "check" skips
+# them when the database is stamped with the latest schema version
+database_schema_startup = os.getenv("DATABASE_SCHEMA_STARTUP", "create").lower()
+startup_warm_up = os.getenv("STARTUP_WARM_UP", "true").lower() in ("1", "true", "yes")
 
 
 @asynccontextmanager
 async def lifespan_handler(app: FastAPI):
-    await init_engine(database_url)
-    await create_db_tables()
+    catalog_cache.configure(catalog_cache_backend)
+    await init_engine(
+        database_url,
+        engine_profile_from_env(),
+        database_fallback_to_sqlite,
+        database_replica_urls,
+    )
+    await create_db_tables(check_stamp=database_schema_startup == "check")
+    if startup_warm_up:
+        async with get_sessionmaker()() as session:
+            await warm_up(session)
     yield
 
 
@@ -27,9 +59,20 @@ app = FastAPI(
     redoc_url=None,
     title="EcoSimAPI",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
 )
 
+if database_replica_urls:
+    app.add_middleware(
+        ReadYourWritesMiddleware, sticky_seconds=database_replica_sticky_seconds
+    )
+# Added last so it is the outermost and times the other middlewares too
+app.add_middleware(MetricsMiddleware)
+
+app.include_router(catalog.router)
 app.include_router(defaults.router)
 app.include_router(ecosystem.router)
+app.include_router(metrics.router)
 app.include_router(organism.router)
 app.include_router(plant.router)
+app.include_router(telemetry.router)